@@ -4,8 +4,19 @@ An interface for the ACE processor.
 """
 
 from typing import (
-    Any, Iterator, Iterable, Mapping, Dict, List, Tuple, Pattern, IO)
+    Any, Iterator, Iterable, Mapping, Dict, List, Tuple, Pattern, IO,
+    Optional, Deque, Callable)
 import logging
+import asyncio
+import math
+import hashlib
+import pickle
+import sqlite3
+import time
+import zlib
+import threading
+import queue
+from collections import deque
 import os
 from pathlib import Path
 import argparse
@@ -42,38 +53,219 @@ class ACEProcessError(PyDelphinException):
     """Raised when the ACE process has crashed and cannot be recovered."""
 
 
-class ACEProcess(interface.Processor):
+class ResponseCache(object):
     """
-    The base class for interfacing ACE.
+    A persistent cache of ACE responses.
+
+    Responses are stored in an SQLite database at *path* under a key
+    computed from the contents of the grammar image, the ACE version
+    and command-line arguments, the task, and the input, so a
+    response is only reused when ACE would be given the same grammar,
+    options, and input again. Pass an instance as the *cache*
+    argument of :class:`ACEProcess` (or one of its subclasses) to
+    reuse responses across processing runs; one instance may be
+    shared by several processes. Responses are stored as compressed
+    pickles, so only open databases from trusted sources.
+
+    When there are more than *max_entries* responses or more than
+    *max_bytes* bytes of stored response data, the least recently
+    used responses are evicted.
 
-    This manages most subprocess communication with ACE, but does not
-    interpret the response returned via ACE's stdout. Subclasses
-    override the :meth:`receive` method to interpret the task-specific
-    response formats.
+    Args:
+        path: path to the database file; it is created if it does
+            not exist
+        max_entries: if given, the maximum number of responses kept
+        max_bytes: if given, the maximum size in bytes of the
+            stored (compressed) responses
+    Attributes:
+        hits: the number of responses found in the cache
+        misses: the number of responses not found in the cache
+        evictions: the number of responses evicted from the cache
+    Example:
+        >>> with ace.ResponseCache('erg.responses') as cache:
+        ...     with ace.ACEParser('erg.dat', cache=cache) as parser:
+        ...         response = parser.interact('Dogs bark.')
+        ...     print(cache.hits, cache.misses)
+        ...
+        0 1
+    """
 
-    Note that not all arguments to this class are used by every
-    subclass; the documentation for each subclass specifies which are
-    available.
+    def __init__(self,
+                 path: util.PathLike,
+                 max_entries: int = None,
+                 max_bytes: int = None):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError('max_entries must be a positive integer')
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError('max_bytes must be a positive integer')
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+        self._db = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' data BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' accessed REAL NOT NULL)')
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS responses_accessed'
+            ' ON responses (accessed)')
+        self._db.commit()
+        self._count, self._bytes = self._totals()
 
-    Args:
-        grm (str): path to a compiled grammar image
-        cmdargs (list, optional): a list of command-line arguments
-            for ACE; note that arguments and their values should be
-            separate entries, e.g. `['-n', '5']`
-        executable (str, optional): the path to the ACE binary; if
-            `None`, ACE is assumed to be callable via `ace`
-        env (dict): environment variables to pass to the ACE
-            subprocess
-        tsdbinfo (bool): if `True` and ACE's version is compatible,
-            all information ACE reports for [incr tsdb()] processing
-            is gathered and returned in the response
-        full_forest (bool): if `True` and *tsdbinfo* is `True`, output
-            the full chart for each parse result
-        stderr (file): stream used for ACE's stderr
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False  # don't try to handle any exceptions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._totals()[0]
+
+    def fingerprint(self, grm: util.PathLike) -> str:
+        """
+        Return a hash of the contents of the grammar image *grm*.
+
+        The hash is computed once for each version of the file (as
+        determined by its size and modification time) that this
+        instance sees.
+        """
+        path = Path(grm).expanduser()
+        st = path.stat()
+        memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if memo_key not in self._fingerprints:
+                sha = hashlib.sha256()
+                with path.open('rb') as fh:
+                    for chunk in iter(lambda: fh.read(1 << 20), b''):
+                        sha.update(chunk)
+                self._fingerprints[memo_key] = sha.hexdigest()
+            return self._fingerprints[memo_key]
+
+    def get(self, key: str) -> Optional[interface.Response]:
+        """
+        Return the response stored under *key*, or `None`.
+
+        The returned response has no `run`, `input`, or `keys`
+        entries; those depend on the processing run and are filled
+        in by the caller.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute(
+                'UPDATE responses SET accessed = ? WHERE key = ?',
+                (time.time(), key))
+            self._db.commit()
+        data = pickle.loads(zlib.decompress(row[0]))
+        return interface.Response(data)
+
+    def put(self, key: str, response: interface.Response) -> None:
+        """Store *response* under *key*, evicting old responses."""
+        data = {k: v for k, v in response.items()
+                if k not in _UNCACHED_RESPONSE_KEYS}
+        # pickled, not JSON, so tuples (e.g., in result flags) survive
+        blob = zlib.compress(
+            pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, data, size, accessed)'
+                ' VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), time.time()))
+            self._count += 1
+            self._bytes += len(blob)
+            if self._over_limit():
+                # other processes may share the database, so recount
+                self._count, self._bytes = self._totals()
+                if self._over_limit():
+                    self._evict()
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Remove all responses and reset the statistics."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self._count = self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the size of the cache and its hit and miss counts."""
+        with self._lock:
+            count, size = self._totals()
+        return {'entries': count,
+                'bytes': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions}
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def _totals(self) -> Tuple[int, int]:
+        count, size = self._db.execute(
+            'SELECT COUNT(*), TOTAL(size) FROM responses').fetchone()
+        return count, int(size)
+
+    def _over_limit(self) -> bool:
+        return ((self.max_entries is not None
+                 and self._count > self.max_entries)
+                or (self.max_bytes is not None
+                    and self._bytes > self.max_bytes))
+
+    def _evict(self) -> None:
+        rows = self._db.execute(
+            'SELECT key, size FROM responses ORDER BY accessed')
+        evicted = []
+        for key, size in rows:
+            if not self._over_limit():
+                break
+            evicted.append((key,))
+            self._count -= 1
+            self._bytes -= size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self.evictions += len(evicted)
+        logger.debug('evicted %d responses from %s', len(evicted), self.path)
+
+
+# response entries that depend on the processing run and not the input
+_UNCACHED_RESPONSE_KEYS = ('run', 'input', 'keys')
+
+
+class _ACEBase(object):
     """
+    Configuration and output interpretation common to ACE processes.
 
+    This class does not manage a subprocess. :class:`ACEProcess`
+    communicates with ACE synchronously and :class:`AsyncACEProcess`
+    does so with :mod:`asyncio`, while the task-specific subclasses
+    of this class define how inputs are validated and how outputs are
+    interpreted for both.
+    """
+
+    task: Optional[str] = None
     _cmdargs: List[str] = []
     _termini: List[Pattern[str]] = []
+    # the termini with --tsdb-stdout, if different from _termini
+    _tsdb_termini: Optional[List[Pattern[str]]] = None
 
     def __init__(self,
                  grm: util.PathLike,
@@ -82,7 +274,9 @@ class ACEProcess(interface.Processor):
                  env: Mapping[str, str] = None,
                  tsdbinfo: bool = True,
                  full_forest: bool = False,
-                 stderr: IO[Any] = None):
+                 stderr: IO[Any] = None,
+                 cache: ResponseCache = None,
+                 timeout: float = None):
         self.grm = str(Path(grm).expanduser())
 
         self.cmdargs = cmdargs or []
@@ -96,18 +290,23 @@ class ACEProcess(interface.Processor):
         ace_version = self.ace_version
         if ace_version >= (0, 9, 14):
             self.cmdargs.append('--tsdb-notes')
-        if tsdbinfo and ace_version >= (0, 9, 24):
+        self._tsdbinfo = tsdbinfo and ace_version >= (0, 9, 24)
+        if self._tsdbinfo:
             self.cmdargs.extend(['--tsdb-stdout', '--report-labels'])
-            setattr(self, 'receive', self._tsdb_receive)
             if full_forest:
-                self._cmdargs.append('--itsdb-forest')
-        else:
-            setattr(self, 'receive', self._default_receive)
+                # don't append to the class attribute shared by instances
+                self._cmdargs = self._cmdargs + ['--itsdb-forest']
         self.env = env or os.environ
         self._run_id = -1
         self.run_infos: List[Dict[str, Any]] = []
         self._stderr = stderr
-        self._open()
+        self.cache = cache
+        self._cache_prefix: Optional[bytes] = None
+        if timeout is not None and timeout <= 0:
+            raise ValueError('timeout must be a positive number')
+        self.timeout = timeout
+        # seconds taken by each item of the current run
+        self._latencies: List[float] = []
 
     @property
     def ace_version(self) -> Tuple[int, ...]:
@@ -119,15 +318,13 @@ class ACEProcess(interface.Processor):
         """Contextual information about the the running process."""
         return self.run_infos[-1]
 
-    def _open(self) -> None:
-        self._p = Popen(
-            [self.executable, '-g', self.grm] + self._cmdargs + self.cmdargs,
-            stdin=PIPE,
-            stdout=PIPE,
-            stderr=self._stderr,
-            env=self.env,
-            universal_newlines=True
-        )
+    def _args(self) -> List[str]:
+        return [self.executable, '-g', self.grm] + self._cmdargs + self.cmdargs
+
+    def _start_run(self) -> None:
+        if self.run_infos:
+            self._summarize_run()
+        self._latencies = []
         self._run_id += 1
         self.run_infos.append({
             'run-id': self._run_id,
@@ -139,9 +336,266 @@ class ACEProcess(interface.Processor):
             'os': platform(),
             'start': datetime.now()
         })
+
+    def _summarize_run(self) -> None:
+        """Record the latency statistics of the current run."""
+        if self._latencies:
+            self.run_info['latency'] = _latency_stats(self._latencies)
+
+    def _end_item(self,
+                  response: interface.Response,
+                  seconds: float,
+                  timed_out: bool) -> None:
+        """Record the time taken for *response* and any timeout."""
+        self._latencies.append(seconds)
+        if timed_out:
+            message = ('PyDelphin stopped ACE after the timeout of '
+                       f'{self.timeout} seconds')
+            response['ERRORS'].append(message)
+            response['error'] = message
+            self.run_info['timeouts'] = self.run_info.get('timeouts', 0) + 1
+
+    def _current_termini(self) -> List[Pattern[str]]:
+        if self._tsdbinfo and self._tsdb_termini is not None:
+            return self._tsdb_termini
+        return self._termini
+
+    def _read_run_info(self, line: str) -> None:
+        assert line.startswith('NOTE: tsdb run:')
+        for key, value in _sexpr_data(line[15:].lstrip()):
+            if key == ':application':
+                continue  # PyDelphin sets 'application'
+            self.run_info[key.lstrip(':')] = value
+
+    def _interpret(self, lines: List[str]) -> interface.Response:
+        """Interpret the output *lines* for an item as a response."""
+        if self._tsdbinfo:
+            return self._tsdb_interpret(lines)
+        return self._default_interpret(lines)
+
+    def _default_interpret(self, lines: List[str]) -> interface.Response:
+        raise NotImplementedError()
+
+    def _tsdb_interpret(self, lines: List[str]) -> interface.Response:
+        response, lines = _make_response(lines, self.run_info)
+        line = ' '.join(lines)  # ACE 0.9.24 on Mac puts superfluous newlines
+        return _tsdb_response(response, line)
+
+    def _cache_key(self, datum: str) -> str:
+        """Return the key of *datum*'s response in the response cache."""
+        assert self.cache is not None
+        if self._cache_prefix is None:
+            context = [self.cache.fingerprint(self.grm),
+                       '.'.join(map(str, self.ace_version)),
+                       str(self.task),
+                       # the executable and grammar path don't matter
+                       *(self._cmdargs + self.cmdargs)]
+            self._cache_prefix = '\0'.join(context).encode('utf-8') + b'\0\0'
+        return hashlib.sha256(
+            self._cache_prefix + datum.encode('utf-8')).hexdigest()
+
+    def _cached(self, datum: str) -> Optional[interface.Response]:
+        """Return the cached response for *datum*, if any."""
+        if self.cache is None:
+            return None
+        response = self.cache.get(self._cache_key(datum))
+        if response is not None:
+            response['run'] = self.run_info
+        return response
+
+    def _store(self, datum: str, response: interface.Response) -> None:
+        """Cache *response* for *datum* if it is reusable."""
+        # errors may be transient (e.g., from a crash), so don't keep them
+        if self.cache is not None and not response.get('ERRORS'):
+            self.cache.put(self._cache_key(datum), response)
+
+    def _refuse(self, datum: str) -> interface.Response:
+        """Return the response for input that is not sent to ACE."""
+        response, _ = _make_response(
+            [('NOTE: PyDelphin could not validate the input and '
+              'refused to send it to ACE'),
+             f'SKIP: {datum}'],
+            self.run_info)
+        return response
+
+    def _finish(self,
+                response: interface.Response,
+                keys: Optional[Dict[str, Any]]) -> interface.Response:
+        """Add the item context to *response* for process_item()."""
+        if keys is not None:
+            response['keys'] = keys
+        if 'task' not in response and self.task is not None:
+            response['task'] = self.task
+        return response
+
+    def _validate_input(self, datum: str) -> str:
+        raise NotImplementedError()
+
+
+class _ParseTask(_ACEBase):
+    task = 'parse'
+    _termini = [re.compile(r'^$'), re.compile(r'^$')]
+
+    def _validate_input(self, datum: str):
+        # valid input for parsing is non-empty
+        # (this relies on an empty string evaluating to False)
+        return isinstance(datum, str) and datum.strip()
+
+    def _default_interpret(self, lines):
+        response, lines = _make_response(lines, self.run_info)
+        response['results'] = [
+            dict(zip(('mrs', 'derivation'), map(str.strip, line.split(' ; '))))
+            for line in lines
+        ]
+        return response
+
+
+class _TransferTask(_ACEBase):
+    task = 'transfer'
+    _termini = [re.compile(r'^$')]
+
+    def __init__(self,
+                 grm: util.PathLike,
+                 cmdargs: List[str] = None,
+                 executable: util.PathLike = None,
+                 env: Mapping[str, str] = None,
+                 stderr: IO[Any] = None,
+                 cache: ResponseCache = None,
+                 timeout: float = None):
+        super().__init__(grm, cmdargs=cmdargs, executable=executable, env=env,
+                         tsdbinfo=False, full_forest=False, stderr=stderr,
+                         cache=cache, timeout=timeout)
+
+    def _validate_input(self, datum):
+        return _possible_mrs(datum)
+
+    def _default_interpret(self, lines):
+        response, lines = _make_response(lines, self.run_info)
+        response['results'] = [{'mrs': line.strip()} for line in lines]
+        return response
+
+
+class _GenerateTask(_ACEBase):
+    task = 'generate'
+    _cmdargs = ['-e', '--tsdb-notes']
+    _termini = [re.compile(r'NOTE: tsdb parse: ')]
+    # with --tsdb-stdout, the notes line is not printed
+    _tsdb_termini = [re.compile(r'\(:results \.')]
+
+    def __init__(self,
+                 grm: util.PathLike,
+                 cmdargs: List[str] = None,
+                 executable: util.PathLike = None,
+                 env: Mapping[str, str] = None,
+                 tsdbinfo: bool = True,
+                 stderr: IO[Any] = None,
+                 cache: ResponseCache = None,
+                 timeout: float = None):
+        super().__init__(grm, cmdargs=cmdargs, executable=executable, env=env,
+                         tsdbinfo=tsdbinfo, full_forest=False, stderr=stderr,
+                         cache=cache, timeout=timeout)
+
+    def _validate_input(self, datum):
+        return _possible_mrs(datum)
+
+    def _default_interpret(self, lines):
+        show_tree = '--show-realization-trees' in self.cmdargs
+        show_mrs = '--show-realization-mrses' in self.cmdargs
+
+        response, lines = _make_response(lines, self.run_info)
+
+        i, numlines = 0, len(lines)
+        results = []
+        while i < numlines:
+            result = {'SENT': lines[i].strip()}
+            i += 1
+            if show_tree and lines[i].startswith('DTREE = '):
+                result['derivation'] = lines[i][8:].strip()
+                i += 1
+            if show_mrs and lines[i].startswith('MRS = '):
+                result['mrs'] = lines[i][6:].strip()
+                i += 1
+            results.append(result)
+        response['results'] = results
+        return response
+
+
+class ACEProcess(_ACEBase, interface.Processor):
+    """
+    The base class for interfacing ACE.
+
+    This manages most subprocess communication with ACE, but does not
+    interpret the response returned via ACE's stdout. Subclasses
+    define how the task-specific response formats are interpreted.
+
+    Note that not all arguments to this class are used by every
+    subclass; the documentation for each subclass specifies which are
+    available.
+
+    Args:
+        grm (str): path to a compiled grammar image
+        cmdargs (list, optional): a list of command-line arguments
+            for ACE; note that arguments and their values should be
+            separate entries, e.g. `['-n', '5']`
+        executable (str, optional): the path to the ACE binary; if
+            `None`, ACE is assumed to be callable via `ace`
+        env (dict): environment variables to pass to the ACE
+            subprocess
+        tsdbinfo (bool): if `True` and ACE's version is compatible,
+            all information ACE reports for [incr tsdb()] processing
+            is gathered and returned in the response
+        full_forest (bool): if `True` and *tsdbinfo* is `True`, output
+            the full chart for each parse result
+        stderr (file): stream used for ACE's stderr
+        cache (:class:`ResponseCache`, optional): if given, responses
+            are looked up in and added to this cache; inputs with a
+            cached response are not sent to ACE
+        timeout (float, optional): if given, the number of seconds
+            ACE may spend on one input; when it is exceeded, ACE is
+            killed and restarted, and the response for the input
+            contains an error saying so
+
+    When a run ends, its :attr:`run_infos` entry gets a `latency`
+    entry with the number of items processed and the mean, median
+    (`p50`), 90th and 99th percentile, and maximum number of seconds
+    taken for them, and a `timeouts` entry with the number of items
+    that exceeded *timeout*, if any.
+    """
+
+    def __init__(self,
+                 grm: util.PathLike,
+                 cmdargs: List[str] = None,
+                 executable: util.PathLike = None,
+                 env: Mapping[str, str] = None,
+                 tsdbinfo: bool = True,
+                 full_forest: bool = False,
+                 stderr: IO[Any] = None,
+                 cache: ResponseCache = None,
+                 timeout: float = None):
+        super().__init__(grm, cmdargs=cmdargs, executable=executable, env=env,
+                         tsdbinfo=tsdbinfo, full_forest=full_forest,
+                         stderr=stderr, cache=cache, timeout=timeout)
+        self._watchdog = _Watchdog(timeout)
+        self._open()
+
+    def _open(self) -> None:
+        self._p = Popen(
+            self._args(),
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=self._stderr,
+            env=self.env,
+            universal_newlines=True
+        )
+        self._start_run()
         if self._p.poll() is not None and self._p.returncode != 0:
             raise ACEProcessError("ACE process closed on startup")
 
+    @property
+    def alive(self) -> bool:
+        """`True` if the ACE process has not exited or been closed."""
+        return self._p.poll() is None
+
     def __enter__(self):
         return self
 
@@ -150,7 +604,6 @@ class ACEProcess(interface.Processor):
         return False  # don't try to handle any exceptions
 
     def _result_lines(self, termini: List[Pattern[str]] = None) -> List[str]:
-        poll = self._p.poll
         assert self._p.stdout is not None, 'cannot receive output from ACE'
         next_line = self._p.stdout.readline
 
@@ -162,7 +615,9 @@ class ACEProcess(interface.Processor):
         lines = []
         while i < end:
             s = next_line()
-            if s == '' and poll() is not None:
+            # only EOF gives an empty string, but the process may not
+            # have exited yet, so don't rely on poll()
+            if s == '':
                 logger.info(
                     'Process closed unexpectedly; giving up.'
                 )
@@ -179,13 +634,6 @@ class ACEProcess(interface.Processor):
                     i += 1
         return [line for line in lines if line != '']
 
-    def _read_run_info(self, line: str) -> None:
-        assert line.startswith('NOTE: tsdb run:')
-        for key, value in _sexpr_data(line[15:].lstrip()):
-            if key == ':application':
-                continue  # PyDelphin sets 'application'
-            self.run_info[key.lstrip(':')] = value
-
     def send(self, datum: str) -> None:
         """
         Send *datum* (e.g. a sentence or MRS) to ACE.
@@ -218,20 +666,17 @@ class ACEProcess(interface.Processor):
             the :meth:`interact` method for most data-processing tasks
             with ACE.
         """
-        raise NotImplementedError()
-
-    def _default_receive(self) -> interface.Response:
-        raise NotImplementedError()
-
-    def _tsdb_receive(self) -> interface.Response:
-        lines = self._result_lines()
-        response, lines = _make_response(lines, self.run_info)
+        lines = self._result_lines(self._current_termini())
+        response = self._interpret(lines)
+        timed_out = False
+        timing = self._watchdog.stop()
+        if timing is not None:  # started by interact()
+            seconds, timed_out = timing
+            self._end_item(response, seconds, timed_out)
         # now it should be safe to reopen a closed process (if necessary)
-        if self._p.poll() is not None:
+        if (self._tsdbinfo or timed_out) and self._p.poll() is not None:
             logger.info('Attempting to restart ACE.')
             self._open()
-        line = ' '.join(lines)  # ACE 0.9.24 on Mac puts superfluous newlines
-        response = _tsdb_response(response, line)
         return response
 
     def interact(self, datum: str) -> interface.Response:
@@ -253,15 +698,18 @@ class ACEProcess(interface.Processor):
             :class:`~delphin.interface.Response`
         """
         validated = self._validate_input(datum)
-        if validated:
-            self.send(validated)
-            result = self.receive()
+        if not validated:
+            result = self._refuse(datum)
         else:
-            result, lines = _make_response(
-                [('NOTE: PyDelphin could not validate the input and '
-                  'refused to send it to ACE'),
-                 f'SKIP: {datum}'],
-                self.run_info)
+            result = self._cached(validated)
+            if result is None:
+                run = self.run_info
+                self._watchdog.start(self._p.kill)
+                self.send(validated)
+                result = self.receive()
+                # don't cache the response if ACE closed while reading it
+                if self.run_info is run and self._p.poll() is None:
+                    self._store(validated, result)
         result['input'] = datum
         return result
 
@@ -281,20 +729,133 @@ class ACEProcess(interface.Processor):
         Returns:
             :class:`~delphin.interface.Response`
         """
-        response = self.interact(datum)
-        if keys is not None:
-            response['keys'] = keys
-        if 'task' not in response and self.task is not None:
-            response['task'] = self.task
-        return response
+        return self._finish(self.interact(datum), keys)
+
+    def interact_many(self,
+                      data: Iterable[str],
+                      window: int = 4) -> Iterator[interface.Response]:
+        """
+        Send each datum in *data* to ACE and yield the responses.
+
+        Unlike calling :meth:`interact` for each datum, up to *window*
+        inputs are sent ahead to ACE, and a separate thread reads the
+        responses as soon as ACE writes them. ACE thus keeps working
+        while the caller handles the previous responses. Responses
+        are yielded in the order of *data*.
+
+        If ACE closes unexpectedly (e.g., it crashes on an input), the
+        response for that input is yielded and ACE is restarted to
+        process the remaining inputs.
+
+        Args:
+            data: the input sentences or MRSs
+            window (int): the maximum number of inputs sent to ACE
+                but not yet yielded
+        Yields:
+            :class:`~delphin.interface.Response`
+        Example:
+            >>> with ace.ACEParser('erg.dat') as parser:
+            ...     for response in parser.interact_many(sentences):
+            ...         print(len(response.results()))
+        """
+        if window < 1:
+            raise ValueError('window must be a positive integer')
+        inputs = iter(data)
+        # (datum, validated, cached response)
+        inflight: Deque[Tuple[str, str, Optional[interface.Response]]]
+        inflight = deque()
+        reader = _ResponseReader(self)
+        try:
+            while True:
+                while len(inflight) < window:
+                    try:
+                        datum = next(inputs)
+                    except StopIteration:
+                        break
+                    validated = self._validate_input(datum)
+                    cached = None
+                    if validated:
+                        cached = self._cached(validated)
+                        if cached is None:
+                            reader.expect()
+                            self._send_ahead(validated)
+                    inflight.append((datum, validated, cached))
+                if not inflight:
+                    break
+                datum, validated, response = inflight.popleft()
+                if response is not None:
+                    response['run'] = self.run_info  # ACE may have restarted
+                elif validated:
+                    response, closed = reader.next()
+                    if closed:
+                        logger.info('Attempting to restart ACE.')
+                        reader.stop()
+                        self._open()
+                        reader = _ResponseReader(self)
+                        # anything sent after the failed input was lost
+                        for _, _validated, _cached in inflight:
+                            if _validated and _cached is None:
+                                reader.expect()
+                                self._send_ahead(_validated)
+                    else:
+                        self._store(validated, response)
+                else:
+                    response = self._refuse(datum)
+                response['input'] = datum
+                yield response
+        finally:
+            reader.stop()
+
+    def process_items(
+            self,
+            items: Iterable[Tuple[str, Dict[str, Any]]],
+            window: int = 4) -> Iterator[interface.Response]:
+        """
+        Send each datum in *items* to ACE and yield the responses.
+
+        This is like calling :meth:`process_item` on each
+        `(datum, keys)` pair in *items*, but inputs are sent ahead as
+        with :meth:`interact_many`.
+
+        Args:
+            items: pairs of an input sentence or MRS and a mapping of
+                item identifier names and values
+            window (int): the maximum number of inputs sent to ACE
+                but not yet yielded
+        Yields:
+            :class:`~delphin.interface.Response`
+        """
+        pending: Deque[Dict[str, Any]] = deque()
+
+        def data():
+            for datum, keys in items:
+                pending.append(keys)
+                yield datum
+
+        for response in self.interact_many(data(), window=window):
+            yield self._finish(response, pending.popleft())
+
+    def _send_ahead(self, datum: str) -> None:
+        assert self._p.stdin is not None, 'cannot send inputs to ACE'
+        try:
+            self._p.stdin.write((datum.rstrip() + '\n'))
+            self._p.stdin.flush()
+        except (IOError, OSError, ValueError):
+            # the reader reports the closed process and the input is
+            # sent again when ACE is restarted
+            logger.debug('could not send input to ACE: %s', datum)
 
     def close(self) -> int:
         """
         Close the ACE process and return the process's exit code.
         """
         self.run_info['end'] = datetime.now()
+        self._summarize_run()
         if self._p.stdin is not None:
-            self._p.stdin.close()
+            try:
+                self._p.stdin.close()
+            except OSError:
+                pass  # inputs sent ahead were left unread by ACE
         if self._p.stdout is not None:
             for line in self._p.stdout:
                 if line.startswith('NOTE: tsdb run:'):
@@ -304,118 +865,351 @@ class ACEProcess(interface.Processor):
         retval = self._p.wait()
         return retval
 
-    def _validate_input(self, datum: str) -> str:
-        raise NotImplementedError()
 
+class _ResponseReader(object):
+    """
+    Read responses from an ACEProcess in a background thread.
 
-class ACEParser(ACEProcess):
+    Each call to :meth:`expect` tells the reader to read one more
+    response, and :meth:`next` returns the responses in order along
+    with whether the ACE process has closed. After the process closes
+    no more responses are read.
     """
-    A class for managing parse requests with ACE.
 
-    See :class:`ACEProcess` for initialization parameters.
+    def __init__(self, cpu: ACEProcess) -> None:
+        self._cpu = cpu
+        self._p = cpu._p
+        self._requests: 'queue.Queue[bool]' = queue.Queue()
+        self._responses: 'queue.Queue[Any]' = queue.Queue()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def expect(self) -> None:
+        self._requests.put(True)
+
+    def next(self) -> Tuple[interface.Response, bool]:
+        response, closed = self._responses.get()
+        if isinstance(response, BaseException):
+            raise response
+        return response, closed
+
+    def stop(self) -> None:
+        """Wait until the expected responses have been read."""
+        self._requests.put(False)
+        self._thread.join()
+
+    def _read(self) -> None:
+        cpu = self._cpu
+        termini = cpu._current_termini()
+        watchdog = _Watchdog(cpu.timeout)
+        try:
+            while self._requests.get():
+                watchdog.start(self._p.kill)
+                lines = cpu._result_lines(termini)
+                seconds, timed_out = watchdog.stop()  # type: ignore
+                response = cpu._interpret(lines)
+                cpu._end_item(response, seconds, timed_out)
+                # _result_lines() closes the process when output ends
+                # early; polling instead could also catch ACE exiting
+                # on the next input just after a complete response
+                closed = self._p.stdin is None or self._p.stdin.closed
+                self._responses.put((response, closed))
+                if closed:
+                    break
+        except Exception as exc:
+            self._responses.put((exc, True))
+
+
+class _Watchdog(object):
     """
+    Time the items processed by ACE and stop ACE if one takes too long.
 
-    task = 'parse'
-    _termini = [re.compile(r'^$'), re.compile(r'^$')]
+    If *timeout* is not `None` and :meth:`stop` is not called within
+    *timeout* seconds of :meth:`start`, the *kill* function given to
+    :meth:`start` is called.
+    """
 
-    def _validate_input(self, datum: str):
-        # valid input for parsing is non-empty
-        # (this relies on an empty string evaluating to False)
-        return isinstance(datum, str) and datum.strip()
+    def __init__(self, timeout: Optional[float]) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._started: Optional[float] = None
+        self._expired = False
+
+    def start(self, kill: Callable[[], Any]) -> None:
+        with self._lock:
+            self._started = time.perf_counter()
+            self._expired = False
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, self._expire, ())
+                timer.args = (timer, kill)
+                timer.daemon = True
+                self._timer = timer
+                timer.start()
+
+    def stop(self) -> Optional[Tuple[float, bool]]:
+        """
+        Return the seconds since :meth:`start` and whether the timeout
+        expired, or `None` if the watchdog was not started.
+        """
+        with self._lock:
+            if self._started is None:
+                return None
+            if self._timer is not None:
+                self._timer.cancel()
+            seconds = time.perf_counter() - self._started
+            result = (seconds, self._expired)
+            self._timer = self._started = None
+            self._expired = False
+        return result
 
-    def _default_receive(self):
-        lines = self._result_lines()
-        response, lines = _make_response(lines, self.run_info)
-        response['results'] = [
-            dict(zip(('mrs', 'derivation'), map(str.strip, line.split(' ; '))))
-            for line in lines
-        ]
-        return response
+    def _expire(self, timer: threading.Timer, kill: Callable[[], Any]):
+        with self._lock:
+            if timer is not self._timer:
+                return  # stopped before the timer went off
+            self._expired = True
+        logger.warning('ACE exceeded the timeout of %s seconds', self.timeout)
+        try:
+            kill()
+        except OSError:
+            pass  # already closed
 
 
-class ACETransferer(ACEProcess):
+class ACEParser(_ParseTask, ACEProcess):
     """
-    A class for managing transfer requests with ACE.
+    A class for managing parse requests with ACE.
 
     See :class:`ACEProcess` for initialization parameters.
     """
 
-    task = 'transfer'
-    _termini = [re.compile(r'^$')]
-
-    def __init__(self,
-                 grm: util.PathLike,
-                 cmdargs: List[str] = None,
-                 executable: util.PathLike = None,
-                 env: Mapping[str, str] = None,
-                 stderr: IO[Any] = None):
-        super().__init__(grm, cmdargs=cmdargs, executable=executable, env=env,
-                         tsdbinfo=False, full_forest=False, stderr=stderr)
 
-    def _validate_input(self, datum):
-        return _possible_mrs(datum)
+class ACETransferer(_TransferTask, ACEProcess):
+    """
+    A class for managing transfer requests with ACE.
 
-    def _default_receive(self):
-        lines = self._result_lines()
-        response, lines = _make_response(lines, self.run_info)
-        response['results'] = [{'mrs': line.strip()} for line in lines]
-        return response
+    See :class:`ACEProcess` for initialization parameters.
+    """
 
 
-class ACEGenerator(ACEProcess):
+class ACEGenerator(_GenerateTask, ACEProcess):
     """
     A class for managing realization requests with ACE.
 
     See :class:`ACEProcess` for initialization parameters.
     """
 
-    task = 'generate'
-    _cmdargs = ['-e', '--tsdb-notes']
-    _termini = [re.compile(r'NOTE: tsdb parse: ')]
 
-    def __init__(self,
-                 grm: util.PathLike,
-                 cmdargs: List[str] = None,
-                 executable: util.PathLike = None,
-                 env: Mapping[str, str] = None,
-                 tsdbinfo: bool = True,
-                 stderr: IO[Any] = None):
-        super().__init__(grm, cmdargs=cmdargs, executable=executable, env=env,
-                         tsdbinfo=tsdbinfo, full_forest=False, stderr=stderr)
+class AsyncACEProcess(_ACEBase):
+    """
+    The base class for interfacing ACE with :mod:`asyncio`.
+
+    This is the asynchronous counterpart of :class:`ACEProcess`: it
+    takes the same arguments and interprets ACE's outputs the same
+    way, but its methods for communicating with ACE are coroutines,
+    so one event loop can drive many ACE processes at once without
+    a thread for each. The ACE subprocess is started by
+    :meth:`start`, which is awaited when the instance is used as an
+    asynchronous context manager:
+
+    >>> async def parse_all(sentences):
+    ...     async with ace.AsyncACEParser('erg.dat') as parser:
+    ...         return [await parser.interact(s) for s in sentences]
+
+    Requests to one instance from concurrent tasks are handled one
+    at a time.
+    """
 
-    def _validate_input(self, datum):
-        return _possible_mrs(datum)
+    # the most bytes read for one line of ACE's output
+    _limit = 2 ** 26
 
-    def _default_receive(self):
-        show_tree = '--show-realization-trees' in self.cmdargs
-        show_mrs = '--show-realization-mrses' in self.cmdargs
+    _p: asyncio.subprocess.Process
 
-        lines = self._result_lines()
-        response, lines = _make_response(lines, self.run_info)
+    async def start(self) -> None:
+        """Start the ACE subprocess."""
+        self._lock = asyncio.Lock()
+        await self._open()
 
-        i, numlines = 0, len(lines)
-        results = []
-        while i < numlines:
-            result = {'SENT': lines[i].strip()}
-            i += 1
-            if show_tree and lines[i].startswith('DTREE = '):
-                result['derivation'] = lines[i][8:].strip()
-                i += 1
-            if show_mrs and lines[i].startswith('MRS = '):
-                result['mrs'] = lines[i][6:].strip()
-                i += 1
-            results.append(result)
-        response['results'] = results
+    async def _open(self) -> None:
+        self._p = await asyncio.create_subprocess_exec(
+            *self._args(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=self._stderr,
+            env=self.env,
+            limit=self._limit
+        )
+        self._start_run()
+        if self._p.returncode is not None and self._p.returncode != 0:
+            raise ACEProcessError("ACE process closed on startup")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False  # don't try to handle any exceptions
+
+    async def _result_lines(self,
+                            termini: List[Pattern[str]] = None) -> List[str]:
+        assert self._p.stdout is not None, 'cannot receive output from ACE'
+        next_line = self._p.stdout.readline
+
+        if termini is None:
+            termini = self._termini
+        i, end = 0, len(termini)
+        cur_terminus = termini[i]
+
+        lines = []
+        while i < end:
+            s = (await next_line()).decode(encoding)
+            if s == '':
+                logger.info(
+                    'Process closed unexpectedly; giving up.'
+                )
+                await self.close()
+                break
+            elif s.startswith('NOTE: tsdb run:'):
+                self._read_run_info(s.rstrip())
+            else:
+                lines.append(s.rstrip())
+                if cur_terminus.search(s):
+                    i += 1
+        return [line for line in lines if line != '']
+
+    async def send(self, datum: str) -> None:
+        """
+        Send *datum* (e.g. a sentence or MRS) to ACE.
+
+        Warning:
+          As with :meth:`ACEProcess.send`, use :meth:`interact`
+          instead for most data-processing tasks with ACE.
+        """
+        assert self._p.stdin is not None, 'cannot send inputs to ACE'
+        data = (datum.rstrip() + '\n').encode(encoding)
+        try:
+            self._p.stdin.write(data)
+            await self._p.stdin.drain()
+        except (IOError, OSError):
+            logger.info(
+                'Attempted to write to a closed process; attempting to reopen'
+            )
+            await self._open()
+            self._p.stdin.write(data)
+            await self._p.stdin.drain()
+
+    async def receive(self) -> interface.Response:
+        """
+        Return the stdout response from ACE.
+
+        Warning:
+            As with :meth:`ACEProcess.receive`, use :meth:`interact`
+            instead for most data-processing tasks with ACE.
+        """
+        lines = await self._result_lines(self._current_termini())
+        response = self._interpret(lines)
+        if self._tsdbinfo and self._p.returncode is not None:
+            logger.info('Attempting to restart ACE.')
+            await self._open()
         return response
 
-    def _tsdb_receive(self):
-        # with --tsdb-stdout, the notes line is not printed
-        lines = self._result_lines(termini=[re.compile(r'\(:results \.')])
-        response, lines = _make_response(lines, self.run_info)
-        line = ' '.join(lines)  # ACE 0.9.24 on Mac puts superfluous newlines
-        response = _tsdb_response(response, line)
+    async def interact(self, datum: str) -> interface.Response:
+        """
+        Send *datum* to ACE and return the response.
+
+        See :meth:`ACEProcess.interact`.
+        """
+        validated = self._validate_input(datum)
+        if not validated:
+            result = self._refuse(datum)
+        else:
+            result = self._cached(validated)
+            if result is None:
+                async with self._lock:
+                    run = self.run_info
+                    began = time.perf_counter()
+                    await self.send(validated)
+                    try:
+                        result = await asyncio.wait_for(
+                            self.receive(), self.timeout)
+                    except asyncio.TimeoutError:
+                        result = await self._restart_after_timeout(began)
+                    else:
+                        self._end_item(
+                            result, time.perf_counter() - began, False)
+                    if self.run_info is run and self._p.returncode is None:
+                        self._store(validated, result)
+        result['input'] = datum
+        return result
+
+    async def _restart_after_timeout(self,
+                                     began: float) -> interface.Response:
+        logger.warning('ACE exceeded the timeout of %s seconds', self.timeout)
+        response, _ = _make_response([], self.run_info)
+        try:
+            self._p.kill()
+        except ProcessLookupError:
+            pass  # already closed
+        await self.close()
+        self._end_item(response, time.perf_counter() - began, True)
+        await self._open()
         return response
 
+    async def process_item(self,
+                           datum: str,
+                           keys: Dict[str, Any] = None) -> interface.Response:
+        """
+        Send *datum* to ACE and return the response with context.
+
+        See :meth:`ACEProcess.process_item`.
+        """
+        return self._finish(await self.interact(datum), keys)
+
+    async def close(self) -> int:
+        """
+        Close the ACE process and return the process's exit code.
+        """
+        self.run_info['end'] = datetime.now()
+        self._summarize_run()
+        if self._p.stdin is not None:
+            self._p.stdin.close()
+        if self._p.stdout is not None:
+            while True:
+                line = (await self._p.stdout.readline()).decode(encoding)
+                if not line:
+                    break
+                elif line.startswith('NOTE: tsdb run:'):
+                    self._read_run_info(line)
+                else:
+                    logger.debug('ACE cleanup: %s', line.rstrip())
+        retval = await self._p.wait()
+        return retval
+
+
+class AsyncACEParser(_ParseTask, AsyncACEProcess):
+    """
+    A class for managing parse requests with ACE and :mod:`asyncio`.
+
+    See :class:`ACEProcess` for initialization parameters.
+    """
+
+
+class AsyncACETransferer(_TransferTask, AsyncACEProcess):
+    """
+    A class for managing transfer requests with ACE and :mod:`asyncio`.
+
+    See :class:`ACEProcess` for initialization parameters.
+    """
+
+
+class AsyncACEGenerator(_GenerateTask, AsyncACEProcess):
+    """
+    A class for managing realization requests with ACE and
+    :mod:`asyncio`.
+
+    See :class:`ACEProcess` for initialization parameters.
+    """
+
 
 def compile(cfg_path: util.PathLike,
             out_path: util.PathLike,
@@ -618,6 +1412,22 @@ def _ace_version(executable: str) -> Tuple[int, ...]:
     return version
 
 
+def _latency_stats(latencies: List[float]) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    n = len(ordered)
+
+    def percentile(p):
+        # nearest-rank method
+        return ordered[max(0, math.ceil(p / 100 * n) - 1)]
+
+    return {'items': n,
+            'mean': sum(ordered) / n,
+            'p50': percentile(50),
+            'p90': percentile(90),
+            'p99': percentile(99),
+            'max': ordered[-1]}
+
+
 def _possible_mrs(s: str) -> str:
     start, end = -1, -1
     depth = 0
@@ -669,18 +1479,18 @@ def _make_response(lines, run) -> Tuple[interface.Response, List[str]]:
 
 
 def _sexpr_data(line: str) -> Iterator[Dict[str, Any]]:
-    while line:
+    exprs = util.SExpr.iterparse(line)
+    while True:
         try:
-            expr = util.SExpr.parse(line)
+            data = next(exprs)
+        except StopIteration:
+            break
         except IndexError:
-            expr = util.SExprResult(
-                (':error', 'incomplete output from ACE'),
-                '')
-        if len(expr.data) != 2:
+            data = (':error', 'incomplete output from ACE')
+        if len(data) != 2:
             logger.error('Malformed output from ACE: %s', line)
             break
-        line = expr.remainder.lstrip()
-        yield expr.data
+        yield data
 
 
 def _tsdb_response(response: interface.Response,
@@ -43,7 +43,11 @@ def call_process(args):
         options=shlex.split(args.options),
         all_items=args.all_items,
         result_id=args.p,
-        gzip=args.gzip)
+        gzip=args.gzip,
+        jobs=args.jobs,
+        cache=args.cache,
+        resume=args.resume,
+        baseline=args.baseline)
 
 
 # process subparser
@@ -92,3 +96,16 @@ parser.add_argument(
 )
 parser.add_argument(
     '-z', '--gzip', action='store_true', help='compress table files with gzip')
+parser.add_argument(
+    '-j', '--jobs', metavar='N', type=int, default=1,
+    help='number of ACE processes to run concurrently (default: 1)')
+parser.add_argument(
+    '--cache', metavar='PATH',
+    help='reuse ACE responses stored in (and store new ones to) PATH')
+parser.add_argument(
+    '--resume', action='store_true',
+    help='continue an interrupted run from its last checkpoint')
+parser.add_argument(
+    '--baseline', metavar='PATH',
+    help=('previously processed copy of TESTSUITE; only process items '
+          'that are new or changed since and copy the rest'))
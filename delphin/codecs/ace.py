@@ -74,9 +74,7 @@ def _decode(lines):
             yield m
         # with --tsdb-stdout
         elif line.startswith('('):
-            while line:
-                data, remainder = SExpr.parse(line)
-                line = remainder.lstrip()
+            for data in SExpr.iterparse(line):
                 if len(data) == 2 and data[0] == ':results':
                     for result in data[1]:
                         for key, val in result:
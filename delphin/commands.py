@@ -7,6 +7,7 @@ from typing import Union, Iterator, IO, Dict, Any
 import sys
 from pathlib import Path
 import tempfile
+import contextlib
 import logging
 import warnings
 
@@ -545,7 +546,8 @@ def _mkprof_summarize(destination, schema):
 def process(grammar, testsuite, source=None, select=None,
             generate=False, transfer=False, full_forest=False,
             options=None, all_items=False, result_id=None, gzip=False,
-            stderr=None, report_progress=True):
+            stderr=None, report_progress=True, jobs=1, cache=None,
+            resume=False, baseline=None):
     """
     Process the [incr tsdb()] profile *testsuite* with *grammar*.
 
@@ -598,6 +600,19 @@ def process(grammar, testsuite, source=None, select=None,
         report_progress (bool): print a progress bar to stderr if
             `True` and logging verbosity is at WARNING or lower;
             (default: `True`)
+        jobs (int): number of ACE processes to run concurrently; the
+            inputs are distributed over them (default: `1`)
+        cache (str, ~pathlib.Path): path to a
+            :class:`~delphin.ace.ResponseCache` database; inputs
+            whose responses are cached are not sent to ACE again
+        resume (bool): if `True`, continue an interrupted run of
+            this command on *testsuite* from its last checkpoint
+            instead of starting over (see
+            :meth:`TestSuite.process() <delphin.itsdb.TestSuite.process>`)
+        baseline (str, ~pathlib.Path): path to a previously processed
+            copy of the test suite; only items that are new or whose
+            input changed since are processed, and the outputs of the
+            other items are copied from *baseline* (parsing only)
     """
     from delphin import ace
 
@@ -606,6 +621,8 @@ def process(grammar, testsuite, source=None, select=None,
 
     if not grammar.is_file():
         raise CommandError(f'{grammar} is not a file')
+    if jobs < 1:
+        raise CommandError(f'number of jobs must be positive: {jobs}')
 
     kwargs = {}
     kwargs['stderr'] = stderr
@@ -652,7 +669,11 @@ def process(grammar, testsuite, source=None, select=None,
 
         process_kwargs = {'selector': (relation, column),
                           'source': tmp,
-                          'gzip': gzip}
+                          'gzip': gzip,
+                          'resume': resume}
+        if baseline is not None:
+            process_kwargs['baseline'] = itsdb.TestSuite(
+                _validate_tsdb(baseline))
         bar = None
         if (report_progress
                 and len(tmp[relation])
@@ -660,10 +681,20 @@ def process(grammar, testsuite, source=None, select=None,
             bar = ProgressBar('Processing', max=len(tmp[relation]))
             process_kwargs['callback'] = lambda _: bar.next()
 
-        with processor(grammar, cmdargs=options, **kwargs) as cpu:
-            target.process(cpu, **process_kwargs)
+        with contextlib.ExitStack() as stack:
+            if cache is not None:
+                kwargs['cache'] = stack.enter_context(
+                    ace.ResponseCache(cache))
+            cpus = [stack.enter_context(
+                        processor(grammar, cmdargs=list(options or []),
+                                  **kwargs))
+                    for _ in range(jobs)]
+            target.process(cpus, **process_kwargs)
             if bar:
                 bar.finish()
+            if cache is not None:
+                logger.info('response cache: %(hits)d hits, %(misses)d misses',
+                            kwargs['cache'].stats())
 
 
 def _interpret_selection(select, source):
@@ -795,10 +826,19 @@ def repp(source, config=None, module=None, active=None,
 
 def compare(testsuite: Union[util.PathLike, itsdb.TestSuite],
             gold: Union[util.PathLike, itsdb.TestSuite],
-            select: str = 'i-id i-input mrs') -> Iterator[Dict]:
+            select: str = 'i-id i-input mrs',
+            buffer_size: int = 100000) -> Iterator[Dict]:
     """
     Compare two [incr tsdb()] profiles.
 
+    The selected rows are sorted by their identifiers, spilling to
+    temporary files when there are more than *buffer_size* of them
+    (see :func:`delphin.itsdb.sort_rows`), and then merged, so the
+    profiles are not compared in dictionaries held in memory. The
+    selection itself is not bounded by *buffer_size*: TSQL joins,
+    such as the join of the `parse` and `result` relations for the
+    default query, hold the joined relation in memory.
+
     Args:
         testsuite (str, ~pathlib.Path, TestSuite): path to the test
             [incr tsdb()] testsuite or a :class:`TestSuite` object
@@ -806,6 +846,8 @@ def compare(testsuite: Union[util.PathLike, itsdb.TestSuite],
             [incr tsdb()] testsuite or a :class:`TestSuite` object
         select: TSQL query to select (id, input, mrs) triples
             (default: `'i-id i-input mrs'`)
+        buffer_size: maximum number of rows to sort in memory
+            before spilling to temporary files
     Yields:
         dict: Comparison results as::
 
@@ -829,22 +871,35 @@ def compare(testsuite: Union[util.PathLike, itsdb.TestSuite],
 
     input_select = '{} {}'.format(queryobj['projection'][0],
                                   queryobj['projection'][1])
-    # typing of tsql.select() is complicated right now, so just ignore
-    # it for the following calls. it may be easier after
-    # https://github.com/delph-in/pydelphin/issues/258
-    i_inputs = dict(tsql.select(input_select, testsuite))  # type: ignore
 
-    matched_rows = itsdb.match_rows(
-        tsql.select(select, testsuite),  # type: ignore
-        tsql.select(select, gold),       # type: ignore
-        0)
+    def sorted_select(query, ts):
+        # typing of tsql.select() is complicated right now, so just
+        # ignore it. it may be easier after
+        # https://github.com/delph-in/pydelphin/issues/258
+        rows = tsql.select(query, ts)  # type: ignore
+        return itsdb.sort_rows(rows, 0, buffer_size=buffer_size)
 
-    for (key, testrows, goldrows) in matched_rows:
+    matched_rows = itsdb.match_rows(
+        sorted_select(select, testsuite),
+        sorted_select(select, gold),
+        0,
+        presorted=True)
+    # pair the matches with the inputs, which are also sorted by id
+    with_inputs = itsdb.match_rows(
+        sorted_select(input_select, testsuite),
+        matched_rows,  # type: ignore
+        0,
+        presorted=True)
+
+    for (key, inputs, matches) in with_inputs:
+        if not matches:
+            continue  # items without results in either profile
+        _, testrows, goldrows = matches[0]
         (test_unique, shared, gold_unique) = mrs.compare_bags(
             [simplemrs.decode(row[2]) for row in testrows],
             [simplemrs.decode(row[2]) for row in goldrows])
         yield {'id': key,
-               'input': i_inputs.get(key),
+               'input': inputs[0][1] if inputs else None,
                'test': test_unique,
                'shared': shared,
                'gold': gold_unique}
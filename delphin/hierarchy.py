@@ -61,6 +61,13 @@ class MultiHierarchy(object):
     >>> h.children('*top*')
     {'a'}
 
+    Queries about subsumption, compatibility, descendants, and
+    greatest lower bounds (see :meth:`glb`) use a bit-vector encoding
+    of the transitive closure of the hierarchy. The encoding is
+    computed on the first such query and is extended as nodes are
+    added by :meth:`update`, so large hierarchies may be updated
+    freely but pay for the encoding only when it is used.
+
     Args:
         top: the unique top identifier
         hierarchy: a mapping of node identifiers to parents (see
@@ -85,6 +92,10 @@ class MultiHierarchy(object):
         self._hier = {top: ()}
         self._loer = {top: set()}
         self._data = {}
+        # bit-vector encoding; see _encode()
+        self._ids = None
+        self._index = None
+        self._desc = None
         if hierarchy is not None:
             self.update(hierarchy, data)
 
@@ -164,6 +175,7 @@ class MultiHierarchy(object):
         # modify these locally in case of errors
         hier = dict(self._hier)
         loer = dict(self._loer)
+        added = []
 
         while subhierarchy:
             eligible = _get_eligible(hier, subhierarchy)
@@ -175,11 +187,14 @@ class MultiHierarchy(object):
                 loer[identifier] = set()
                 for parent in parents:
                     loer[parent].add(identifier)
+                added.append(identifier)
 
         # assign to self if all tests have passed
         self._hier = hier
         self._loer = loer
         self._data.update(data)
+        if self._desc is not None:
+            self._extend_encoding(added)
 
     def parents(self, identifier):
         """Return the immediate parents of *identifier*."""
@@ -199,10 +214,16 @@ class MultiHierarchy(object):
     def descendants(self, identifier):
         """Return the descendants of *identifier*."""
         identifier = self._norm(identifier)
+        index, desc = self._encoding()
+        i = index[identifier]
+        ids = self._ids
+        # bit k of the reversed binary string is node i+k+1
+        bits = bin(desc[i] >> 1)[:1:-1]
         xs = set()
-        for child in self._loer[identifier]:
-            xs.add(child)
-            xs.update(self.descendants(child))
+        k = bits.find('1')
+        while k != -1:
+            xs.add(ids[i + k + 1])
+            k = bits.find('1', k + 1)
         return xs
 
     def subsumes(self, a, b):
@@ -232,7 +253,14 @@ class MultiHierarchy(object):
         """
         norm = self._norm
         a, b = norm(a), norm(b)
-        return a == b or b in self.descendants(a)
+        if a == b:
+            return True
+        index, desc = self._encoding()
+        i = index[a]
+        j = index.get(b)
+        if j is None or j < i:
+            return False
+        return bool((desc[i] >> (j - i)) & 1)
 
     def compatible(self, a, b):
         """
@@ -258,9 +286,95 @@ class MultiHierarchy(object):
         """
         norm = self._norm
         a, b = norm(a), norm(b)
-        a_lineage = self.descendants(a).union([a])
-        b_lineage = self.descendants(b).union([b])
-        return len(a_lineage.intersection(b_lineage)) > 0
+        index, desc = self._encoding()
+        i, j = sorted((index[a], index[b]))
+        return bool((desc[i] >> (j - i)) & desc[j])
+
+    def glb(self, a, b):
+        """
+        Return the greatest lower bound of nodes *a* and *b*.
+
+        The greatest lower bound (GLB) is the common descendant of *a*
+        and *b* (possibly *a* or *b* itself) that subsumes all other
+        common descendants. If *a* and *b* are not compatible, `None`
+        is returned.
+
+        Args:
+            a: a node identifier
+            b: a node identifier
+        Raises:
+            HierarchyError: when *a* and *b* are compatible but do not
+                have a unique greatest lower bound
+        Examples:
+            >>> h = MultiHierarchy('*top*', {'a': '*top*',
+            ...                              'b': '*top*',
+            ...                              'c': 'a b',
+            ...                              'd': 'c'})
+            >>> h.glb('a', 'b')
+            'c'
+            >>> h.glb('a', 'd')
+            'd'
+            >>> h.glb('c', h.top)
+            'c'
+            >>> h.update({'e': 'a'})
+            >>> print(h.glb('b', 'e'))
+            None
+        """
+        norm = self._norm
+        a, b = norm(a), norm(b)
+        index, desc = self._encoding()
+        i, j = sorted((index[a], index[b]))
+        # common descendants relative to node j
+        common = (desc[i] >> (j - i)) & desc[j]
+        if not common:
+            return None
+        # a unique GLB precedes all other common descendants in the
+        # topological order, so it can only be the lowest set bit
+        k = (common & -common).bit_length() - 1
+        if desc[j + k] << k != common:
+            raise HierarchyError(
+                f'no unique greatest lower bound for {a} and {b}')
+        return self._ids[j + k]
+
+    def _encoding(self):
+        if self._desc is None:
+            self._encode()
+        return self._index, self._desc
+
+    def _encode(self):
+        # Nodes are numbered in insertion order, which is topological
+        # (parents precede children), so every descendant of node i
+        # has a number greater than i. The descendants of node i,
+        # including itself, are encoded as the integer desc[i] whose
+        # bit k is set if node i+k is a descendant. Storing the bits
+        # relative to i keeps the integers small for lower nodes.
+        ids = list(self._hier)
+        index = {id: i for i, id in enumerate(ids)}
+        loer = self._loer
+        desc = [1] * len(ids)
+        for i in range(len(ids) - 1, -1, -1):
+            bits = 1
+            for child in loer[ids[i]]:
+                j = index[child]
+                bits |= desc[j] << (j - i)
+            desc[i] = bits
+        self._ids = ids
+        self._index = index
+        self._desc = desc
+
+    def _extend_encoding(self, identifiers):
+        # new nodes are leaves when added, so they only add a bit to
+        # each of their ancestors
+        ids, index, desc = self._ids, self._index, self._desc
+        hier = self._hier
+        for identifier in identifiers:
+            j = len(ids)
+            ids.append(identifier)
+            index[identifier] = j
+            desc.append(1)
+            for ancestor in _ancestors(identifier, hier):
+                i = index[ancestor]
+                desc[i] |= 1 << (j - i)
 
     def validate_update(self, subhierarchy, data):
         """
@@ -289,9 +403,12 @@ class MultiHierarchy(object):
 
 def _ancestors(id, hier):
     xs = set()
-    for parent in hier[id]:
-        xs.add(parent)
-        xs.update(_ancestors(parent, hier))
+    agenda = list(hier[id])
+    while agenda:
+        parent = agenda.pop()
+        if parent not in xs:
+            xs.add(parent)
+            agenda.extend(hier[parent])
     return xs
 
 
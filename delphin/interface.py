@@ -55,14 +55,65 @@ class Processor(object):
         """
         raise NotImplementedError()
 
+    def process_items(self, items):
+        """
+        Process each `(datum, keys)` pair in *items* and yield results.
+
+        Responses are yielded in the order of *items*. By default this
+        calls :meth:`process_item` for each pair in turn, but
+        processors may override it to process several items at once.
+
+        Args:
+            items: an iterable of pairs of a datum and its keys, as
+                given to :meth:`process_item`
+        """
+        for datum, keys in items:
+            yield self.process_item(datum, keys=keys)
+
+
+def _memoized(obj, name, sources, decode):
+    """
+    Return the result of *decode* for *obj*, computing it only once.
+
+    The result is kept on *obj* under *name* along with the *sources*
+    it was decoded from, and it is decoded again if any of the
+    current *sources* is not the same object as before (e.g., when a
+    dictionary key is reassigned).
+    """
+    if not obj.memoize:
+        return decode()
+    memo = obj.__dict__.setdefault('_memo', {})
+    if name in memo:
+        previous, value = memo[name]
+        if all(a is b for a, b in zip(previous, sources)):
+            return value
+    value = decode()
+    memo[name] = (sources, value)
+    return value
+
 
 class Result(dict):
     """
     A wrapper around a result dictionary to automate deserialization
     for supported formats. A Result is still a dictionary, so the
     raw data can be obtained using dict access.
+
+    The objects returned by the deserialization methods (e.g.,
+    :meth:`mrs`) are kept and returned again by subsequent calls, so
+    they should not be modified by the caller unless they are copied
+    first. They are decoded again if the corresponding key is
+    reassigned, but not if its value is modified in place. Set the
+    :attr:`memoize` attribute to `False` on a result, or on the
+    class, to decode the values on every call instead, e.g., to save
+    memory when many results are processed once.
+
+    Attributes:
+        memoize (bool): if `True` (the default), keep deserialized
+            objects for subsequent calls
     """
 
+    memoize = True
+
     def __repr__(self):
         return 'Result({})'.format(dict.__repr__(self))
 
@@ -81,17 +132,8 @@ class Result(dict):
                 :mod:`delphin.derivation` is unavailable
         """
         drv = self.get('derivation')
-        try:
-            from delphin import derivation
-            if isinstance(drv, dict):
-                drv = derivation.from_dict(drv)
-            elif isinstance(drv, str):
-                drv = derivation.from_string(drv)
-            elif drv is not None:
-                raise TypeError(drv.__class__.__name__)
-        except (ImportError, TypeError) as exc:
-            raise InterfaceError('can not get Derivation object') from exc
-        return drv
+        return _memoized(self, 'derivation', (drv,),
+                         lambda: _decode_derivation(drv))
 
     def tree(self):
         """
@@ -101,26 +143,9 @@ class Result(dict):
         derivation.
         """
         tree = self.get('tree')
-
-        if isinstance(tree, str):
-            tree = util.SExpr.parse(tree).data
-
-        elif tree is None:
-            drv = self.get('derivation')
-            if isinstance(drv, dict) and 'label' in drv:
-
-                def _extract_tree(d):
-                    t = [d.get('label', '')]
-                    if 'tokens' in d:
-                        t.append([d.get('form', '')])
-                    else:
-                        for dtr in d.get('daughters', []):
-                            t.append(_extract_tree(dtr))
-                    return t
-
-                tree = _extract_tree(drv)
-
-        return tree
+        drv = self.get('derivation')
+        return _memoized(self, 'tree', (tree, drv),
+                         lambda: _decode_tree(tree, drv))
 
     def mrs(self):
         """
@@ -137,18 +162,7 @@ class Result(dict):
                 the corresponding module is unavailable
         """
         mrs = self.get('mrs')
-        try:
-            if isinstance(mrs, dict):
-                from delphin.codecs import mrsjson
-                mrs = mrsjson.from_dict(mrs)
-            elif isinstance(mrs, str):
-                from delphin.codecs import simplemrs
-                mrs = simplemrs.decode(mrs)
-            elif mrs is not None:
-                raise TypeError(mrs.__class__.__name__)
-        except (ImportError, TypeError) as exc:
-            raise InterfaceError('can not get MRS object') from exc
-        return mrs
+        return _memoized(self, 'mrs', (mrs,), lambda: _decode_mrs(mrs))
 
     def eds(self):
         """
@@ -158,25 +172,22 @@ class Result(dict):
         `eds` key in the result is a valid "native" EDS serialization,
         or if :mod:`delphin.codecs.edsjson` is available and the value
         is a dictionary, return the interpreted EDS object. If there
-        is no `eds` key in the result, return `None`.
+        is no `eds` key in the result but there is an `mrs` key, the
+        EDS is converted from the MRS given by :meth:`mrs`. Otherwise
+        return `None`.
 
         Raises:
             InterfaceError: when the value is an unsupported type or
                 the corresponding module is unavailable
+            EDSError: when the EDS is converted from the MRS and the
+                conversion fails
         """
         eds = self.get('eds')
-        try:
-            if isinstance(eds, dict):
-                from delphin.codecs import edsjson
-                eds = edsjson.from_dict(eds)
-            elif isinstance(eds, str):
-                from delphin.codecs import eds as edsnative
-                eds = edsnative.decode(eds)
-            elif eds is not None:
-                raise TypeError(eds.__class__.__name__)
-        except (ImportError, TypeError) as exc:
-            raise InterfaceError('can not get EDS object') from exc
-        return eds
+        mrs = self.get('mrs')
+        if eds is None and mrs is not None:
+            return _memoized(self, 'eds', (eds, mrs),
+                             lambda: _convert_mrs(self.mrs(), 'eds'))
+        return _memoized(self, 'eds', (eds, mrs), lambda: _decode_eds(eds))
 
     def dmrs(self):
         """
@@ -185,41 +196,154 @@ class Result(dict):
         If :mod:`delphin.codecs.dmrsjson` is available and the value
         of the `dmrs` key in the result is a dictionary, return the
         interpreted DMRS object. If there is no `dmrs` key in the
-        result, return `None`.
+        result but there is an `mrs` key, the DMRS is converted from
+        the MRS given by :meth:`mrs`. Otherwise return `None`.
 
         Raises:
             InterfaceError: when the value is not a dictionary or
                 :mod:`delphin.codecs.dmrsjson` is unavailable
+            DMRSError: when the DMRS is converted from the MRS and the
+                conversion fails
         """
         dmrs = self.get('dmrs')
-        try:
-            if isinstance(dmrs, dict):
-                from delphin.codecs import dmrsjson
-                dmrs = dmrsjson.from_dict(dmrs)
-            elif dmrs is not None:
-                raise TypeError(dmrs.__class__.__name__)
-        except (ImportError, TypeError) as exc:
-            raise InterfaceError('can not get DMRS object') from exc
-        return dmrs
+        mrs = self.get('mrs')
+        if dmrs is None and mrs is not None:
+            return _memoized(self, 'dmrs', (dmrs, mrs),
+                             lambda: _convert_mrs(self.mrs(), 'dmrs'))
+        return _memoized(self, 'dmrs', (dmrs, mrs),
+                         lambda: _decode_dmrs(dmrs))
+
+
+def _decode_derivation(drv):
+    try:
+        from delphin import derivation
+        if isinstance(drv, dict):
+            drv = derivation.from_dict(drv)
+        elif isinstance(drv, str):
+            drv = derivation.from_string(drv)
+        elif drv is not None:
+            raise TypeError(drv.__class__.__name__)
+    except (ImportError, TypeError) as exc:
+        raise InterfaceError('can not get Derivation object') from exc
+    return drv
+
+
+def _decode_tree(tree, drv):
+    if isinstance(tree, str):
+        tree = util.SExpr.parse(tree).data
+
+    elif tree is None:
+        if isinstance(drv, dict) and 'label' in drv:
+
+            def _extract_tree(d):
+                t = [d.get('label', '')]
+                if 'tokens' in d:
+                    t.append([d.get('form', '')])
+                else:
+                    for dtr in d.get('daughters', []):
+                        t.append(_extract_tree(dtr))
+                return t
+
+            tree = _extract_tree(drv)
+
+    return tree
+
+
+def _decode_mrs(mrs):
+    try:
+        if isinstance(mrs, dict):
+            from delphin.codecs import mrsjson
+            mrs = mrsjson.from_dict(mrs)
+        elif isinstance(mrs, str):
+            from delphin.codecs import simplemrs
+            mrs = simplemrs.decode(mrs)
+        elif mrs is not None:
+            raise TypeError(mrs.__class__.__name__)
+    except (ImportError, TypeError) as exc:
+        raise InterfaceError('can not get MRS object') from exc
+    return mrs
+
+
+def _decode_eds(eds):
+    try:
+        if isinstance(eds, dict):
+            from delphin.codecs import edsjson
+            eds = edsjson.from_dict(eds)
+        elif isinstance(eds, str):
+            from delphin.codecs import eds as edsnative
+            eds = edsnative.decode(eds)
+        elif eds is not None:
+            raise TypeError(eds.__class__.__name__)
+    except (ImportError, TypeError) as exc:
+        raise InterfaceError('can not get EDS object') from exc
+    return eds
+
+
+def _decode_dmrs(dmrs):
+    try:
+        if isinstance(dmrs, dict):
+            from delphin.codecs import dmrsjson
+            dmrs = dmrsjson.from_dict(dmrs)
+        elif dmrs is not None:
+            raise TypeError(dmrs.__class__.__name__)
+    except (ImportError, TypeError) as exc:
+        raise InterfaceError('can not get DMRS object') from exc
+    return dmrs
+
+
+def _convert_mrs(mrs, target):
+    try:
+        if target == 'eds':
+            from delphin import eds
+            return eds.from_mrs(mrs)
+        else:
+            from delphin import dmrs
+            return dmrs.from_mrs(mrs)
+    except ImportError as exc:
+        raise InterfaceError(f'can not get {target.upper()} object') from exc
 
 
 class Response(dict):
     """
     A wrapper around the response dictionary for more convenient
     access to results.
+
+    The result dictionaries are replaced by :class:`Result` objects
+    when they are first accessed with :meth:`results` or
+    :meth:`result`, so objects deserialized from a result are kept
+    across calls (see :class:`Result`). Tokens deserialized by
+    :meth:`tokens` are kept likewise unless the :attr:`memoize`
+    attribute is `False`.
+
+    Attributes:
+        memoize (bool): if `True` (the default), keep deserialized
+            objects for subsequent calls
     """
     _result_cls = Result
 
+    memoize = True
+
     def __repr__(self):
         return 'Response({})'.format(dict.__repr__(self))
 
     def results(self):
         """Return Result objects for each result."""
-        return [self._result_cls(r) for r in self.get('results', [])]
+        results = self.get('results', [])
+        return [self._wrap_result(results, i) for i in range(len(results))]
 
     def result(self, i):
         """Return a Result object for the result *i*."""
-        return self._result_cls(self.get('results', [])[i])
+        results = self.get('results', [])
+        return self._wrap_result(results, range(len(results))[i])
+
+    def _wrap_result(self, results, i):
+        result = results[i]
+        if not isinstance(result, self._result_cls):
+            result = self._result_cls(result)
+            # keep the wrapper so its deserialized objects are reused
+            if self.memoize and isinstance(results, list):
+                results[i] = result
+        return result
 
     def tokens(self, tokenset='internal'):
         """
@@ -240,14 +364,19 @@ class Response(dict):
                 :mod:`delphin.tokens` is unavailble
         """
         toks = self.get('tokens', {}).get(tokenset)
-        try:
-            from delphin import tokens
-            if isinstance(toks, str):
-                toks = tokens.YYTokenLattice.from_string(toks)
-            elif isinstance(toks, Sequence):
-                toks = tokens.YYTokenLattice.from_list(toks)
-            elif toks is not None:
-                raise TypeError(toks.__class__.__name__)
-        except (KeyError, ImportError, TypeError) as exc:
-            raise InterfaceError('can not get YYTokenLattice object') from exc
-        return toks
+        return _memoized(self, 'tokens:' + tokenset, (toks,),
+                         lambda: _decode_tokens(toks))
+
+
+def _decode_tokens(toks):
+    try:
+        from delphin import tokens
+        if isinstance(toks, str):
+            toks = tokens.YYTokenLattice.from_string(toks)
+        elif isinstance(toks, Sequence):
+            toks = tokens.YYTokenLattice.from_list(toks)
+        elif toks is not None:
+            raise TypeError(toks.__class__.__name__)
+    except (KeyError, ImportError, TypeError) as exc:
+        raise InterfaceError('can not get YYTokenLattice object') from exc
+    return toks
@@ -5,15 +5,27 @@
 """
 
 from typing import (
-    Union, Iterable, Sequence, Tuple, List, Dict, Any,
+    Union, Iterable, Sequence, Tuple, List, Dict, Any, Deque,
     Iterator, Optional, IO, overload, Callable, cast as typing_cast
 )
 from pathlib import Path
 import tempfile
+import io
+import contextlib
+import heapq
+import json
+import os
+import pickle
+import queue
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
 import logging
 import collections
 import itertools
+import codecs
+import bisect
+import zlib
+from array import array
 
 from delphin import util
 from delphin import tsdb
@@ -34,6 +46,9 @@ _default_task_selectors = {
     'generate': ('result', 'mrs'),
 }
 
+# progress of an unfinished TestSuite.process() run
+_CHECKPOINT_FILENAME = '.process-checkpoint'
+
 
 #############################################################################
 # Exceptions
@@ -430,6 +445,11 @@ class Table(tsdb.Relation):
         self._rows: List[Optional[Row]] = []
         # storing the open file for __iter__ let's Table.close() work
         self._file: Optional[IO[str]] = None
+        # kept open across commits that only append rows
+        self._append_file: Optional[IO[bytes]] = None
+        # line offsets for random access; built on demand
+        self._index: Optional[_LineIndex] = None
+        self._indexed = False
 
         # These two numbers are needed to track if changes to the
         # table are only additions or if they remove/alter existing
@@ -449,6 +469,8 @@ class Table(tsdb.Relation):
     def _sync_with_file(self) -> None:
         """Clear in-memory structures so table is synced with the file."""
         self._rows = []
+        self._index = None
+        self._indexed = False
         i = -1
         with tsdb.open(self.dir,
                        self.name,
@@ -458,6 +480,48 @@ class Table(tsdb.Relation):
         self._persistent_count = i + 1
         self._volatile_index = i + 1
 
+    def _append_to_file(self) -> bool:
+        """
+        Write the rows added since the last commit to the table file.
+
+        The file stays open for subsequent appends until
+        :meth:`_close_append_file` is called, which
+        :meth:`TestSuite.commit` does unless it is called while
+        processing. Return `False` without
+        writing anything if the file cannot be appended to because it
+        is gzipped.
+        """
+        if self._append_file is None:
+            path = tsdb.get_path(self.dir, self.name)
+            if path.suffix == '.gz':
+                return False
+            self._append_file = path.open('ab+')
+            # don't join the first new row to an unterminated last line
+            if self._append_file.tell() > 0:
+                self._append_file.seek(-1, io.SEEK_END)
+                if self._append_file.read(1) != b'\n':
+                    self._append_file.write(b'\n')
+        fields = self.fields
+        encoding = self.encoding
+        start = self._persistent_count
+        self._append_file.write(b''.join(
+            (tsdb.join(row, fields) + '\n').encode(encoding)
+            for row in self._rows[start:]))
+        self._append_file.flush()
+        # the new rows are now read from the file like the others
+        rows = self._rows
+        for i in range(start, len(rows)):
+            rows[i] = None
+        self._persistent_count = self._volatile_index = len(rows)
+        self._index = None
+        self._indexed = False
+        return True
+
+    def _close_append_file(self) -> None:
+        if self._append_file is not None:
+            self._append_file.close()
+        self._append_file = None
+
     def __iter__(self) -> Iterator[Row]:
         if self._file is not None:
             self._file.close()
@@ -484,11 +548,13 @@ class Table(tsdb.Relation):
 
     def _iterslice(self, slice: slice) -> List[Row]:
         """Yield rows from a slice index."""
-        with tsdb.open(self.dir, self.name, encoding=self.encoding) as fh:
-            rows = [row for _, row in self._enum_rows(fh, slice)]
-            if slice.step is not None and slice.step < 0:
-                rows = list(reversed(rows))
-            return rows
+        indices = range(*slice.indices(len(self._rows)))
+        rows = self._rows
+        fetched = dict(self._read_rows(
+            sorted(i for i in indices if rows[i] is None)))
+        selected = (fetched.get(i) if rows[i] is None else rows[i]
+                    for i in indices)
+        return [row for row in selected if row is not None]
 
     def _getitem(self, index: int) -> Row:
         """Get a single non-slice index."""
@@ -497,19 +563,51 @@ class Table(tsdb.Relation):
             # need to handle negative indices manually
             if index < 0:
                 index = len(self._rows) + index
-            with tsdb.open(self.dir,
-                           self.name,
-                           encoding=self.encoding) as lines:
-                for i, line in enumerate(lines):
-                    if i == index:
-                        row = Row(self.fields,
-                                  tsdb.split(line),
-                                  field_index=self._field_index)
-                        break
+            for _, row in self._read_rows([index]):
+                break
         if row is None:
             raise ITSDBError('could not retrieve row {}'.format(index))
         return row
 
+    def _read_rows(self, indices: Sequence[int]) -> Iterator[Tuple[int, Row]]:
+        """
+        Yield pairs of (index, row) from the file for sorted *indices*.
+
+        Indices beyond the end of the file are skipped.
+        """
+        if not indices:
+            return
+        if not self._indexed:
+            path = tsdb.get_path(self.dir, self.name)
+            self._index = _make_line_index(path, self.encoding)
+            self._indexed = True
+
+        if self._index is not None:
+            count = len(self._index)
+            lines = self._index.read([i for i in indices if i < count])
+        else:
+            lines = self._scan_lines(indices)
+
+        fields = self.fields
+        field_index = self._field_index
+        for i, line in lines:
+            yield i, Row(fields, tsdb.split(line), field_index=field_index)
+
+    def _scan_lines(self, indices: Sequence[int]) -> Iterator[Tuple[int, str]]:
+        """Yield pairs of (index, line) by reading the whole file."""
+        wanted = iter(indices)
+        target = next(wanted, None)
+        with tsdb.open(self.dir,
+                       self.name,
+                       encoding=self.encoding) as lines:
+            for i, line in enumerate(lines):
+                while target is not None and target < i:
+                    target = next(wanted, None)
+                if target is None:
+                    break
+                if target == i:
+                    yield i, line
+
     @overload
     def __setitem__(self, index: int, value: Row) -> None:
         ...
@@ -673,6 +771,156 @@ class Table(tsdb.Relation):
             yield (i, row)
 
 
+def _make_line_index(path: Path, encoding: str) -> Optional['_LineIndex']:
+    """
+    Return a line index for the relation file at *path*, if possible.
+
+    Files cannot be indexed if the line delimiter is not a single
+    newline byte in *encoding* or if they are gzip files with more
+    than one member; `None` is returned for these.
+    """
+    if '\n'.encode(codecs.lookup(encoding).name) != b'\n':
+        return None
+    try:
+        if path.suffix.lower() == '.gz':
+            return _GzipLineIndex(path, encoding)
+        else:
+            return _LineIndex(path, encoding)
+    except _UnindexableError:
+        logger.debug('cannot index %s; falling back to linear scans', path)
+        return None
+
+
+class _UnindexableError(ITSDBError):
+    """Raised when a relation file cannot be indexed."""
+
+
+class _LineIndex(object):
+    """
+    Byte offsets of the line starts in a plain-text relation file.
+
+    Lines are read by seeking directly to their offsets, so any line
+    can be fetched in constant time once the index is built.
+    """
+
+    def __init__(self, path: Path, encoding: str) -> None:
+        self.path = path
+        self.encoding = encoding
+        offsets = array('q')
+        pos = 0
+        with path.open('rb') as fh:
+            for line in fh:
+                offsets.append(pos)
+                pos += len(line)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def read(self, indices: Iterable[int]) -> Iterator[Tuple[int, str]]:
+        """Yield pairs of (index, line) for the lines at *indices*."""
+        offsets = self._offsets
+        encoding = self.encoding
+        with self.path.open('rb') as fh:
+            for i in indices:
+                fh.seek(offsets[i])
+                yield i, fh.readline().decode(encoding)
+
+
+class _GzipLineIndex(_LineIndex):
+    """
+    Offsets of the line starts in a gzipped relation file.
+
+    Gzip streams cannot be seeked, so besides the offsets of the lines
+    in the decompressed data, checkpoints of the decompressor state
+    are saved every :attr:`_block_size` decompressed bytes. Reading a
+    line resumes decompression from the nearest checkpoint before it
+    instead of from the start of the file. Reading several lines in
+    ascending order continues from the previous line when possible.
+    """
+
+    _block_size = 512 * 1024
+    _chunk_size = 64 * 1024
+
+    def __init__(self, path: Path, encoding: str) -> None:
+        self.path = path
+        self.encoding = encoding
+        chunk_size = self._chunk_size
+        offsets = array('q')
+        decomp = zlib.decompressobj(zlib.MAX_WBITS | 16)  # gzip header
+        # checkpoints are (compressed offset, decompressor state)
+        checkpoints = [(0, decomp.copy())]
+        positions = [0]  # decompressed offset of each checkpoint
+        pos = 0
+        at_line_start = True
+        next_checkpoint = self._block_size
+        with path.open('rb') as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    break
+                data = decomp.decompress(chunk)
+                if decomp.eof and (decomp.unused_data or fh.read(1)):
+                    raise _UnindexableError(
+                        'multi-member gzip file: {!s}'.format(path))
+                if not data:
+                    continue
+                if at_line_start:
+                    offsets.append(pos)
+                end = len(data) - 1
+                j = data.find(b'\n')
+                while j != -1 and j < end:
+                    offsets.append(pos + j + 1)
+                    j = data.find(b'\n', j + 1)
+                at_line_start = j == end
+                pos += len(data)
+                if pos >= next_checkpoint:
+                    checkpoints.append((fh.tell(), decomp.copy()))
+                    positions.append(pos)
+                    next_checkpoint = pos + self._block_size
+        self._offsets = offsets
+        self._checkpoints = checkpoints
+        self._positions = positions
+
+    def read(self, indices: Iterable[int]) -> Iterator[Tuple[int, str]]:
+        """Yield pairs of (index, line) for the lines at *indices*."""
+        offsets = self._offsets
+        count = len(offsets)
+        positions = self._positions
+        chunk_size = self._chunk_size
+        encoding = self.encoding
+        with self.path.open('rb') as fh:
+            decomp = None
+            buf = b''
+            buf_start = 0  # decompressed offset of buf[0]
+            for i in indices:
+                start = offsets[i]
+                end = offsets[i + 1] if i + 1 < count else -1
+                k = bisect.bisect_right(positions, start) - 1
+                if (decomp is None
+                        or start < buf_start
+                        or positions[k] > buf_start + len(buf)):
+                    comp_offset, state = self._checkpoints[k]
+                    decomp = state.copy()
+                    fh.seek(comp_offset)
+                    buf = b''
+                    buf_start = positions[k]
+                while True:
+                    # discard data before the line
+                    if start > buf_start:
+                        cut = min(start - buf_start, len(buf))
+                        buf = buf[cut:]
+                        buf_start += cut
+                    if end != -1 and buf_start + len(buf) >= end:
+                        break
+                    chunk = fh.read(chunk_size)
+                    if not chunk:
+                        break
+                    buf += decomp.decompress(chunk)
+                stop = len(buf) if end == -1 else end - buf_start
+                yield i, buf[:stop].decode(encoding)
+
+
 class TestSuite(tsdb.Database):
     """
     A [incr tsdb()] test suite database.
@@ -684,6 +932,9 @@ class TestSuite(tsdb.Database):
             to a relations file; if not given, the relations file
             under *path* will be used
         encoding: the character encoding of the files in the test suite
+        cache: if `True`, :meth:`select_from` reads tables without
+            uncommitted changes from binary caches (see
+            :ref:`tsdb-caches`)
     Attributes:
         schema (dict): database schema as a mapping of table names to
             lists of :class:`Field` objects
@@ -694,7 +945,8 @@ class TestSuite(tsdb.Database):
     def __init__(self,
                  path: util.PathLike = None,
                  schema: tsdb.SchemaLike = None,
-                 encoding: str = 'utf-8') -> None:
+                 encoding: str = 'utf-8',
+                 cache: bool = False) -> None:
         # Virtual test suites use a temporary directory
         if path is None:
             self._tempdir = tempfile.TemporaryDirectory()
@@ -712,7 +964,8 @@ class TestSuite(tsdb.Database):
                 schema = tsdb.read_schema(schema)
             tsdb.write_schema(path, schema)
 
-        super().__init__(path, autocast=False, encoding=encoding)
+        super().__init__(path, autocast=False, encoding=encoding,
+                         cache=cache)
         self._data: Dict[str, Table] = {}
 
     @property
@@ -759,10 +1012,27 @@ class TestSuite(tsdb.Database):
         """
         if not columns:
             columns = []
-        return self[name].select(*columns, cast=cast)
+        table = self[name]
+        if self.cache and not table._in_transaction:
+            return self._select_cached(table, columns, cast)
+        return table.select(*columns, cast=cast)
+
+    def _select_cached(self,
+                       table: Table,
+                       columns: Iterable[str],
+                       cast: bool) -> Iterator[tsdb.Record]:
+        columns = list(columns)
+        fields = tuple(table.fields[table._field_index[column]]
+                       for column in columns)
+        field_index = tsdb.make_field_index(fields)
+        # Rows normalize missing values just as Table.select() does
+        for data in self._get_cache(table.name).select(columns):
+            row = Row(fields, data, field_index=field_index)
+            yield row if cast else row.data
 
     def reload(self) -> None:
         """Discard temporary changes and reload the database from disk."""
+        self._close_append_files()
         for name in self.schema:
             if name in self._data:
                 self._data[name]._sync_with_file()
@@ -778,29 +1048,41 @@ class TestSuite(tsdb.Database):
         current transaction is complete. It also may be more efficient
         if the only changes are adding new rows to existing tables.
         """
+        try:
+            self._commit()
+        finally:
+            self._close_append_files()
+
+    def _commit(self) -> None:
+        # append files are left open so the periodic commits while
+        # processing don't reopen them
         for name in self.schema:
             if name not in self._data:
                 continue
             table = self._data[name]
-            fields = self.schema[name]
-            if table._in_transaction:
-                data: tsdb.Records = []
-                if table._volatile_index >= table._persistent_count:
-                    append = True
-                    data = table[table._persistent_count:]
-                else:
-                    append = False
-                    data = table
-                tsdb.write(
-                    self.path,
-                    name,
-                    data,
-                    fields,
-                    append=append,
-                    encoding=self.encoding
-                )
+            if not table._in_transaction:
+                continue
+            if (table._volatile_index >= table._persistent_count
+                    and table._append_to_file()):
+                continue
+            table._close_append_file()
+            # existing rows were changed or the file is gzipped, which
+            # cannot be appended to, so rewrite the whole table
+            gzipped = tsdb.get_path(self.path, name).suffix == '.gz'
+            tsdb.write(
+                self.path,
+                name,
+                table,
+                self.schema[name],
+                gzip=gzipped,
+                encoding=self.encoding
+            )
             table._sync_with_file()
 
+    def _close_append_files(self) -> None:
+        for table in self._data.values():
+            table._close_append_file()
+
     def processed_items(
             self,
             fieldmapper: FieldMapper = None) -> Iterator[interface.Response]:
@@ -813,13 +1095,15 @@ class TestSuite(tsdb.Database):
 
     def process(
             self,
-            cpu: interface.Processor,
+            cpu: Union[interface.Processor, Sequence[interface.Processor]],
             selector: Tuple[str, str] = None,
             source: tsdb.Database = None,
             fieldmapper: FieldMapper = None,
             gzip: bool = False,
             buffer_size: int = 1000,
             callback: Callable[[interface.Response], Any] = None,
+            resume: bool = False,
+            baseline: tsdb.Database = None,
     ) -> None:
         """
         Process each item in a [incr tsdb()] test suite.
@@ -830,9 +1114,42 @@ class TestSuite(tsdb.Database):
         The *callback* parameter can be used, for example, to update a
         progress indicator.
 
+        If *cpu* is a sequence of processors, the items are
+        distributed over them and processed concurrently, with one
+        worker thread per processor. As processors like
+        :class:`~delphin.ace.ACEParser` do their work in a separate
+        subprocess, this allows a test suite to be processed on
+        several cores at once. The responses are still mapped to rows
+        in the original item order, so `parse-id` and `result-id`
+        values are the same as when processing with a single
+        processor, and each processor's runs get their own `run-id`.
+
+        Each time the output rows are flushed to disk, the number of
+        items processed so far is recorded in a checkpoint file in the
+        test suite directory, which is removed when processing
+        finishes. If processing is interrupted, calling this method
+        again with *resume* set to `True` discards any rows written
+        after the checkpoint, skips the items that were already
+        processed, and continues the `parse-id` and `run-id`
+        numbering of the interrupted run. The same *selector* and
+        *source* must be used for the resumed run.
+
+        If *baseline* is a test suite previously processed with the
+        same selector, only items whose input is new or differs from
+        the one in the baseline are processed. The `parse`, `result`,
+        and `edge` rows of the other items, and the `run` rows they
+        refer to, are copied from the baseline with `parse-id` and
+        `run-id` values renumbered to fit the new rows. This requires
+        the inputs to be identified by `i-id`, as with parsing, and
+        the copied rows of the baseline are held in memory during
+        processing. The baseline is read before any output is
+        written, so it may be the test suite being processed if the
+        inputs are taken from another *source*.
+
         Args:
             cpu (:class:`~delphin.interface.Processor`): processor
-                interface (e.g., :class:`~delphin.ace.ACEParser`)
+                interface (e.g., :class:`~delphin.ace.ACEParser`) or a
+                sequence of processors performing the same task
             selector: a pair of (table_name, column_name) that specify
                 the table and column used for processor input (e.g.,
                 `('item', 'i-input')`)
@@ -848,13 +1165,28 @@ class TestSuite(tsdb.Database):
                 in-memory; if `None`, do not flush to disk
             callback: a function that is called with the response for
                 each item processed; the return value is ignored
+            resume: if `True`, continue an interrupted run from its
+                last checkpoint, if any; otherwise any previous output
+                is cleared
+            baseline (:class:`~delphin.tsdb.Database`): test suite
+                whose outputs are reused for unchanged items
         Examples:
             >>> ts.process(ace_parser)
             >>> ts.process(ace_generator, 'result:mrs', source=ts2)
+            >>> ts.process([ace_parser1, ace_parser2])
+            >>> ts.process(ace_parser, resume=True)
+            >>> ts.process(ace_parser, baseline=TestSuite('old-profile'))
         """
+        if isinstance(cpu, interface.Processor):
+            cpus = [cpu]
+        else:
+            cpus = list(cpu)
+        if not cpus:
+            raise ITSDBError('at least one processor is required')
         if selector is None:
-            assert isinstance(cpu.task, str)
-            input_table, input_column = _default_task_selectors[cpu.task]
+            task = cpus[0].task
+            assert isinstance(task, str)
+            input_table, input_column = _default_task_selectors[task]
         else:
             input_table, input_column = selector
         if (input_table not in self.schema
@@ -869,53 +1201,324 @@ class TestSuite(tsdb.Database):
         index = tsdb.make_field_index(source.schema[input_table])
 
         affected = set(fieldmapper.affected_tables).intersection(self.schema)
-        for name in affected:
-            self[name].clear()
-
         key_names = [f.name for f in source.schema[input_table] if f.is_key]
 
-        for row in source[input_table]:
-            datum = row[index[input_column]]
-            keys = [row[index[name]] for name in key_names]
-            keys_dict = dict(zip(key_names, keys))
-            response = cpu.process_item(datum, keys=keys_dict)
+        # read the baseline before its tables may be cleared below
+        reused: Dict[tsdb.Value, Transaction] = {}
+        baseline_runs: Dict[int, tsdb.ColumnMap] = {}
+        if baseline is not None:
+            if 'i-id' not in key_names:
+                raise ITSDBError(
+                    'a baseline can only be used for inputs keyed by i-id')
+            reused, baseline_runs = _reusable_rows(
+                baseline, source, input_table, input_column)
+        # renumber the baseline's runs before those of the processors
+        run_map = {run_id: i for i, run_id in enumerate(sorted(baseline_runs))}
+
+        selection = [input_table, input_column]
+        checkpoint = None
+        if resume:
+            checkpoint = _read_checkpoint(self.path)
+        if checkpoint is None:
+            for name in affected:
+                self[name].clear()
+            skip = 0
+            for run_id, run in baseline_runs.items():
+                new_run_id = run_map[run_id]
+                fieldmapper._runs[new_run_id] = dict(
+                    run, **{'run-id': new_run_id})
+            fieldmapper._last_run_id = len(run_map) - 1
+            run_offset = len(run_map)
+        else:
+            if checkpoint['selector'] != selection:
+                raise ITSDBError(
+                    'cannot resume processing with a different selector: '
+                    '{!s}, {!s}'.format(*checkpoint['selector']))
+            # discard rows committed after the checkpoint was written
+            for name in affected:
+                table = self[name]
+                count = checkpoint['rows'].get(name, 0)
+                if len(table) > count:
+                    table[count:] = []
+            skip = checkpoint['items']
+            runs = {run['run-id']: run for run in checkpoint['runs']}
+            fieldmapper._parse_id = checkpoint['parse-id']
+            fieldmapper._runs = runs
+            fieldmapper._last_run_id = max(runs, default=-1)
+            run_offset = fieldmapper._last_run_id + 1
+            logger.info('Resuming after %d processed items', skip)
+
+        def inputs():
+            rows = source[input_table]
+            if skip:
+                rows = itertools.islice(rows, skip - 1, None)
+                row = next(rows, None)
+                last_keys = None
+                if row is not None:
+                    last_keys = {name: row[index[name]] for name in key_names}
+                if last_keys != checkpoint['keys']:
+                    raise ITSDBError(
+                        'the source items differ from those of the '
+                        'interrupted run; cannot resume')
+            for row in rows:
+                datum = row[index[input_column]]
+                keys = [row[index[name]] for name in key_names]
+                yield datum, dict(zip(key_names, keys))
+
+        # items are either processed or have their rows reused; this
+        # records the order of both as the processors read the inputs
+        plan: Deque[Tuple[Dict[str, tsdb.Value], Optional[Transaction]]]
+        plan = collections.deque()
+
+        def unchanged_inputs():
+            for datum, keys in inputs():
+                rows = reused.get(keys['i-id']) if reused else None
+                plan.append((keys, rows))
+                if rows is None:
+                    yield datum, keys
+
+        if len(cpus) == 1:
+            responses = _process_serial(cpus[0], unchanged_inputs())
+        else:
+            responses = _process_concurrent(cpus, unchanged_inputs())
+
+        def outputs():
+            for keys, response in responses:
+                _keys, rows = plan.popleft()
+                while rows is not None:
+                    yield _keys, None, rows
+                    _keys, rows = plan.popleft()
+                yield keys, response, None
+            while plan:
+                _keys, rows = plan.popleft()
+                yield _keys, None, rows
+
+        def reuse(rows):
+            parse_ids = {}
+            for tablename, data in rows:
+                data = dict(data)
+                if tablename == 'parse':
+                    parse_id = max(fieldmapper._parse_id + 1, data['i-id'])
+                    fieldmapper._parse_id = parse_id
+                    parse_ids[data['parse-id']] = parse_id
+                    data['run-id'] = run_map.get(data['run-id'], -1)
+                data['parse-id'] = parse_ids[data['parse-id']]
+                if tablename in self.schema:
+                    yield tablename, data
+
+        # count the uncommitted rows here instead of summing over
+        # the tables after each row, and only commit between items so
+        # a checkpoint never splits the rows of an item
+        pending = 0
+        items = skip
+        try:
+            for keys, response, rows in outputs():
+                if response is None:
+                    logger.info('Reused item {:>16}'
+                                .format(tsdb.join(list(keys.values()))))
+                    transaction = reuse(rows)
+                else:
+                    logger.info(
+                        'Processed item {:>16}  {:>8} results'
+                        .format(tsdb.join(list(keys.values())),
+                                len(response['results']))
+                    )
+                    if callback:
+                        callback(response)
+                    if run_offset:
+                        response = _offset_run(response, run_offset)
+                    transaction = fieldmapper.map(response)
+                for tablename, data in transaction:
+                    _add_row(self, tablename, data)
+                    pending += 1
+                items += 1
+                if buffer_size is not None and pending > buffer_size:
+                    self._commit()
+                    pending = 0
+                    _write_checkpoint(self.path, {
+                        'selector': selection,
+                        'items': items,
+                        'keys': keys,
+                        'parse-id': fieldmapper._parse_id,
+                        'rows': {name: len(self[name]) for name in affected},
+                        'runs': list(fieldmapper._runs.values()),
+                    })
+            for tablename, data in fieldmapper.cleanup():
+                _add_row(self, tablename, data)
+        finally:
+            self._close_append_files()
 
-            logger.info(
-                'Processed item {:>16}  {:>8} results'
-                .format(tsdb.join(keys), len(response['results']))
-            )
-            if callback:
-                callback(response)
+        tsdb.write_database(self, self.path, gzip=gzip)
+        with contextlib.suppress(FileNotFoundError):
+            self.path.joinpath(_CHECKPOINT_FILENAME).unlink()
 
-            for tablename, data in fieldmapper.map(response):
-                _add_row(self, tablename, data, buffer_size)
 
-        for tablename, data in fieldmapper.cleanup():
-            _add_row(self, tablename, data, buffer_size)
+_Input = Tuple[Any, Dict[str, tsdb.Value]]
 
-        tsdb.write_database(self, self.path, gzip=gzip)
 
+_Output = Tuple[Dict[str, tsdb.Value], interface.Response]
 
-def _add_row(ts: TestSuite,
-             name: str,
-             data: Dict,
-             buffer_size: int) -> None:
+
+def _process_serial(
+        cpu: interface.Processor,
+        inputs: Iterable[_Input]) -> Iterator[_Output]:
+    """Process each input with *cpu* in turn."""
+    # the processor may read ahead, so remember the keys it was given
+    pending: Deque[Dict[str, tsdb.Value]] = collections.deque()
+
+    def items():
+        for datum, keys in inputs:
+            pending.append(keys)
+            yield datum, keys
+
+    for response in cpu.process_items(items()):
+        yield pending.popleft(), response
+
+
+def _process_concurrent(
+        cpus: Sequence[interface.Processor],
+        inputs: Iterable[_Input]) -> Iterator[_Output]:
     """
-    Prepare and append a Row into its Table; flush to disk if necessary.
+    Process the inputs with a pool of processors, one thread each.
+
+    Responses are yielded in input order. No more than twice as many
+    inputs as there are processors are in flight at once, so slow
+    consumers of the responses do not cause them to pile up in
+    memory. The `run-id` of each processor run is renumbered so
+    concurrent runs do not conflict.
     """
-    fields = ts.schema[name]
-    # remove any keys that aren't relation fields
-    for invalid_key in set(data).difference([f.name for f in fields]):
-        del data[invalid_key]
+    idle: 'queue.Queue[interface.Processor]' = queue.Queue()
+    for cpu in cpus:
+        idle.put(cpu)
 
-    ts[name].append(tsdb.make_record(data, fields))
+    def work(datum, keys):
+        cpu = idle.get()
+        try:
+            return keys, cpu.process_item(datum, keys=keys)
+        finally:
+            idle.put(cpu)
+
+    run_ids: Dict[int, int] = {}
+    window = 2 * len(cpus)
+    pending: Deque['Future[_Output]'] = collections.deque()
+    with ThreadPoolExecutor(max_workers=len(cpus)) as executor:
+        try:
+            for datum, keys in inputs:
+                pending.append(executor.submit(work, datum, keys))
+                if len(pending) >= window:
+                    keys, response = pending.popleft().result()
+                    yield keys, _renumber_run(response, run_ids)
+            while pending:
+                keys, response = pending.popleft().result()
+                yield keys, _renumber_run(response, run_ids)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _renumber_run(response: interface.Response,
+                  run_ids: Dict[int, int]) -> interface.Response:
+    """Give the run of *response* a `run-id` unique across processors."""
+    run = response.get('run')
+    if run is not None:
+        # the run dictionary is shared by the processor's responses,
+        # so it is identified by the object and copied before editing
+        run_id = run_ids.setdefault(id(run), len(run_ids))
+        response['run'] = dict(run, **{'run-id': run_id})
+    return response
+
+
+def _reusable_rows(
+        baseline: tsdb.Database,
+        source: tsdb.Database,
+        input_table: str,
+        input_column: str,
+) -> Tuple[Dict[tsdb.Value, Transaction], Dict[int, tsdb.ColumnMap]]:
+    """
+    Return the rows of *baseline* for the items with unchanged inputs.
 
-    num_changes = 0
-    for _name in ts:
-        table = ts[_name]
-        num_changes += len(table) - table._persistent_count
-    if num_changes > buffer_size:
-        ts.commit()
+    The `parse`, `result`, and `edge` rows are returned as
+    transactions grouped by `i-id`, along with the `run` rows they
+    refer to, indexed by `run-id`.
+    """
+    if input_table not in baseline.schema:
+        raise ITSDBError(f'baseline has no {input_table} table')
+    columns = ('i-id', input_column)
+    previous = dict(baseline.select_from(input_table, columns, cast=True))
+    unchanged = {i_id for i_id, datum
+                 in source.select_from(input_table, columns, cast=True)
+                 if i_id in previous and previous[i_id] == datum}
+
+    def rows(name):
+        names = [f.name for f in baseline.schema[name]]
+        for data in baseline.select_from(name, names, cast=True):
+            yield dict(zip(names, data))
+
+    reused: Dict[tsdb.Value, Transaction] = {}
+    parse_ids: Dict[tsdb.Value, tsdb.Value] = {}  # parse-id to i-id
+    run_ids = set()
+    for row in rows('parse'):
+        i_id = row['i-id']
+        if i_id in unchanged:
+            reused.setdefault(i_id, []).append(('parse', row))
+            parse_ids[row['parse-id']] = i_id
+            run_ids.add(row['run-id'])
+    for name in ('result', 'edge'):
+        if name not in baseline.schema:
+            continue
+        for row in rows(name):
+            i_id = parse_ids.get(row['parse-id'])
+            if i_id is not None:
+                reused[i_id].append((name, row))
+    runs = {}
+    if 'run' in baseline.schema:
+        runs = {row['run-id']: row for row in rows('run')
+                if row['run-id'] in run_ids}
+    return reused, runs
+
+
+def _offset_run(response: interface.Response,
+                offset: int) -> interface.Response:
+    """Add *offset* to the `run-id` of the run of *response*."""
+    run = response.get('run')
+    if run is not None:
+        response['run'] = dict(run, **{'run-id': run['run-id'] + offset})
+    return response
+
+
+def _read_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the checkpoint of an unfinished run in *path*, if any."""
+    try:
+        with path.joinpath(_CHECKPOINT_FILENAME).open(encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    """Atomically replace the checkpoint file in *path*."""
+    target = path.joinpath(_CHECKPOINT_FILENAME)
+    tmp = target.with_name(target.name + '.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, default=_format_value)
+    os.replace(str(tmp), str(target))
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, datetime):
+        return tsdb.format(':date', value)
+    raise TypeError(type(value).__name__)
+
+
+def _add_row(ts: TestSuite,
+             name: str,
+             data: Dict) -> None:
+    """
+    Prepare and append a Row into its Table.
+    """
+    table = ts[name]
+    # make_record() ignores any keys that aren't relation fields
+    table.append(tsdb.make_record(data, table.fields))
 
 
 ##############################################################################
@@ -928,7 +1531,8 @@ _Matched = Tuple[List[Row], List[Row]]
 def match_rows(rows1: Rows,
                rows2: Rows,
                key: Union[str, int],
-               sort_keys: bool = True) -> Iterator[Match]:
+               sort_keys: bool = True,
+               presorted: bool = False) -> Iterator[Match]:
     """
     Yield triples of `(value, left_rows, right_rows)` where
     `left_rows` and `right_rows` are lists of rows that share the same
@@ -937,9 +1541,14 @@ def match_rows(rows1: Rows,
 
     .. warning::
 
-       Both *rows1* and *rows2* will exist in memory for this
-       operation, so it is not recommended for very large tables on
-       low-memory systems.
+       Unless *presorted* is `True`, both *rows1* and *rows2* will
+       exist in memory for this operation, so it is not recommended
+       for very large tables on low-memory systems.
+
+    If *presorted* is `True`, *rows1* and *rows2* must already be
+    sorted on *key*, as by :func:`sort_rows`, and they are merged as
+    they are read so only the rows sharing a single value are held in
+    memory at a time. Results are then always yielded in key order.
 
     Args:
         rows1: a :class:`Table` or list of :class:`Row` objects
@@ -947,11 +1556,22 @@ def match_rows(rows1: Rows,
         key (str, int): the column name or index on which to match
         sort_keys (bool): if `True`, yield matching rows sorted by the
             matched key instead of the original order
+        presorted (bool): if `True`, stream the rows, which are
+            already sorted by *key*
     Yields:
         tuple: a triple containing the matched value for *key*, the
             list of any matching rows from *rows1*, and the list of
             any matching rows from *rows2*
+    Example:
+        >>> matches = itsdb.match_rows(
+        ...     itsdb.sort_rows(test['result'], 'parse-id'),
+        ...     itsdb.sort_rows(gold['result'], 'parse-id'),
+        ...     'parse-id',
+        ...     presorted=True)
     """
+    if presorted:
+        yield from _merge_rows(rows1, rows2, key)
+        return
     matched: Dict[tsdb.Value, _Matched] = collections.OrderedDict()
     for i, rows in enumerate([rows1, rows2]):
         for row in rows:
@@ -968,3 +1588,118 @@ def match_rows(rows1: Rows,
     for val in vals:
         left, right = matched[val]
         yield (val, left, right)
+
+
+def _merge_rows(rows1: Iterable[tsdb.Record],
+                rows2: Iterable[tsdb.Record],
+                key: Union[str, int]) -> Iterator[Match]:
+    """Merge-join *rows1* and *rows2*, which are sorted by *key*."""
+    def groups(rows):
+        last = None
+        for order, group in itertools.groupby(
+                rows, key=lambda row: _sort_order(row[key])):
+            if last is not None and order < last:
+                raise ITSDBError(f'rows are not sorted by {key!r}')
+            last = order
+            group = list(group)
+            yield order, group[0][key], group
+    end = (_END, None, [])
+    groups1, groups2 = groups(rows1), groups(rows2)
+    order1, val1, left = next(groups1, end)
+    order2, val2, right = next(groups2, end)
+    while order1 is not _END or order2 is not _END:
+        if order2 is _END or (order1 is not _END and order1 < order2):
+            yield (val1, left, [])
+            order1, val1, left = next(groups1, end)
+        elif order1 is _END or order2 < order1:
+            yield (val2, [], right)
+            order2, val2, right = next(groups2, end)
+        else:
+            yield (val1, left, right)
+            order1, val1, left = next(groups1, end)
+            order2, val2, right = next(groups2, end)
+
+
+def sort_rows(rows: Iterable[tsdb.Record],
+              key: Union[str, int],
+              buffer_size: int = 100000) -> Iterator[tsdb.Record]:
+    """
+    Yield *rows* sorted by the column *key*.
+
+    At most *buffer_size* rows are sorted in memory at once. When
+    there are more rows, each sorted run of *buffer_size* rows is
+    written to a temporary file and the runs are merged as they are
+    read back, so arbitrarily large tables can be sorted with
+    bounded memory. Memory used to produce *rows*, e.g., by a TSQL
+    join, is not bounded by this function. The sort is stable and
+    orders values as :func:`match_rows` does with *sort_keys*:
+    numeric strings compare as numbers and `None` sorts first.
+
+    Args:
+        rows: a :class:`Table` or an iterable of rows
+        key (str, int): the column name or index to sort on
+        buffer_size (int): the maximum number of rows to hold in
+            memory
+    Yields:
+        Rows from *rows* in order of their *key* values
+    """
+    if buffer_size < 1:
+        raise ITSDBError('buffer_size must be a positive integer')
+
+    def sortkey(row):
+        return _sort_order(row[key])
+
+    rows = iter(rows)
+    chunk = sorted(itertools.islice(rows, buffer_size), key=sortkey)
+    if len(chunk) < buffer_size:
+        yield from chunk  # it all fit in memory
+        return
+    # Rows of a table share their fields, so only their data is
+    # written and the fields are kept here to rebuild them
+    schemas: Dict[int, Tuple[tsdb.Fields, tsdb.FieldIndex]] = {}
+    with contextlib.ExitStack() as stack:
+        runs = []
+        while chunk:
+            fh = stack.enter_context(tempfile.TemporaryFile())
+            for row in chunk:
+                if isinstance(row, Row):
+                    schema_id = id(row.fields)
+                    schemas[schema_id] = (row.fields, row._field_index)
+                    record = (schema_id, row.data)
+                else:
+                    record = (None, row)
+                pickle.dump(record, fh, pickle.HIGHEST_PROTOCOL)
+            fh.seek(0)
+            runs.append(_read_run(fh, schemas))
+            chunk = sorted(itertools.islice(rows, buffer_size), key=sortkey)
+        # heapq.merge() takes from the earlier runs first on ties
+        yield from heapq.merge(*runs, key=sortkey)
+
+
+def _read_run(fh: IO[bytes],
+              schemas: Dict[int, Tuple[tsdb.Fields, tsdb.FieldIndex]]
+              ) -> Iterator[tsdb.Record]:
+    while True:
+        try:
+            schema_id, data = pickle.load(fh)
+        except EOFError:
+            break
+        if schema_id is None:
+            yield data
+        else:
+            fields, field_index = schemas[schema_id]
+            yield Row(fields, data, field_index=field_index)
+
+
+_END = object()  # sentinel for exhausted merge inputs
+
+
+def _sort_order(value: tsdb.Value) -> Tuple[int, Any]:
+    """Return a key for sorting mixed column values."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, str):
+        value = util.safe_int(value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
@@ -3,7 +3,7 @@
 Operations on MRS structures
 """
 
-from typing import Iterable, Dict, Set, Optional
+from typing import Iterable, Dict, Set, Optional, List, Tuple
 
 from delphin import variable
 from delphin import predicate
@@ -234,19 +234,33 @@ def compare_bags(testbag: Iterable[mrs.MRS],
         otherwise.
     """
     gold_remaining = list(goldbag)
+    # Each MRS is made into a graph only once and the gold graphs are
+    # bucketed by an invariant hash, so the (expensive) isomorphism
+    # check is only done for pairs that may be isomorphic. Buckets
+    # keep the gold order so the first isomorphic gold MRS is matched.
+    buckets: Dict[int, List[Tuple[int, util._IsoGraph]]] = {}
+    for i, gold in enumerate(gold_remaining):
+        g = _make_mrs_isograph(gold, properties)
+        util._vf2_inv_map(g)
+        buckets.setdefault(util._wl_hash(g), []).append((i, g))
+    matched = set()
     test_unique = []
     shared = []
     for test in testbag:
-        gold_match = None
-        for gold in gold_remaining:
-            if is_isomorphic(test, gold, properties=properties):
-                gold_match = gold
+        g = _make_mrs_isograph(test, properties)
+        util._vf2_inv_map(g)
+        bucket = buckets.get(util._wl_hash(g), [])
+        for j, (i, gold_g) in enumerate(bucket):
+            if (len(g) == len(gold_g)
+                    and set(util._vf2_match(g, gold_g)) == set(g)):
+                del bucket[j]
+                matched.add(i)
+                shared.append(test)
                 break
-        if gold_match is not None:
-            gold_remaining.remove(gold_match)
-            shared.append(test)
         else:
             test_unique.append(test)
+    gold_remaining = [gold for i, gold in enumerate(gold_remaining)
+                      if i not in matched]
     if count_only:
         return (len(test_unique), len(shared), len(gold_remaining))
     else:
@@ -4,9 +4,18 @@
 Classes and functions for parsing and inspecting TDL.
 """
 
-from typing import Tuple, Union, Generator
+from typing import Tuple, Union, Generator, List, Dict
 import re
 from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import gc
+import io
+import json
+import os
+import pickle
+import tempfile
 import textwrap
 import warnings
 
@@ -17,7 +26,7 @@ from delphin.exceptions import (
 from delphin.tfs import FeatureStructure
 from delphin import util
 # Default modules need to import the PyDelphin version
-from delphin.__about__ import __version__  # noqa: F401
+from delphin.__about__ import __version__
 
 
 # Values for list expansion
@@ -294,7 +303,10 @@ class ConsList(AVM):
 
         if values is None:
             values = []
-        self._last_path = ''
+        # the AVM with the last path as its REST feature, and the
+        # number of items in the list
+        self._last = None
+        self._length = 0
         self.terminated = False
         for value in values:
             self.append(value)
@@ -303,18 +315,30 @@ class ConsList(AVM):
     def __len__(self):
         return len(self.values())
 
+    @property
+    def _last_path(self):
+        return '.'.join([LIST_TAIL] * self._length)
+
+    def _last_value(self):
+        """Return the value on the last path of the list."""
+        if self._last is None:
+            return None
+        return self._last[LIST_TAIL]
+
     def values(self):
         """
         Return the list of values in the ConsList feature structure.
         """
         if self._avm is None:
             return []
+        elif self._last is None:
+            return _collect_list_values(self)
         else:
-            vals = [val for _, val in _collect_list_items(self)]
+            vals = _cons_list_items(self)
             # the < a . b > notation puts b on the last REST path,
-            # which is not returned by _collect_list_items()
-            if self.terminated and self[self._last_path] is not None:
-                vals.append(self[self._last_path])
+            # which is not returned by _cons_list_items()
+            if self.terminated and self._last_value() is not None:
+                vals.append(self._last_value())
             return vals
 
     def append(self, value):
@@ -327,12 +351,11 @@ class ConsList(AVM):
             :class:`TDLError`: when appending to a closed list
         """
         if self._avm is not None and not self.terminated:
-            path = self._last_path
-            if path:
-                path += '.'
-            self[path + LIST_HEAD] = value
-            self._last_path = path + LIST_TAIL
-            self[self._last_path] = AVM()
+            node = self if self._last is None else self._last[LIST_TAIL]
+            node[LIST_HEAD] = value
+            node[LIST_TAIL] = AVM()
+            self._last = node
+            self._length += 1
         else:
             raise TDLError('Cannot append to a closed list.')
 
@@ -359,13 +382,13 @@ class ConsList(AVM):
         if end == LIST_TYPE:
             self.terminated = False
         elif end == EMPTY_LIST_TYPE:
-            if self._last_path:
-                self[self._last_path] = None
+            if self._last is not None:
+                self._last[LIST_TAIL] = None
             else:
                 self._avm = None
             self.terminated = True
-        elif self._last_path:
-            self[self._last_path] = end
+        elif self._last is not None:
+            self._last[LIST_TAIL] = end
             self.terminated = True
         else:
             raise TDLError(
@@ -418,16 +441,24 @@ class DiffList(AVM):
         """
         Return the list of values in the DiffList feature structure.
         """
-        return [val for _, val
-                in _collect_list_items(self.get(DIFF_LIST_LIST))]
+        return _collect_list_values(self.get(DIFF_LIST_LIST))
 
 
-def _collect_list_items(d):
-    if d is None or not isinstance(d, AVM) or d.get(LIST_HEAD) is None:
-        return []
-    vals = [(LIST_HEAD, d[LIST_HEAD])]
-    vals.extend((LIST_TAIL + '.' + path, val)
-                for path, val in _collect_list_items(d.get(LIST_TAIL)))
+def _cons_list_items(cl):
+    # follow the list's own nodes only, not into a list-valued end
+    vals = []
+    node = None if cl._last is None else cl
+    while node is not None:
+        vals.append(node[LIST_HEAD])
+        node = None if node is cl._last else node[LIST_TAIL]
+    return vals
+
+
+def _collect_list_values(d):
+    vals = []
+    while isinstance(d, AVM) and d.get(LIST_HEAD) is not None:
+        vals.append(d[LIST_HEAD])
+        d = d.get(LIST_TAIL)
     return vals
 
 
@@ -910,19 +941,28 @@ def _next(tokens):
 
 def _shift(tokens):
     """pop the next token, then peek the gid of the following"""
+    buffer = tokens._buffer
+    # fast path when neither token is a comment
+    if (len(buffer) > 1
+            and not 2 <= buffer[0][0] <= 3
+            and not 2 <= buffer[1][0] <= 3):
+        tok = buffer.popleft()
+        return tok[0], tok[1], tok[2], buffer[0][0]
     after = tokens.peek(n=1, skip=_is_comment, drop=True)
-    tok = tokens._buffer.popleft()
+    tok = buffer.popleft()
     return tok[0], tok[1], tok[2], after[0]
 
 
-def _lex(stream):
+def _lex(stream, lineno=1):
     """
     Lex the input stream according to _tdl_lex_re.
 
+    The first line of *stream* is numbered *lineno*.
+
     Yields
         (gid, token, line_number)
     """
-    lines = enumerate(stream, 1)
+    lines = enumerate(stream, lineno)
     line_no = pos = 0
     try:
         while True:
@@ -991,7 +1031,10 @@ ParseEvent = Tuple[
 
 
 def iterparse(path: util.PathLike,
-              encoding: str = 'utf-8') -> Generator[ParseEvent, None, None]:
+              encoding: str = 'utf-8',
+              cache: Union['ParseCache', util.PathLike] = None,
+              compact: Union[bool, 'CompactPool'] = False
+              ) -> Generator[ParseEvent, None, None]:
     """
     Parse the TDL file at *path* and iteratively yield parse events.
 
@@ -1003,9 +1046,25 @@ def iterparse(path: util.PathLike,
     TDL object, and `lineno` is the line number where the entity began
     in *path*.
 
+    If *cache* is given, the parse events are read from or stored in
+    a :class:`ParseCache` (or a cache in the directory *cache*), so
+    files that have not changed since they were last parsed are not
+    parsed again. The whole file is then parsed before the first
+    event is yielded.
+
+    If *compact* is `True` or a :class:`CompactPool`, the definitions
+    are yielded as :class:`CompactDefinition` objects, which take
+    much less memory when many definitions are kept, such as those of
+    a lexicon. The event names are still those of the original
+    definition classes. A new pool is used for each file unless one
+    is given.
+
     Args:
         path: path to a TDL file
         encoding (str): the encoding of the file (default: `"utf-8"`)
+        cache: a :class:`ParseCache` or the directory of one
+        compact: if `True` or a :class:`CompactPool`, yield compact
+            definitions
     Yields:
         `(event, object, lineno)` tuples
     Example:
@@ -1018,26 +1077,29 @@ def iterparse(path: util.PathLike,
         <String object (_eucalyptus_n_1_rel) at 140625748595960>
     """
     path = Path(path).expanduser()
-    with path.open(encoding=encoding) as fh:
-        yield from _parse(fh, path)
+    pool = _compact_pool(compact)
+    if cache is not None:
+        if not isinstance(cache, ParseCache):
+            cache = ParseCache(cache)
+        events = cache.events(path, encoding=encoding)
+        if pool is not None:
+            events = _compact_events(events, pool)
+        yield from events
+    else:
+        with path.open(encoding=encoding) as fh:
+            yield from _parse(fh, path, pool)
 
 
-def _parse(f, path):
+def _parse(f, path, pool=None):
     tokens = util.LookaheadIterator(_lex(f))
     try:
-        yield from _parse_tdl(tokens, path)
+        yield from _parse_tdl(tokens, path, pool)
     except TDLSyntaxError as ex:
         ex.filename = str(path)
         raise
-    except RecursionError as exc:
-        raise TDLError(
-            "excessively recursive TDL structure (perhaps there's "
-            "a very long list); try increasing Python's recursion "
-            "limit with sys.setrecursionlimit(n)"
-        ) from exc
 
 
-def _parse_tdl(tokens, path):
+def _parse_tdl(tokens, path, pool):
     environment = None
     envstack = []
     try:
@@ -1057,7 +1119,10 @@ def _parse_tdl(tokens, path):
                 yield (obj.__class__.__name__, obj, line_no)
             elif gid == 24:
                 obj = _parse_tdl_definition(token, tokens)
-                yield (obj.__class__.__name__, obj, line_no)
+                event = obj.__class__.__name__
+                if pool is not None:
+                    obj = CompactDefinition(obj, pool)
+                yield (event, obj, line_no)
             elif gid == 25:
                 envstack.append(environment)
                 _environment = _parse_tdl_begin_environment(tokens)
@@ -1159,129 +1224,149 @@ def _parse_tdl_affixes(tokens):
 
 
 def _parse_tdl_conjunction(tokens):
+    # AVMs and lists are parsed with an explicit stack instead of
+    # recursion so deeply nested structures and long lists do not
+    # exceed Python's recursion limit. Each frame is a list of the
+    # closing token's gid, the terms of the enclosing conjunction,
+    # the docstring, and the items read so far; AVM frames add the
+    # current feature path, and list frames the list's end and
+    # whether the end (after a . dot) is being read.
+    stack = []
     terms = []
     while True:
-        term, nextgid = _parse_tdl_term(tokens)
-        terms.append(term)
-        if nextgid == 11:  # & operator
-            tokens.next()
-        else:
-            break
-    if len(terms) == 1:
-        return terms[0], nextgid
-    else:
-        return Conjunction(terms), nextgid
-
-
-def _parse_tdl_term(tokens):
-    doc = None
-
-    gid, token, line_no, nextgid = _shift(tokens)
-
-    # docstrings are not part of the conjunction so check separately
-    if gid == 1:  # docstring
-        doc = token
+        doc = None
         gid, token, line_no, nextgid = _shift(tokens)
 
-    if gid == 4:  # string
-        term = String(token, docstring=doc)
-    elif gid == 5:  # quoted symbol
-        warnings.warn(
-            f'Single-quoted symbol encountered at line {line_no}; '
-            'Continuing as if it were a regular symbol.',
-            TDLWarning)
-        term = TypeIdentifier(token, docstring=doc)
-    elif gid == 6:  # regex
-        term = Regex(token, docstring=doc)
-    elif gid == 13:  # AVM open
-        featvals, nextgid = _parse_tdl_feature_structure(tokens)
-        term = AVM(featvals, docstring=doc)
-    elif gid == 14:  # diff list open
-        values, _, nextgid = _parse_tdl_list(tokens, break_gid=17)
-        term = DiffList(values, docstring=doc)
-    elif gid == 15:  # cons list open
-        values, end, nextgid = _parse_tdl_list(tokens, break_gid=18)
-        term = ConsList(values, end=end, docstring=doc)
-    elif gid == 19:  # coreference
-        term = Coreference(token, docstring=doc)
-    elif gid == 24:  # identifier
-        term = TypeIdentifier(token, docstring=doc)
-    else:
-        raise TDLSyntaxError('expected a TDL conjunction term.',
-                             lineno=line_no, text=token)
-    return term, nextgid
-
-
-def _parse_tdl_feature_structure(tokens):
-    feats = []
-    gid, token, line_no, nextgid = _shift(tokens)
-    if gid != 16:  # ] feature structure terminator
-        while True:
-            if gid != 24:  # identifier (attribute name)
-                raise TDLSyntaxError('Expected a feature name',
-                                     lineno=line_no, text=token)
-            path = [token]
-            while nextgid == 10:  # . dot
-                tokens.next()
-                gid, token, line_no, nextgid = _shift(tokens)
-                assert gid == 24
-                path.append(token)
-            attr = '.'.join(path)
-
-            conjunction, nextgid = _parse_tdl_conjunction(tokens)
-            feats.append((attr, conjunction))
-
-            if nextgid == 12:  # , list delimiter
-                tokens.next()
-                gid, token, line_no, nextgid = _shift(tokens)
-            elif nextgid == 16:
-                gid, _, _, nextgid = _shift(tokens)
-                break
+        # docstrings are not part of the conjunction so check separately
+        if gid == 1:  # docstring
+            doc = token
+            gid, token, line_no, nextgid = _shift(tokens)
+
+        if gid == 24:  # identifier
+            term = TypeIdentifier(token, docstring=doc)
+        elif gid == 13:  # AVM open
+            gid, token, line_no, nextgid = _shift(tokens)
+            if gid == 16:  # ] empty AVM
+                term = AVM(docstring=doc)
             else:
-                raise TDLSyntaxError('expected: , or ]',
-                                     lineno=line_no)
-
-    assert gid == 16
-
-    return feats, nextgid
-
-
-def _parse_tdl_list(tokens, break_gid):
-    values = []
-    end = None
-    nextgid = _peek(tokens)[0]
-    if nextgid == break_gid:
-        _, _, _, nextgid = _shift(tokens)
-    else:
-        while True:
-            if nextgid == 9:  # ... ellipsis
-                _, _, _, nextgid = _shift(tokens)
-                end = LIST_TYPE
-                break
+                attr, nextgid = _parse_tdl_feature_path(
+                    gid, token, line_no, nextgid, tokens)
+                stack.append([16, terms, doc, [], attr])
+                terms = []
+                continue
+        elif gid == 14 or gid == 15:  # diff list or cons list open
+            break_gid = gid + 3
+            nextgid = _peek(tokens)[0]
+            if nextgid == break_gid or nextgid == 9:  # empty or < ... >
+                end = EMPTY_LIST_TYPE
+                if nextgid == 9:  # ... ellipsis
+                    _shift(tokens)
+                    end = LIST_TYPE
+                gid, _, line_no, nextgid = _shift(tokens)
+                if gid != break_gid:
+                    raise TDLSyntaxError('expected: end of list',
+                                         lineno=line_no)
+                term = _make_tdl_list(break_gid, [], end, doc)
             else:
-                term, nextgid = _parse_tdl_conjunction(tokens)
-                values.append(term)
+                stack.append([break_gid, terms, doc, [], None, False])
+                terms = []
+                continue
+        elif gid == 4:  # string
+            term = String(token, docstring=doc)
+        elif gid == 19:  # coreference
+            term = Coreference(token, docstring=doc)
+        elif gid == 6:  # regex
+            term = Regex(token, docstring=doc)
+        elif gid == 5:  # quoted symbol
+            warnings.warn(
+                f'Single-quoted symbol encountered at line {line_no}; '
+                'Continuing as if it were a regular symbol.',
+                TDLWarning)
+            term = TypeIdentifier(token, docstring=doc)
+        else:
+            raise TDLSyntaxError('expected a TDL conjunction term.',
+                                 lineno=line_no, text=token)
 
-            if nextgid == 10:  # . dot
+        # add the term to its conjunction and close the AVMs and lists
+        # that the conjunction completes
+        while True:
+            terms.append(term)
+            if nextgid == 11:  # & operator
                 tokens.next()
-                end, nextgid = _parse_tdl_conjunction(tokens)
-                break
-            elif nextgid == break_gid:
                 break
-            elif nextgid == 12:  # , comma delimiter
-                _, _, _, nextgid = _shift(tokens)
+            if len(terms) == 1:
+                conjunction = terms[0]
             else:
-                raise TDLSyntaxError('expected: comma or end of list')
+                conjunction = Conjunction(terms)
+            if not stack:
+                return conjunction, nextgid
+            frame = stack[-1]
+            break_gid = frame[0]
+
+            if break_gid == 16:  # AVM
+                frame[3].append((frame[4], conjunction))
+                if nextgid == 12:  # , list delimiter
+                    tokens.next()
+                    gid, token, line_no, nextgid = _shift(tokens)
+                    frame[4], nextgid = _parse_tdl_feature_path(
+                        gid, token, line_no, nextgid, tokens)
+                    terms = []
+                    break
+                elif nextgid != 16:
+                    raise TDLSyntaxError('expected: , or ]',
+                                         lineno=line_no)
+                _, _, _, nextgid = _shift(tokens)
+                term = AVM(frame[3], docstring=frame[2])
 
-        gid, _, line_no, nextgid = _shift(tokens)
-        if gid != break_gid:
-            raise TDLSyntaxError('expected: end of list',
-                                 lineno=line_no)
+            else:  # list
+                if frame[5]:  # end of list after . dot
+                    frame[4] = conjunction
+                else:
+                    frame[3].append(conjunction)
+                    if nextgid == 10:  # . dot
+                        tokens.next()
+                        frame[5] = True
+                        terms = []
+                        break
+                    elif nextgid == 12:  # , comma delimiter
+                        _, _, _, nextgid = _shift(tokens)
+                        if nextgid != 9:  # ... ellipsis
+                            terms = []
+                            break
+                        _shift(tokens)
+                        frame[4] = LIST_TYPE
+                    elif nextgid != break_gid:
+                        raise TDLSyntaxError(
+                            'expected: comma or end of list')
+                gid, _, line_no, nextgid = _shift(tokens)
+                if gid != break_gid:
+                    raise TDLSyntaxError('expected: end of list',
+                                         lineno=line_no)
+                term = _make_tdl_list(break_gid, frame[3], frame[4], frame[2])
+
+            stack.pop()
+            terms = frame[1]
+
+
+def _parse_tdl_feature_path(gid, token, line_no, nextgid, tokens):
+    if gid != 24:  # identifier (attribute name)
+        raise TDLSyntaxError('Expected a feature name',
+                             lineno=line_no, text=token)
+    if nextgid != 10:  # . dot
+        return token, nextgid
+    path = [token]
+    while nextgid == 10:
+        tokens.next()
+        gid, token, line_no, nextgid = _shift(tokens)
+        assert gid == 24
+        path.append(token)
+    return '.'.join(path), nextgid
 
-    if len(values) == 0 and end is None:
-        end = EMPTY_LIST_TYPE
 
-    return values, end, nextgid
+def _make_tdl_list(break_gid, values, end, doc):
+    if break_gid == 17:  # !> diff list close
+        return DiffList(values, docstring=doc)
+    return ConsList(values, end=end, docstring=doc)
 
 
 def _parse_tdl_begin_environment(tokens):
@@ -1330,6 +1415,951 @@ def _parse_tdl_include(tokens, basedir):
     return FileInclude(value, basedir=basedir)
 
 
+# Parse caches
+
+_PARSE_CACHE_MAGIC = b'PYDELPHIN TDL CACHE\n'
+_PARSE_CACHE_VERSION = 2
+
+
+class ParseCache(object):
+    """
+    A persistent cache of the parse events of TDL files.
+
+    The events of each file are stored as a pickle in *directory*
+    under a name derived from the file's resolved path and encoding.
+    Stored events are reused if the file has the same size and
+    modification time as when it was parsed, or else if its contents
+    have the same SHA-256 hash; otherwise the file is parsed again
+    and the stored events are replaced. Warnings issued while parsing
+    are stored with the events and issued again when the events are
+    reused.
+
+    Cache files are only as trustworthy as the directory they are
+    in, as reading a pickle can execute arbitrary code.
+
+    Args:
+        directory: the directory of the cache files; it is created
+            if it does not exist
+    Attributes:
+        directory: the directory of the cache files
+        hits: the number of files whose events were reused
+        misses: the number of files that were parsed
+    Example:
+        >>> cache = tdl.ParseCache('~/.cache/pydelphin/tdl')
+        >>> for event, obj, lineno in tdl.iterparse('erg/lexicon.tdl',
+        ...                                         cache=cache):
+        ...     pass
+        ...
+        >>> cache.hits, cache.misses
+        (0, 1)
+    """
+
+    def __init__(self, directory: util.PathLike) -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, path: util.PathLike, encoding: str = 'utf-8') -> Path:
+        """Return the path of the cache file for the TDL file *path*."""
+        source = str(Path(path).expanduser().resolve())
+        key = hashlib.sha256(f'{source}\0{encoding}'.encode('utf-8'))
+        return self.directory / f'{key.hexdigest()}.tdlcache'
+
+    def events(self,
+               path: util.PathLike,
+               encoding: str = 'utf-8') -> List[ParseEvent]:
+        """
+        Return the list of parse events for the TDL file at *path*.
+
+        The events are read from the cache if they are current,
+        otherwise the file is parsed and the events are stored.
+        """
+        caught, events = self._entry(Path(path).expanduser(), encoding)
+        _reissue_warnings(caught)
+        return events
+
+    def _entry(self, path, encoding):
+        """Return the stored or newly parsed warnings and events."""
+        stat = path.stat()
+        cache_path = self.path(path, encoding=encoding)
+        entry, digest = _read_parse_cache(cache_path, path, stat)
+        if entry is None:
+            self.misses += 1
+            if digest is None:
+                digest = _file_digest(path)
+            entry = _parse_for_cache(path, encoding)
+            _write_parse_cache(cache_path, stat, digest, entry)
+        else:
+            self.hits += 1
+            _relocate_includes(entry[1], path)
+        return entry
+
+    def clear(self) -> None:
+        """Remove all cache files and reset the statistics."""
+        for cache_path in self.directory.glob('*.tdlcache'):
+            cache_path.unlink()
+        self.hits = 0
+        self.misses = 0
+
+
+def _file_digest(path: Path) -> str:
+    sha = hashlib.sha256()
+    with path.open('rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _parse_for_cache(path, encoding):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        with path.open(encoding=encoding) as fh, _gc_paused():
+            events = list(_parse(fh, path))
+    return [(str(w.message), w.category) for w in caught], events
+
+
+def _reissue_warnings(caught):
+    for message, category in caught:
+        warnings.warn(message, category)
+
+
+@contextmanager
+def _gc_paused():
+    # parsing and unpickling create many long-lived objects but
+    # little cyclic garbage, so the garbage collector's repeated
+    # passes over the new objects are wasted
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _relocate_includes(events, path):
+    # the file may have moved since the events were stored
+    for event, obj, _ in events:
+        if event == 'FileInclude':
+            obj.path = FileInclude(obj.value, basedir=path.parent).path
+
+
+def _read_parse_cache(cache_path, path, stat):
+    """Return the stored entry if current, and any computed digest."""
+    digest = None
+    try:
+        with cache_path.open('rb') as fh:
+            if fh.read(len(_PARSE_CACHE_MAGIC)) != _PARSE_CACHE_MAGIC:
+                return None, digest
+            header = pickle.load(fh)
+            if (header['version'] != _PARSE_CACHE_VERSION
+                    or header['pydelphin'] != __version__):
+                return None, digest
+            if (header['size'] != stat.st_size
+                    or header['mtime'] != stat.st_mtime_ns):
+                digest = _file_digest(path)
+                if header['sha256'] != digest:
+                    return None, digest
+            with _gc_paused():
+                return pickle.load(fh), digest
+    except Exception:
+        return None, digest  # missing, corrupt, or from another version
+
+
+def _write_parse_cache(cache_path, stat, digest, entry):
+    header = {
+        'version': _PARSE_CACHE_VERSION,
+        'pydelphin': __version__,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': digest,
+    }
+    try:
+        with _gc_paused():
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    except RecursionError:
+        return  # too deeply nested to store; parse it every time
+    with tempfile.NamedTemporaryFile(
+            dir=str(cache_path.parent), prefix=cache_path.name,
+            delete=False) as f_tmp:
+        f_tmp.write(_PARSE_CACHE_MAGIC)
+        pickle.dump(header, f_tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        f_tmp.write(data)
+    os.replace(f_tmp.name, str(cache_path))
+
+
+# Grammar loading
+
+class GrammarDefinitions(object):
+    """
+    The definitions of a grammar loaded by :func:`load_grammar`.
+
+    Definitions in `:begin :type.` environments, or outside of any
+    environment, are type definitions, and those in `:begin
+    :instance.` environments are instance definitions, indexed by
+    the environment's status (e.g., `"lex-entry"` or `"rule"`). When
+    an identifier is defined more than once in the same index, the
+    definition loaded last is kept. When loaded with *compact*, the
+    definitions and addenda are :class:`CompactDefinition` objects.
+
+    Attributes:
+        types: mapping of identifiers to type definitions
+        instances: mapping of statuses to mappings of identifiers to
+            instance definitions
+        addenda: mapping of identifiers to the list of their
+            :class:`TypeAddendum` objects, in the order they were
+            loaded
+        morphsets: list of :class:`LetterSet` and :class:`WildCard`
+            objects in the order they were loaded
+        files: list of the paths of loaded files in the order they
+            were loaded
+    """
+
+    def __init__(self) -> None:
+        self.types: Dict[str, TypeDefinition] = {}
+        self.instances: Dict[str, Dict[str, TypeDefinition]] = {}
+        self.addenda: Dict[str, List[TypeAddendum]] = {}
+        self.morphsets: List[_MorphSet] = []
+        self.files: List[Path] = []
+
+    def __repr__(self):
+        return '<{} object ({} types, {} instances) at {}>'.format(
+            type(self).__name__,
+            len(self.types),
+            sum(len(defs) for defs in self.instances.values()),
+            id(self))
+
+
+def load_grammar(path: util.PathLike,
+                 encoding: str = 'utf-8',
+                 jobs: int = 1,
+                 cache: Union[ParseCache, util.PathLike] = None,
+                 compact: Union[bool, 'CompactPool'] = False
+                 ) -> GrammarDefinitions:
+    """
+    Load the definitions of the grammar whose main TDL file is *path*.
+
+    Files included with `:include` are loaded as well, and the
+    definitions they contain belong to the environment the `:include`
+    statement is in. Each file is parsed once, even if it is included
+    several times. When *jobs* is greater than 1, files are parsed
+    concurrently in a pool of that many processes as their includes
+    are discovered, but the definitions are always merged in the
+    order the files are included, so the result does not depend on
+    *jobs*.
+
+    If *compact* is `True` or a :class:`CompactPool`, the definitions
+    are stored as :class:`CompactDefinition` objects sharing one pool.
+
+    Args:
+        path: path to the main TDL file of the grammar
+        encoding (str): the encoding of the files (default: `"utf-8"`)
+        jobs (int): number of processes to parse files with
+        cache: a :class:`ParseCache` or the directory of one
+        compact: if `True` or a :class:`CompactPool`, store compact
+            definitions
+    Returns:
+        a :class:`GrammarDefinitions` object
+    Raises:
+        TDLError: when a file includes itself directly or indirectly
+    Example:
+        >>> grammar = tdl.load_grammar('erg/english.tdl', jobs=4)
+        >>> grammar.instances['lex-entry']['eucalyptus_n1'].supertypes
+        [<TypeIdentifier object (n_-_c_le) at 140625748595960>]
+    """
+    if jobs < 1:
+        raise ValueError(f'number of jobs must be positive: {jobs}')
+    if cache is not None and not isinstance(cache, ParseCache):
+        cache = ParseCache(cache)
+    root = Path(path).expanduser().resolve()
+    if jobs == 1:
+        entries = _load_grammar_files(root, encoding, cache)
+    else:
+        entries = _load_grammar_files_concurrently(
+            root, encoding, cache, jobs)
+    grammar = GrammarDefinitions()
+    _merge_grammar_file(
+        root, entries, grammar, None, [], _compact_pool(compact))
+    return grammar
+
+
+def _load_grammar_files(root, encoding, cache):
+    entries = {}
+    agenda = [root]
+    while agenda:
+        path = agenda.pop()
+        if path not in entries:
+            if cache is not None:
+                entry = cache._entry(path, encoding)
+            else:
+                entry = _parse_for_cache(path, encoding)
+            entries[path] = entry
+            agenda.extend(_included_paths(entry[1]))
+    return entries
+
+
+def _load_grammar_files_concurrently(root, encoding, cache, jobs):
+    cache_dir = None if cache is None else str(cache.directory)
+    entries = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = {}
+
+        def submit(path):
+            if path not in entries and path not in pending.values():
+                future = executor.submit(
+                    _load_grammar_file, str(path), encoding, cache_dir)
+                pending[future] = path
+
+        submit(root)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                hits, misses, data = future.result()
+                if data is None:
+                    entry = _parse_for_cache(path, encoding)
+                else:
+                    with _gc_paused():
+                        entry = pickle.loads(data)
+                entries[path] = entry
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+                for included in _included_paths(entry[1]):
+                    submit(included)
+    return entries
+
+
+def _load_grammar_file(path, encoding, cache_dir):
+    """
+    Parse a file in a worker process and return the pickled entry.
+
+    The entry is `None` if it is too deeply nested to pickle (e.g.,
+    it has a very long list), in which case the main process must
+    parse the file itself.
+    """
+    path = Path(path)
+    hits = misses = 0
+    if cache_dir is not None:
+        cache = ParseCache(cache_dir)
+        entry = cache._entry(path, encoding)
+        hits, misses = cache.hits, cache.misses
+    else:
+        entry = _parse_for_cache(path, encoding)
+    # pickling here lets the main process unpickle with the garbage
+    # collector paused
+    try:
+        with _gc_paused():
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    except RecursionError:
+        data = None
+    return hits, misses, data
+
+
+def _included_paths(events):
+    return [obj.path.resolve()
+            for event, obj, _ in events
+            if event == 'FileInclude']
+
+
+def _merge_grammar_file(path, entries, grammar, environment, stack, pool):
+    if path in stack:
+        raise TDLError('cyclic file inclusion: {}'.format(
+            ' -> '.join(str(p) for p in stack + [path])))
+    stack.append(path)
+    caught, events = entries[path]
+    _reissue_warnings(caught)
+    grammar.files.append(path)
+    envstack = []
+    for event, obj, _ in events:
+        if pool is not None and isinstance(obj, TypeDefinition):
+            obj = CompactDefinition(obj, pool)
+        if event == 'BeginEnvironment':
+            envstack.append(environment)
+            environment = obj
+        elif event == 'EndEnvironment':
+            environment = envstack.pop()
+        elif event == 'FileInclude':
+            _merge_grammar_file(
+                obj.path.resolve(), entries, grammar, environment, stack,
+                pool)
+        elif event == 'TypeAddendum':
+            grammar.addenda.setdefault(obj.identifier, []).append(obj)
+        elif event in ('TypeDefinition', 'LexicalRuleDefinition'):
+            if isinstance(environment, InstanceEnvironment):
+                index = grammar.instances.setdefault(environment.status, {})
+            else:
+                index = grammar.types
+            index[obj.identifier] = obj
+        elif event in ('LetterSet', 'WildCard'):
+            grammar.morphsets.append(obj)
+    stack.pop()
+
+
+# Definition indices
+
+_DEFINITION_INDEX_VERSION = 1
+
+
+class DefinitionIndex(object):
+    """
+    An index for random access to the definitions in a TDL file.
+
+    The index maps each identifier defined in the file at *path* to
+    the byte offsets and line numbers where its definitions (with
+    `:=`) and addenda (with `:+`) begin. Accessing an identifier
+    parses only its definitions, which makes looking up entries in
+    large files, such as a grammar's lexicon, fast. Identifiers are
+    case-insensitive.
+
+    The index is found by a quick scan of the file's tokens and
+    stored as a JSON file at *index_path*, by default a hidden file
+    next to the TDL file (e.g., `.lexicon.tdl.index` for
+    `lexicon.tdl`). A stored index is used while the TDL file has
+    the size and modification time it had when the index was built;
+    otherwise the index is rebuilt, also when the file changes while
+    the index is in use. If the index cannot be stored, e.g., because
+    the grammar is in a read-only location, it is only kept in
+    memory. The file's encoding must be ASCII-compatible (e.g.,
+    UTF-8).
+
+    Args:
+        path: path to a TDL file
+        encoding: the encoding of the file (default: `"utf-8"`)
+        index_path: path of the stored index; if `None`, the default
+            path next to the TDL file is used
+    Attributes:
+        path: path to the TDL file
+        index_path: path of the stored index
+    Example:
+        >>> lex = tdl.DefinitionIndex('erg/lexicon.tdl')
+        >>> 'eucalyptus_n1' in lex
+        True
+        >>> lex['eucalyptus_n1']['SYNSEM.LKEYS.KEYREL.PRED']
+        <String object (_eucalyptus_n_1_rel) at 140625748595960>
+    """
+
+    def __init__(self,
+                 path: util.PathLike,
+                 encoding: str = 'utf-8',
+                 index_path: util.PathLike = None) -> None:
+        self.path = Path(path).expanduser()
+        if index_path is None:
+            index_path = self.path.with_name(f'.{self.path.name}.index')
+        self.index_path = Path(index_path).expanduser()
+        self._encoding = encoding
+        self._size = self._mtime = None
+        self._locations: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._load()
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier.lower() in self._current_locations()
+
+    def __iter__(self):
+        return iter(list(self._current_locations()))
+
+    def __len__(self) -> int:
+        return len(self._current_locations())
+
+    def __getitem__(self, identifier: str) -> TypeDefinition:
+        """
+        Return the last definition of *identifier*, excluding addenda.
+        """
+        locations = [loc for loc in self.locations(identifier)
+                     if loc[2] != ':+']
+        if not locations:
+            raise KeyError(identifier)
+        return self._parse_at(identifier, locations[-1])
+
+    def get(self, identifier: str, default=None):
+        """
+        Return the definition of *identifier* if it exists, otherwise
+        *default*.
+        """
+        try:
+            return self[identifier]
+        except KeyError:
+            return default
+
+    def locations(self, identifier: str) -> List[Tuple[int, int, str]]:
+        """
+        Return the locations of the definitions of *identifier*.
+
+        Locations are `(offset, lineno, operator)` triples of the
+        byte offset of the line where a definition begins, its line
+        number, and its operator (`":="`, `":<"`, or `":+"`), in the
+        order they appear in the file.
+        """
+        return list(self._current_locations().get(identifier.lower(), []))
+
+    def definitions(self, identifier: str) -> List[TypeDefinition]:
+        """
+        Return all definitions and addenda of *identifier*.
+
+        Raises:
+            KeyError: when *identifier* is not defined in the file
+        """
+        locations = self.locations(identifier)
+        if not locations:
+            raise KeyError(identifier)
+        return [self._parse_at(identifier, loc) for loc in locations]
+
+    def is_current(self) -> bool:
+        """Return `True` if the file is unchanged since it was indexed."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        return (stat.st_size == self._size
+                and stat.st_mtime_ns == self._mtime)
+
+    def rebuild(self) -> None:
+        """
+        Scan the TDL file again and store the new index.
+
+        The new index is used even if it cannot be stored.
+        """
+        stat = self.path.stat()
+        locations = _scan_definitions(self.path, self._encoding)
+        self._size, self._mtime = stat.st_size, stat.st_mtime_ns
+        self._locations = locations
+        data = {
+            'version': _DEFINITION_INDEX_VERSION,
+            'encoding': self._encoding,
+            'size': self._size,
+            'mtime': self._mtime,
+            'definitions': locations,
+        }
+        tmp_name = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                    'w', encoding='utf-8', dir=str(self.index_path.parent),
+                    prefix=self.index_path.name, delete=False) as f_tmp:
+                tmp_name = f_tmp.name
+                json.dump(data, f_tmp, ensure_ascii=False)
+            os.replace(tmp_name, str(self.index_path))
+        except OSError:
+            # keep the index in memory only
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    def _load(self) -> None:
+        try:
+            with self.index_path.open(encoding='utf-8') as fh:
+                data = json.load(fh)
+            if (data['version'] != _DEFINITION_INDEX_VERSION
+                    or data['encoding'] != self._encoding):
+                raise ValueError('incompatible index')
+            self._size, self._mtime = data['size'], data['mtime']
+            self._locations = {
+                identifier: [tuple(loc) for loc in locations]
+                for identifier, locations in data['definitions'].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # missing, corrupt, or from another version
+        if not self.is_current():
+            self.rebuild()
+
+    def _current_locations(self):
+        if not self.is_current():
+            self.rebuild()
+        return self._locations
+
+    def _parse_at(self, identifier, location):
+        offset, lineno, _ = location
+        identifier = identifier.lower()
+        with self.path.open('rb') as fh:
+            fh.seek(offset)
+            lines = io.TextIOWrapper(fh, encoding=self._encoding)
+            tokens = util.LookaheadIterator(_lex(lines, lineno), n=64)
+            try:
+                # other definitions may precede it on the same line
+                while True:
+                    gid, token, line_no = _next(tokens)
+                    if gid != 24 or _peek(tokens)[0] not in (7, 8):
+                        continue
+                    obj = _parse_tdl_definition(token, tokens)
+                    if obj.identifier.lower() == identifier:
+                        return obj
+            except TDLSyntaxError as ex:
+                ex.filename = str(self.path)
+                raise
+            except StopIteration:
+                raise TDLError(
+                    f'{identifier} not found at line {lineno} of '
+                    f'{self.path}; the index may be out of date')
+
+
+def _scan_definitions(path, encoding):
+    """Return the locations of the definitions in the file at *path*."""
+    offsets = [0]
+
+    def lines():
+        with path.open('rb') as fh:
+            offset = 0
+            for line in fh:
+                offset += len(line)
+                offsets.append(offset)
+                yield line.decode(encoding)
+
+    locations: Dict[str, List[Tuple[int, int, str]]] = {}
+    prev_gid, prev_token, prev_line_no = 0, None, 0
+    for gid, token, line_no in _lex(lines()):
+        if gid in (7, 8) and prev_gid == 24:  # identifier then := or :+
+            locations.setdefault(prev_token.lower(), []).append(
+                (offsets[prev_line_no - 1], prev_line_no, token))
+        if not 2 <= gid <= 3:  # skip comments
+            prev_gid, prev_token, prev_line_no = gid, token, line_no
+    return locations
+
+
+# Compact definitions
+
+# Each entry of a compact definition has a kind, stored as a single
+# character, and a feature path. The entries of the kinds in
+# _COMPACT_VALUE_KINDS also take the next value of the definition.
+#
+#   T  type identifier        [  AVM
+#   S  double-quoted string   <  closed cons-list
+#   R  regular expression     (  open cons-list
+#   C  coreference            !  diff-list
+#   D  docstring of the next  ,  start of the next list item
+#      entry's term           N  no value (None)
+
+_COMPACT_VALUE_KINDS = 'TSRCD'
+_COMPACT_TYPE_TERMS = {'T': TypeIdentifier, 'S': String, 'R': Regex}
+
+
+class CompactPool(object):
+    """
+    Shared storage for the strings and shapes of compact definitions.
+
+    :class:`CompactDefinition` objects created with the same pool
+    share one copy of each type name, string, coreference tag, and
+    feature path, and definitions with the same feature geometry,
+    such as lexical entries of the same lexical type, share one
+    stored shape.
+    """
+
+    __slots__ = ('_strings', '_shapes')
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self._shapes: Dict[Tuple[str, Tuple[str, ...]],
+                           Tuple[str, Tuple[str, ...]]] = {}
+
+    def __repr__(self):
+        return '<{} object ({} strings, {} shapes) at {}>'.format(
+            type(self).__name__,
+            len(self._strings),
+            len(self._shapes),
+            id(self))
+
+    def string(self, s: str) -> str:
+        """Return the pooled plain-string copy of *s*."""
+        s = str(s)
+        return self._strings.setdefault(s, s)
+
+    def _shape(self, kinds, paths):
+        shape = (kinds, paths)
+        return self._shapes.setdefault(shape, shape)
+
+
+class CompactDefinition(object):
+    """
+    A compact form of a type or instance definition.
+
+    The terms of *definition* are flattened into a sequence of
+    entries in the order they appear in the definition, each with its
+    full feature path (e.g., `SYNSEM.LKEYS.KEYREL.PRED`), and the
+    type names, strings, and coreference tags are stored as plain
+    strings in a tuple. Paths and strings are shared through *pool*,
+    so a large lexicon takes a fraction of the memory of the
+    :class:`TypeDefinition` objects it was made from. The items of
+    lists are stored on the list's `FIRST` path and the end of a
+    `< ... . end >` list on its `REST` path.
+
+    Compact definitions cannot be modified; use
+    :meth:`to_definition` to get an equivalent definition with the
+    regular classes.
+
+    Args:
+        definition (:class:`TypeDefinition`): the definition to
+            compact, which may also be a :class:`TypeAddendum` or
+            :class:`LexicalRuleDefinition`
+        pool (:class:`CompactPool`): the pool to share strings and
+            shapes with other definitions; if `None`, a new pool is
+            used
+    Attributes:
+        identifier (str): type identifier
+        docstring (str): documentation string
+        affix_type (str): `"prefix"` or `"suffix"` for lexical rules,
+            otherwise `None`
+        patterns (list): sequence of `(match, replacement)` pairs for
+            lexical rules, otherwise `None`
+    Example:
+        >>> pool = tdl.CompactPool()
+        >>> lex = {}
+        >>> for event, obj, _ in tdl.iterparse('erg/lexicon.tdl'):
+        ...     if event == 'TypeDefinition':
+        ...         lex[obj.identifier] = tdl.CompactDefinition(obj, pool)
+        ...
+        >>> lex['eucalyptus_n1'].to_definition()
+        <TypeDefinition object 'eucalyptus_n1' at 140625748595960>
+    """
+
+    __slots__ = ('_class', 'identifier', 'docstring', '_shape', '_values',
+                 'affix_type', 'patterns')
+
+    def __init__(self,
+                 definition: TypeDefinition,
+                 pool: CompactPool = None) -> None:
+        if pool is None:
+            pool = CompactPool()
+        kinds, paths, values = _compact_terms(definition.conjunction, pool)
+        self._class = type(definition)
+        self.identifier = definition.identifier
+        self.docstring = definition.docstring
+        self._shape = pool._shape(kinds, paths)
+        self._values = values
+        self.affix_type = getattr(definition, 'affix_type', None)
+        self.patterns = getattr(definition, 'patterns', None)
+
+    def __repr__(self):
+        return "<{} object '{}' at {}>".format(
+            type(self).__name__, self.identifier, id(self)
+        )
+
+    @property
+    def supertypes(self):
+        """The list of supertypes for the type."""
+        types = []
+        values = iter(self._values)
+        docstring = None
+        for kind, path in zip(*self._shape):
+            if kind in _COMPACT_VALUE_KINDS:
+                value = next(values)
+                if kind == 'D':
+                    docstring = value
+                    continue
+                if not path and kind in _COMPACT_TYPE_TERMS:
+                    types.append(
+                        _COMPACT_TYPE_TERMS[kind](value, docstring=docstring))
+            docstring = None
+        return types
+
+    def to_definition(self) -> TypeDefinition:
+        """
+        Return the definition as a :class:`TypeDefinition` object.
+
+        The returned object is an instance of the class of the
+        original definition.
+        """
+        kinds, paths = self._shape
+        conjunction = Conjunction(
+            _expand_compact_terms(kinds, paths, self._values))
+        if issubclass(self._class, LexicalRuleDefinition):
+            return self._class(self.identifier,
+                               self.affix_type,
+                               self.patterns,
+                               conjunction,
+                               docstring=self.docstring)
+        return self._class(self.identifier,
+                           conjunction,
+                           docstring=self.docstring)
+
+
+def _compact_pool(compact):
+    if isinstance(compact, CompactPool):
+        return compact
+    elif compact:
+        return CompactPool()
+    return None
+
+
+def _compact_events(events, pool):
+    """Return *events* with their definitions in compact form."""
+    compacted = {}
+    result = []
+    for event, obj, lineno in events:
+        if isinstance(obj, TypeDefinition):
+            compacted[id(obj)] = CompactDefinition(obj, pool)
+            obj = compacted[id(obj)]
+        result.append((event, obj, lineno))
+    # environments list their definitions, too; the original objects
+    # are still referenced by *events*, so their ids are unique
+    for event, obj, _ in result:
+        if event == 'BeginEnvironment':
+            obj.entries = [compacted.get(id(entry), entry)
+                           for entry in obj.entries]
+    return result
+
+
+def _conjunction_terms(value):
+    if isinstance(value, Conjunction):
+        return value.terms
+    return [value]
+
+
+def _compact_terms(conjunction, pool):
+    kinds = []
+    paths = []
+    values = []
+    string = pool.string
+    agenda = [('', term) for term in reversed(conjunction.terms)]
+    while agenda:
+        path, term = agenda.pop()
+        if term is None:
+            kind = 'N'
+        elif not isinstance(term, Term):
+            kind = term  # list item separator
+        else:
+            if term.docstring is not None:
+                kinds.append('D')
+                paths.append(string(path))
+                values.append(term.docstring)
+            if isinstance(term, TypeIdentifier):
+                kind = 'T'
+                values.append(string(term))
+            elif isinstance(term, String):
+                kind = 'S'
+                values.append(string(term))
+            elif isinstance(term, Regex):
+                kind = 'R'
+                values.append(string(term))
+            elif isinstance(term, Coreference):
+                kind = 'C'
+                values.append(string(term.identifier))
+            elif isinstance(term, ConsList):
+                items = _cons_list_items(term)
+                if term._avm is not None and not term.terminated:
+                    kind = '('
+                else:
+                    kind = '<'
+                    end = term._last_value()
+                    if end is not None:
+                        tail = f'{path}.{LIST_TAIL}'
+                        agenda.extend(
+                            (tail, t)
+                            for t in reversed(_conjunction_terms(end)))
+                _push_compact_items(agenda, path, items)
+            elif isinstance(term, DiffList):
+                kind = '!'
+                _push_compact_items(agenda, path, term.values())
+            elif isinstance(term, AVM):
+                kind = '['
+                for feat, val in reversed(list(term._avm.items())):
+                    subpath = f'{path}.{feat}' if path else feat
+                    agenda.extend(
+                        (subpath, t)
+                        for t in reversed(_conjunction_terms(val)))
+            else:
+                raise TDLError(f'unexpected term {term!r}')
+        kinds.append(kind)
+        paths.append(string(path))
+    return ''.join(kinds), tuple(paths), tuple(values)
+
+
+def _push_compact_items(agenda, path, items):
+    head = f'{path}.{LIST_HEAD}'
+    for item in reversed(items):
+        agenda.extend((head, t) for t in reversed(_conjunction_terms(item)))
+        agenda.append((path, ','))
+
+
+def _expand_compact_terms(kinds, paths, values):
+    terms = []
+    containers = {}
+    lists = []
+    values = iter(values)
+    docstring = None
+    for kind, path in zip(kinds, paths):
+        if kind == 'D':
+            docstring = next(values)
+            continue
+        elif kind == ',':
+            containers[path].items.append(None)
+            continue
+        elif kind in _COMPACT_TYPE_TERMS:
+            term = _COMPACT_TYPE_TERMS[kind](next(values), docstring=docstring)
+        elif kind == 'C':
+            term = Coreference(next(values), docstring=docstring)
+        elif kind == 'N':
+            term = None
+        elif kind == '[':
+            term = containers[path] = AVM(docstring=docstring)
+        else:
+            builder = containers[path] = _CompactList(kind, docstring)
+            lists.append(builder)
+            term = builder.term
+        docstring = None
+
+        if not path:
+            terms.append(term)
+            continue
+        parent, _, feat = path.rpartition('.')
+        container = containers[parent]
+        if isinstance(container, _CompactList):
+            container.add(feat, term)
+        elif feat in container._avm:
+            container._avm[feat] = _conjoin(container._avm[feat], term)
+        else:
+            container[feat] = term
+
+    for builder in lists:
+        builder.finish()
+    return terms
+
+
+def _conjoin(value, term):
+    if value is None:
+        return term
+    elif isinstance(value, Conjunction):
+        value.add(term)
+        return value
+    return Conjunction([value, term])
+
+
+class _CompactList(object):
+    """
+    Collects the items of a list while expanding compact terms.
+
+    The list object itself is created uninitialized so it can be
+    placed in its AVM or conjunction before its items are known.
+    """
+
+    __slots__ = ('term', 'kind', 'docstring', 'items', 'end')
+
+    def __init__(self, kind, docstring):
+        cls = DiffList if kind == '!' else ConsList
+        self.term = cls.__new__(cls)
+        self.kind = kind
+        self.docstring = docstring
+        self.items = []
+        self.end = None
+
+    def add(self, feat, term):
+        if feat == LIST_HEAD:
+            self.items[-1] = _conjoin(self.items[-1], term)
+        else:
+            self.end = _conjoin(self.end, term)
+
+    def finish(self):
+        if self.kind == '!':
+            self.term.__init__(self.items, docstring=self.docstring)
+            return
+        if self.kind == '(':
+            end = LIST_TYPE
+        elif self.end is None:
+            end = EMPTY_LIST_TYPE
+        else:
+            end = self.end
+        self.term.__init__(self.items, end=end, docstring=self.docstring)
+
+
 # Serialization helpers
 
 def format(obj, indent=0):
@@ -1337,8 +2367,9 @@ def format(obj, indent=0):
     Serialize TDL objects to strings.
 
     Args:
-        obj: instance of :class:`Term`, :class:`Conjunction`, or
-            :class:`TypeDefinition` classes or subclasses
+        obj: instance of :class:`Term`, :class:`Conjunction`,
+            :class:`TypeDefinition`, or :class:`CompactDefinition`
+            classes or subclasses
         indent (int): number of spaces to indent the formatted object
     Returns:
         str: serialized form of *obj*
@@ -1355,6 +2386,8 @@ def format(obj, indent=0):
     """
     if isinstance(obj, TypeDefinition):
         return _format_typedef(obj, indent)
+    elif isinstance(obj, CompactDefinition):
+        return _format_typedef(obj.to_definition(), indent)
     elif isinstance(obj, Conjunction):
         return _format_conjunction(obj, indent)
     elif isinstance(obj, Term):
@@ -1431,7 +2464,7 @@ def _format_conslist(cl, indent):
             end = ', ...'
         else:
             values = ['...']
-    elif cl._avm is not None and cl[cl._last_path] is not None:
+    elif cl._last_value() is not None:
         end = ' . ' + values[-1]
         values = values[:-1]
 
@@ -185,8 +185,12 @@ class TypeHierarchy(MultiHierarchy):
     node, multiple inheritance, case insensitivity, and unique
     greatest-lower-bound (glb) types.
 
-    Note:
-        Checks for unique glbs is not yet implemented.
+    Greatest lower bounds are computed by :meth:`glb` and cached in a
+    meet table, so unifying the same pair of types again is a
+    dictionary lookup. Hierarchies may lack unique glbs, as when types
+    are loaded from TDL without the glb types that processors like
+    the LKB and ACE generate; :meth:`glb_closure` returns a copy of
+    the hierarchy with those glb types inserted.
 
     TypeHierarchies may be constructed when instantiating the class or
     via the :meth:`update` method using a dictionary mapping type
@@ -238,7 +242,185 @@ class TypeHierarchy(MultiHierarchy):
                  normalize_identifier=None):
         if not normalize_identifier:
             normalize_identifier = str.lower
+        # meet table of glb() results
+        self._meets = {}
         super().__init__(top,
                          hierarchy=hierarchy,
                          data=data,
                          normalize_identifier=normalize_identifier)
+
+    def update(self, subhierarchy=None, data=None):
+        super().update(subhierarchy, data)
+        # new types may be common subtypes of existing ones
+        if subhierarchy:
+            self._meets.clear()
+
+    def glb(self, a, b):
+        """
+        Return the greatest lower bound of types *a* and *b*.
+
+        The result is stored in the hierarchy's meet table, which is
+        cleared when new types are added with :meth:`update`.
+
+        Args:
+            a: a type name
+            b: a type name
+        Raises:
+            HierarchyError: when *a* and *b* are compatible but do not
+                have a unique greatest lower bound
+        Examples:
+            >>> th = TypeHierarchy('*top*', {'a': '*top*',
+            ...                              'b': '*top*',
+            ...                              'c': 'a b'})
+            >>> th.glb('a', 'B')
+            'c'
+            >>> th.glb('a', 'c')
+            'c'
+        """
+        norm = self._norm
+        a, b = norm(a), norm(b)
+        meets = self._meets
+        try:
+            return meets[a, b]
+        except KeyError:
+            pass
+        glb = super().glb(a, b)
+        meets[a, b] = meets[b, a] = glb
+        return glb
+
+    def glb_closure(self, prefix='glbtype'):
+        """
+        Return a copy of the hierarchy with generated glb types.
+
+        For every pair of compatible types without a unique greatest
+        lower bound, a new type is inserted as the subtype of both and
+        the supertype of their maximal common subtypes, as the LKB and
+        ACE do when loading a grammar. The generated types are named
+        with *prefix* and a number (e.g., `glbtype1`), skipping names
+        already in the hierarchy, and have no data.
+
+        Args:
+            prefix: the prefix of generated type names
+        Returns:
+            a new :class:`TypeHierarchy` in which all pairs of
+            compatible types have a unique greatest lower bound
+        Examples:
+            >>> th = TypeHierarchy('*top*', {'a': '*top*',
+            ...                              'b': '*top*',
+            ...                              'c': 'a b',
+            ...                              'd': 'a b'})
+            >>> th2 = th.glb_closure()
+            >>> th2.glb('a', 'b')
+            'glbtype1'
+            >>> th2.parents('c')
+            ('glbtype1',)
+        """
+        index, desc = self._encoding()
+        ids = self._ids
+        hier = self._hier
+        # codes of descendants where bit k is node k of the encoding
+        glbs = {}
+        for z in _glb_codes(desc, hier, self._loer, ids):
+            glbs[z] = None
+        names = {}
+        n = 0
+        for z in sorted(glbs, key=_popcount, reverse=True):
+            n += 1
+            while f'{prefix}{n}' in self:
+                n += 1
+            glbs[z] = self._norm(f'{prefix}{n}')
+            names[glbs[z]] = z
+
+        def code(id):
+            if id in names:
+                return names[id]
+            i = index[id]
+            return desc[i] << i
+
+        subhierarchy = {id: hier[id] for id in ids if id != self._top}
+        extra = {}
+        for z, name in glbs.items():
+            # types above z are ancestors of each of its members
+            i = (z & -z).bit_length() - 1
+            candidates = sorted((id for id in self.ancestors(ids[i])
+                                 if code(id) & z == z),
+                                key=index.__getitem__)
+            candidates.extend(other for y, other in glbs.items()
+                              if y != z and y & z == z)
+            subhierarchy[name] = _minimal(candidates, code)
+            # maximal members of z become its subtypes
+            for k in _bit_positions(z):
+                id = ids[k]
+                if not any(z >> index[parent] & 1 for parent in hier[id]):
+                    extra.setdefault(id, []).append(name)
+        for id, names_ in extra.items():
+            subhierarchy[id] = _minimal(list(hier[id]) + names_, code)
+
+        return TypeHierarchy(
+            self._top,
+            hierarchy=subhierarchy,
+            data=self._data,
+            normalize_identifier=self._norm)
+
+
+def _glb_codes(desc, hier, loer, ids):
+    # Only types with several subtypes need to be compared, as the
+    # descendants that a type with one subtype shares with another
+    # type are shared by the subtype as well, and of those only types
+    # with a multiply-inheriting descendant can share descendants
+    # with a type they are not comparable to. Intersections that are
+    # not the descendants of a single type need a glb type, and these
+    # are compared in turn until no new intersections appear.
+    multi = 0
+    for i, id in enumerate(ids):
+        if len(hier[id]) > 1:
+            multi |= 1 << i
+    agenda = []
+    for i, id in enumerate(ids):
+        code = desc[i] << i
+        if len(loer[id]) > 1 and code & multi:
+            agenda.append(code)
+    found = set()
+    pool = []
+    while agenda:
+        new = []
+        for x in agenda:
+            for y in pool:
+                z = x & y
+                if z and z not in found and not _is_type_code(z, desc):
+                    found.add(z)
+                    new.append(z)
+            pool.append(x)
+        agenda = new
+    return found
+
+
+def _is_type_code(z, desc):
+    # a type code's lowest bit is the type itself
+    i = (z & -z).bit_length() - 1
+    return desc[i] << i == z
+
+
+def _minimal(candidates, code):
+    # the candidates that are not above another candidate, in order
+    codes = {id: code(id) for id in candidates}
+    minima = []
+    for id in sorted(codes, key=lambda id: _popcount(codes[id])):
+        x = codes[id]
+        if not any(y & x == y for y in minima):
+            minima.append(x)
+    minima = set(minima)
+    return tuple(id for id in dict.fromkeys(candidates)
+                 if codes[id] in minima)
+
+
+def _popcount(x):
+    return bin(x).count('1')
+
+
+def _bit_positions(x):
+    bits = bin(x)[:1:-1]
+    k = bits.find('1')
+    while k != -1:
+        yield k
+        k = bits.find('1', k + 1)
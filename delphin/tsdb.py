@@ -6,7 +6,7 @@ Test Suite Database (TSDB) Primitives
 
 from typing import (
     Union, Iterator, Iterable, Sequence, Mapping, Dict, Tuple, List, Set,
-    Optional, Generator, IO, cast as typing_cast
+    Optional, Generator, IO, Any, Callable, cast as typing_cast
 )
 import re
 from pathlib import Path
@@ -16,6 +16,11 @@ import tempfile
 import shutil
 from datetime import datetime, date
 import warnings
+import os
+import sys
+import json
+import mmap
+from array import array
 
 from delphin.exceptions import PyDelphinException, PyDelphinWarning
 from delphin import util
@@ -261,9 +266,8 @@ class Relation(Records):
         self.name = name
         self.fields = fields
         self.encoding = encoding
-        self._generator = (split(line, fields=fields)
-                           for line in open(self.dir, name,
-                                            encoding=self.encoding))
+        self._generator = split_lines(
+            open(self.dir, name, encoding=self.encoding), fields=fields)
 
     def __next__(self) -> Record:
         return next(self._generator)
@@ -289,11 +293,16 @@ class Database(object):
        using an idiom like :func:`contextlib.closing` ensures that the
        file descriptor gets closed.
 
+    If *cache* is `True`, :meth:`select_from` reads relations from
+    binary cache files (see :ref:`tsdb-caches`) instead of parsing the
+    text files, building the caches as necessary.
+
     Args:
         path: path to the database directory
         autocast: if `True`, automatically cast column values to their
             datatypes
         encoding: character encoding of the database files
+        cache: if `True`, use binary caches of the relations
     Example:
         >>> db = tsdb.Database('my-profile')
         >>> items = db['item']
@@ -304,11 +313,13 @@ class Database(object):
         autocast: Whether to automatically cast column values to their
             datatypes.
         encoding: The character encoding of database files.
+        cache: Whether binary caches of relations are used.
     """
     def __init__(self,
                  path: util.PathLike,
                  autocast: bool = False,
-                 encoding: str = 'utf-8') -> None:
+                 encoding: str = 'utf-8',
+                 cache: bool = False) -> None:
         path = Path(path).expanduser()
         if not is_database_directory(path):
             raise TSDBError(f'not a valid TSDB database: {path!s}')
@@ -316,6 +327,8 @@ class Database(object):
         self.schema = read_schema(path)
         self.autocast = autocast
         self.encoding = encoding
+        self.cache = cache
+        self._caches: Dict[str, RelationCache] = {}
 
     @property
     def path(self) -> Path:
@@ -345,6 +358,10 @@ class Database(object):
         fields = self.schema[name]
         if columns is None:
             columns = [f.name for f in fields]
+        if self.cache:
+            yield from self._get_cache(name).select(
+                columns, cast=(cast or self.autocast))
+            return
         index = make_field_index(fields)
         indices = [index[column] for column in columns]
         records = self[name]
@@ -366,15 +383,28 @@ class Database(object):
         if name not in self.schema:
             raise TSDBError(f'relation not defined in schema: {name}')
         fields = self.schema[name]
+        if self.cache:
+            if columns is None:
+                columns = [f.name for f in fields]
+            yield from self._get_cache(name).select(columns, cast=False)
+            return
         if columns is None:
             indices = list(range(len(fields)))
         else:
             index = make_field_index(fields)
             indices = [index[column] for column in columns]
         with open(self._path, name, encoding=self.encoding) as file:
-            for line in file:
-                record = typing_cast(RawRecord, split(line, fields=None))
-                yield tuple(record[idx] for idx in indices)
+            for record in split_lines(file):
+                yield tuple([record[idx] for idx in indices])
+
+    def _get_cache(self, name: str) -> 'RelationCache':
+        """Return the current binary cache of relation *name*."""
+        cache = self._caches.get(name)
+        if cache is None or not cache.is_current():
+            cache = load_cache(self._path, name, self.schema[name],
+                               encoding=self.encoding)
+            self._caches[name] = cache
+        return cache
 
 
 #############################################################################
@@ -415,28 +445,27 @@ def unescape(string: str) -> str:
         The string with escape sequences replaced
 
     """
+    # most values have no escapes at all, so avoid any work for them
+    if '\\' not in string:
+        return string
     # unescape cannot use multiple str.replace() calls because of
     # examples like '\\\\s' which turn into '@' instead of '\\s'
-    chars: List[str] = []
-    esc = False
-    for c in string:
-        if esc:
-            if c == '\\':
-                chars.append('\\')
-            elif c == 's':
-                chars.append('@')
-            elif c == 'n':
-                chars.append('\n')
-            else:
-                raise TSDBError('invalid escape sequence: \\' + c)
-            esc = False
-        elif c == '\\':
-            esc = True
-        else:
-            chars.append(c)
-    if esc:
-        raise TSDBError(f'invalid escape at end-of-string: {string!r}')
-    return ''.join(chars)
+    return _escape_sequence_re.sub(_unescape_match, string)
+
+
+_unescapes = {'\\': '\\', 's': FIELD_DELIMITER, 'n': '\n'}
+_escape_sequence_re = re.compile(r'\\(.|\Z)', flags=re.DOTALL)
+
+
+def _unescape_match(m) -> str:
+    c = m.group(1)
+    try:
+        return _unescapes[c]
+    except KeyError:
+        if c:
+            raise TSDBError('invalid escape sequence: \\' + c) from None
+        raise TSDBError(
+            f'invalid escape at end-of-string: {m.string!r}') from None
 
 
 def split(line: str,
@@ -451,14 +480,20 @@ def split(line: str,
     If *fields* is given, cast each column value into its datatype,
     otherwise the value is returned as a string.
 
+    For decoding many lines at once, :func:`split_lines` is faster.
+
     Args:
         line: raw line from a TSDB relation file.
         fields: iterable of :class:`Field` objects
     Returns:
         A list of column values.
     """
-    raw_values = [unescape(col) if col else None
-                  for col in line.rstrip('\n').split(FIELD_DELIMITER)]
+    line = line.rstrip('\n')
+    if '\\' in line:
+        raw_values = [unescape(col) if col else None
+                      for col in line.split(FIELD_DELIMITER)]
+    else:
+        raw_values = [col or None for col in line.split(FIELD_DELIMITER)]
     if fields:
         if len(raw_values) != len(fields):
             _mismatched_counts(raw_values, fields)
@@ -469,6 +504,44 @@ def split(line: str,
     return record
 
 
+def split_lines(lines: Iterable[str],
+                fields: Fields = None) -> Iterator[Record]:
+    """
+    Split each raw line in *lines* into a record of column values.
+
+    This yields the same records as calling :func:`split` on each line
+    but it is faster when decoding whole relations, as the per-line
+    setup is done only once.
+
+    Args:
+        lines: raw lines from a TSDB relation file
+        fields: iterable of :class:`Field` objects
+    Yields:
+        Tuples of column values
+    Example:
+        >>> with tsdb.open('my-profile', 'item') as lines:
+        ...     records = list(tsdb.split_lines(lines))
+    """
+    delimiter = FIELD_DELIMITER
+    if fields:
+        ncols = len(fields)
+        casts = [_caster(f.datatype) for f in fields]
+    for line in lines:
+        line = line.rstrip('\n')
+        if '\\' in line:
+            raw_values = [unescape(col) if col else None
+                          for col in line.split(delimiter)]
+        else:
+            raw_values = [col or None for col in line.split(delimiter)]
+        if fields:
+            if len(raw_values) != ncols:
+                _mismatched_counts(raw_values, fields)
+            yield tuple([None if col is None else to_value(col)
+                         for to_value, col in zip(casts, raw_values)])
+        else:
+            yield tuple(raw_values)
+
+
 def join(values: Record,
          fields: Fields = None) -> str:
     """
@@ -495,8 +568,12 @@ def join(values: Record,
                       for f, val in zip(fields, values)]
     else:
         raw_values = ['' if v is None else str(v) for v in values]
-    escaped_values = map(escape, raw_values)
-    return FIELD_DELIMITER.join(escaped_values)
+    line = FIELD_DELIMITER.join(raw_values)
+    # if the only delimiters are the joining ones, nothing needs escaping
+    if ('\\' in line or '\n' in line
+            or line.count(FIELD_DELIMITER) >= len(raw_values)):
+        line = FIELD_DELIMITER.join(map(escape, raw_values))
+    return line
 
 
 def _mismatched_counts(columns, fields):
@@ -598,6 +675,32 @@ def cast(datatype: str, raw_value: Optional[str]) -> Value:
 _cast = cast
 
 
+def _caster(datatype: str) -> Callable[[str], Value]:
+    """Return a function casting non-empty strings to *datatype*."""
+    if datatype == ':integer':
+        return int
+    elif datatype == ':float':
+        return float
+    elif datatype == ':date':
+        return _parse_datetime
+    elif datatype == ':string':
+        return str
+    else:
+        # defer the error until there is a value to cast, as cast() does
+        return lambda raw_value: cast(datatype, raw_value)
+
+
+def _nullable_caster(datatype: str) -> Callable[[Optional[str]], Value]:
+    """Return a function casting raw values to *datatype* like cast()."""
+    to_value = _caster(datatype)
+
+    def cast_raw(raw_value: Optional[str]) -> Value:
+        # cast() returns None for both None and ''
+        return to_value(raw_value) if raw_value else None
+
+    return cast_raw
+
+
 def _parse_datetime(s: str) -> Union[datetime, None]:
     if re.match(r':?(today|now)', s):
         return datetime.now()
@@ -996,3 +1099,324 @@ def _cleanup_files(path, names):
             tx_path.unlink()
         if gz_path.is_file():
             gz_path.unlink()
+
+
+#############################################################################
+# Binary Relation Caches
+
+CACHE_SUFFIX = '.cache'
+_CACHE_MAGIC = b'PYDELPHIN TSDB CACHE\n'
+_CACHE_VERSION = 1
+_CACHE_ALIGNMENT = 8
+# integers outside this range do not fit in the cache's int64 columns
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def cache_path(dir: util.PathLike, name: str) -> Path:
+    """
+    Return the path of the binary cache file for relation *name*.
+
+    Cache files are hidden files next to the relation files; e.g., the
+    cache of `item` (or `item.gz`) is `.item.cache`.
+    """
+    return Path(dir, f'.{name}{CACHE_SUFFIX}').expanduser()
+
+
+def load_cache(dir: util.PathLike,
+               name: str,
+               fields: Fields,
+               encoding: str = 'utf-8') -> 'RelationCache':
+    """
+    Return the binary cache of relation *name*, building it if needed.
+
+    An existing cache file is used only if it was built with the same
+    *fields* from the relation file with the size and modification
+    time the file currently has; otherwise it is rebuilt from the
+    relation file.
+
+    Args:
+        dir: path to the database directory
+        name: name of the relation
+        fields: the relation's schema
+        encoding: character encoding of the relation file
+    """
+    path = cache_path(dir, name)
+    if path.is_file():
+        try:
+            cache = RelationCache(path)
+        except (ValueError, KeyError, OSError):
+            pass  # corrupt or from another version; rebuild it
+        else:
+            if cache.is_current() and cache.fields == list(fields):
+                return cache
+            cache.close()
+    write_cache(dir, name, fields, encoding=encoding)
+    return RelationCache(path)
+
+
+def write_cache(dir: util.PathLike,
+                name: str,
+                fields: Fields,
+                encoding: str = 'utf-8') -> Path:
+    """
+    Parse relation *name* and write its binary cache file.
+
+    The cache stores each column contiguously. Columns with the
+    `:integer` or `:float` datatypes are stored as 64-bit numbers if
+    every value survives the round trip from text to number and back,
+    otherwise, like other columns, they are stored as UTF-8 strings.
+    The file is written atomically, so concurrent readers never see a
+    partial cache.
+
+    Args:
+        dir: path to the database directory
+        name: name of the relation
+        fields: the relation's schema
+        encoding: character encoding of the relation file
+    Returns:
+        The path of the cache file
+    """
+    source = get_path(dir, name)
+    stat = source.stat()
+    ncols = len(fields)
+    columns: List[List[RawValue]] = [[] for _ in range(ncols)]
+    with open(dir, name, encoding=encoding) as lines:
+        for values in split_lines(lines):
+            if len(values) != ncols:
+                _mismatched_counts(values, fields)
+            for column, value in zip(columns, values):
+                column.append(value)
+
+    header: Dict[str, Any] = {
+        'version': _CACHE_VERSION,
+        'byteorder': sys.byteorder,
+        'relation': name,
+        'source': source.name,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'count': len(columns[0]) if columns else 0,
+        'columns': [],
+    }
+    segments: List[bytes] = []
+    offset = 0
+
+    def add_segment(data: bytes) -> List[int]:
+        nonlocal offset
+        segments.append(data)
+        padding = -len(data) % _CACHE_ALIGNMENT
+        if padding:
+            segments.append(b'\0' * padding)
+        span = [offset, len(data)]
+        offset += len(data) + padding
+        return span
+
+    for field, column in zip(fields, columns):
+        kind, parts = _encode_cache_column(field.datatype, column)
+        header['columns'].append({
+            'name': field.name,
+            'datatype': field.datatype,
+            'flags': field.flags,
+            'kind': kind,
+            'segments': [add_segment(part) for part in parts],
+        })
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-len(header_bytes) % _CACHE_ALIGNMENT)
+    prefix = _CACHE_MAGIC + len(header_bytes).to_bytes(8, 'little')
+    prefix += b'\0' * (-len(prefix) % _CACHE_ALIGNMENT)
+
+    path = cache_path(dir, name)
+    with tempfile.NamedTemporaryFile(
+            dir=str(path.parent), prefix=path.name, delete=False) as f_tmp:
+        f_tmp.write(prefix)
+        f_tmp.write(header_bytes)
+        for segment in segments:
+            f_tmp.write(segment)
+    os.chmod(f_tmp.name, stat.st_mode & 0o666)  # readable like the source
+    os.replace(f_tmp.name, str(path))
+    return path
+
+
+def _encode_cache_column(datatype: str,
+                         column: List[RawValue]) -> Tuple[str, List[bytes]]:
+    """Return the storage kind and binary segments of *column*."""
+    nulls = bytes(value is None for value in column)
+    if datatype == ':integer':
+        try:
+            ints = [0 if v is None else int(v) for v in column]
+        except ValueError:
+            pass
+        else:
+            if (all(v is None or str(i) == v for i, v in zip(ints, column))
+                    and all(_INT64_MIN <= i <= _INT64_MAX for i in ints)):
+                return 'i', [array('q', ints).tobytes(), nulls]
+    elif datatype == ':float':
+        try:
+            floats = [0.0 if v is None else float(v) for v in column]
+        except ValueError:
+            pass
+        else:
+            if all(v is None or repr(f) == v for f, v in zip(floats, column)):
+                return 'f', [array('d', floats).tobytes(), nulls]
+    encoded = [b'' if v is None else v.encode('utf-8') for v in column]
+    offsets = array('q', [0])
+    pos = 0
+    for data in encoded:
+        pos += len(data)
+        offsets.append(pos)
+    return 's', [offsets.tobytes(), b''.join(encoded), nulls]
+
+
+class RelationCache(object):
+    """
+    A memory-mapped binary cache of a relation.
+
+    Cache files are created with :func:`write_cache`, but usually a
+    :class:`RelationCache` is obtained with :func:`load_cache`, which
+    also ensures the cache is current. Columns are read directly
+    from the memory-mapped file, so only the columns that are
+    selected are ever read. The file is mapped until :meth:`close`
+    is called, which a `with` statement does on exit:
+
+    >>> with tsdb.load_cache('my-profile', 'item', fields) as cache:
+    ...     inputs = list(cache.column('i-input'))
+
+    Args:
+        path: path to the cache file
+    Attributes:
+        path: The path of the cache file.
+        source: The path of the relation file the cache was built from.
+        fields: The relation's fields when the cache was built.
+    """
+
+    def __init__(self, path: util.PathLike) -> None:
+        self.path = Path(path)
+        with self.path.open('rb') as fh:
+            prefix_len = len(_CACHE_MAGIC) + 8
+            prefix_len += -prefix_len % _CACHE_ALIGNMENT
+            prefix = fh.read(prefix_len)
+            if not prefix.startswith(_CACHE_MAGIC):
+                raise ValueError(f'not a relation cache: {path!s}')
+            size = int.from_bytes(
+                prefix[len(_CACHE_MAGIC):len(_CACHE_MAGIC) + 8], 'little')
+            header = json.loads(fh.read(size).decode('utf-8'))
+            if (header['version'] != _CACHE_VERSION
+                    or header['byteorder'] != sys.byteorder):
+                raise ValueError(f'incompatible relation cache: {path!s}')
+            if header['count'] and header['columns']:
+                self._map: Optional[mmap.mmap] = mmap.mmap(
+                    fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = None  # cannot map empty files
+        self._start = prefix_len + size
+        self._header = header
+        self.source = self.path.parent.joinpath(header['source'])
+        self.fields = [Field(col['name'], col['datatype'], col['flags'])
+                       for col in header['columns']]
+        self._columns = {col['name']: col for col in header['columns']}
+
+    def __len__(self) -> int:
+        return self._header['count']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False  # don't try to handle any exceptions
+
+    def close(self) -> None:
+        """
+        Close the memory-mapped cache file.
+
+        Iterators from :meth:`column` and :meth:`select` must be
+        exhausted or closed first; afterwards, reading columns raises
+        a :exc:`ValueError`.
+        """
+        if self._map is not None:
+            self._map.close()
+
+    def is_current(self) -> bool:
+        """
+        Return `True` if the relation file has not changed.
+
+        The relation file has changed if its size or modification
+        time differs from when the cache was built, or if a different
+        file (e.g., a newer gzipped file) would now be read instead.
+        """
+        header = self._header
+        try:
+            source = get_path(self.path.parent, header['relation'])
+            stat = source.stat()
+        except (TSDBError, OSError):
+            return False
+        return (source == self.source
+                and stat.st_size == header['size']
+                and stat.st_mtime_ns == header['mtime'])
+
+    def column(self, name: str, cast: bool = False) -> Iterator[Value]:
+        """
+        Yield the values of column *name* in order.
+
+        If *cast* is `False`, the values are the strings as they
+        appear in the relation file after unescaping, otherwise they
+        are cast to the column's datatype as with :func:`cast`.
+        """
+        col = self._columns[name]
+        kind = col['kind']
+        segments = [self._segment(start, size)
+                    for start, size in col['segments']]
+        # the views must be released before the map can be closed
+        views = list(segments)
+        try:
+            if kind == 'i' or kind == 'f':
+                values = segments[0].cast('q' if kind == 'i' else 'd')
+                views.append(values)
+                nulls = segments[1]
+                if cast:
+                    for value, null in zip(values, nulls):
+                        yield None if null else value
+                else:
+                    convert = str if kind == 'i' else repr
+                    for value, null in zip(values, nulls):
+                        yield None if null else convert(value)
+            else:
+                offsets = segments[0].cast('q')
+                views.append(offsets)
+                data = segments[1]
+                nulls = segments[2]
+                datatype = col['datatype']
+                convert = None
+                if cast and datatype != ':string':
+                    convert = _cast
+                start = 0
+                for end, null in zip(offsets[1:], nulls):
+                    if null:
+                        yield None
+                    else:
+                        value = str(data[start:end], 'utf-8')
+                        yield value if convert is None else convert(
+                            datatype, value)
+                    start = end
+        finally:
+            for view in reversed(views):
+                view.release()
+
+    def select(self,
+               columns: Iterable[str],
+               cast: bool = False) -> Iterator[Tuple[Value, ...]]:
+        """
+        Yield tuples of the values of *columns* for each record.
+
+        See :meth:`column` for the meaning of *cast*.
+        """
+        iterators = [self.column(name, cast=cast) for name in columns]
+        if not iterators:
+            return iter([()] * len(self))
+        return zip(*iterators)
+
+    def _segment(self, start: int, size: int) -> memoryview:
+        if self._map is None:
+            return memoryview(b'')
+        start += self._start
+        return memoryview(self._map)[start:start + size]
@@ -5,7 +5,7 @@ TSQL -- Test Suite Query Language
 
 from typing import (
     List, Tuple, Dict, Set, Optional, Union, Any, Type,
-    Iterator, Callable, cast as typing_cast)
+    Iterator, Iterable, Callable, cast as typing_cast)
 import operator
 import re
 from datetime import datetime
@@ -41,6 +41,7 @@ _Condition = Union[_Comparison, _Boolean]
 _FilterFunction = Callable[[tsdb.Record], bool]
 
 _QNameResolver = Callable[[str], Tuple[str, tsdb.Field]]
+_HashTable = Dict[Tuple[tsdb.Value, ...], List[tsdb.RawRecord]]
 
 
 class _Record(tsdb.Record):
@@ -181,14 +182,7 @@ def _select(projection: _Names,
     proj, joins, condition = _make_execution_plan(
         projection, relations, condition, db)
     selection = Selection(record_class=record_class)
-
-    for name, columns in joins:
-        _join(selection, db, name, columns, 'inner')
-
-    if condition:
-        cond = _process_condition_function(condition, selection)
-        selection.data = list(filter(cond, selection.data))
-
+    selection.data = _Execution(db, selection, joins, condition)
     selection.projection = proj
     return selection
 
@@ -411,111 +405,276 @@ def _expected_type(datatype):
 
 def _process_condition_function(
         condition: _Condition,
-        selection: Selection) -> _FilterFunction:
-    field_index = selection._field_index
-    fields = selection.fields
+        fields: tsdb.Fields,
+        field_index: tsdb.FieldIndex) -> _FilterFunction:
+    """
+    Compile *condition* into a function over raw records.
+
+    Column indices, cast functions, and regular expressions are
+    resolved here, once, so the returned function only has to index
+    the record and compare the values.
+    """
     # conditions are something like:
     #  ('==', ('i-id', 11))
     op, body = condition
     if op in ('and', 'or'):
         body = typing_cast(List[_Condition], body)
-        conditions = []
-        for cond in body:
-            _func = _process_condition_function(cond, selection)
-            conditions.append(_func)
-        _func = all if op == 'and' else any
-
-        def func(row):
-            return _func(cond(row) for cond in conditions)
+        funcs = [_process_condition_function(cond, fields, field_index)
+                 for cond in body]
+        if len(funcs) == 1:
+            return funcs[0]
+        elif op == 'and':
+            return _conjoin(funcs)
+        else:
+            return _disjoin(funcs)
 
     elif op == 'not':
-        nfunc = _process_condition_function(body, selection)
+        nfunc = _process_condition_function(body, fields, field_index)
 
         def func(row):
             return not nfunc(row)
 
-    elif op == '~':
+        return func
+
+    index = field_index[body[0]]
+    datatype = fields[index].datatype
+    target = body[1]
+
+    if op in ('~', '!~'):
+        search = re.compile(target).search
+        cast = tsdb._nullable_caster(datatype)
+        if op == '~':
+
+            def func(row):
+                value = cast(row[index])
+                return value is not None and search(value) is not None
+
+        else:
+
+            def func(row):
+                value = cast(row[index])
+                return value is None or search(value) is None
+
+    else:
+        compare = _operator_functions[op]
+        if datatype == ':string':
+
+            def func(row):
+                value = row[index]
+                # empty strings are cast to None, which never matches
+                return bool(value) and compare(value, target)
+
+        else:
+            cast = tsdb._nullable_caster(datatype)
+
+            def func(row):
+                value = cast(row[index])
+                return value is not None and compare(value, target)
+
+    return func
+
+
+def _conjoin(funcs: List[_FilterFunction]) -> _FilterFunction:
+    if len(funcs) == 2:
+        first, second = funcs
 
         def func(row):
-            index = field_index[body[0]]
-            field = fields[index]
-            value = tsdb.cast(field.datatype, row[index])
-            return value is not None and re.search(body[1], value)
+            return first(row) and second(row)
+
+    else:
+
+        def func(row):
+            for f in funcs:
+                if not f(row):
+                    return False
+            return True
+
+    return func
+
 
-    elif op == '!~':
+def _disjoin(funcs: List[_FilterFunction]) -> _FilterFunction:
+    if len(funcs) == 2:
+        first, second = funcs
 
         def func(row):
-            index = field_index[body[0]]
-            field = fields[index]
-            value = tsdb.cast(field.datatype, row[index])
-            return value is None or not re.search(body[1], value)
+            return first(row) or second(row)
 
     else:
-        compare = _operator_functions[op]
 
         def func(row):
-            index = field_index[body[0]]
-            field = fields[index]
-            value = tsdb.cast(field.datatype, row[index])
-            return value is not None and compare(value, body[1])
+            for f in funcs:
+                if f(row):
+                    return True
+            return False
 
     return func
 
 
 # RELATION JOINS ##############################################################
 
-def _join(selection: Selection,
-          db: tsdb.Database,
-          name: str,
-          columns: _Names,
-          how: str = 'inner') -> None:
+class _Execution(object):
+    """
+    The lazily-evaluated records of a query as a pipeline of joins.
+
+    The first relation in *joins* is streamed from its file and each
+    subsequent relation is joined to it with a hash join, where the
+    hash table holds only the columns needed by the query. Parts of
+    *condition* that only concern a single relation are evaluated
+    while reading that relation, so rows that do not meet them are
+    neither stored nor joined. Other parts are evaluated as soon as
+    all the relations they concern have been joined.
+
+    The records are computed anew each time the object is iterated
+    over. Field information is merged into *selection* when the
+    object is created.
     """
-    Join *fields* from *relation* into *selection*.
 
-    If *how* is `"inner"`, then only matched rows persist after
-    the join; if *how* is `"left"`, all existing rows are kept and
-    those without a match are padded with `None` values.
+    def __init__(self,
+                 db: tsdb.Database,
+                 selection: Selection,
+                 joins: List[Tuple[str, _Names]],
+                 condition: Optional[_Condition]) -> None:
+        self.db = db
+        self.steps: List[_JoinStep] = []
+        conditions = _conjuncts(condition) if condition else []
+        for name, columns in joins:
+            step = _JoinStep(db, selection, name, columns, conditions)
+            conditions = [cond for cond in conditions
+                          if cond not in step.conditions]
+            self.steps.append(step)
+        if conditions:
+            raise TSQLError('unresolved condition: {!r}'.format(conditions))
+
+    def __iter__(self) -> Iterator[tsdb.RawRecord]:
+        if not self.steps:
+            return
+        first, *rest = self.steps
+        records = first.scan(self.db)
+        for step in rest:
+            records = step.join(records, step.build(self.db))
+            if step.residual is not None:
+                records = filter(step.residual, records)
+        yield from records
+
+
+class _JoinStep(object):
     """
-    if how not in ('inner', 'left'):
-        raise TSQLError("only 'inner' and 'left' join methods are allowed")
-    if name in selection.joined:
-        raise TSQLError('cannot join the same relation twice')
-
-    all_fields = db.schema[name]
-    field_index = tsdb.make_field_index(all_fields)
-    indices = [field_index[col] for col in columns]
-    fields = [all_fields[idx] for idx in indices]
-
-    data: List[tsdb.Record] = []
-    if not selection.joined:
-        _merge_fields(selection, name, [], fields)
-        data.extend(db._select_raw(name, columns))
-    else:
+    The plan for joining one relation in an :class:`_Execution`.
+
+    Of *conditions*, those which concern only this relation are used
+    to filter its records, and those which concern this and
+    previously joined relations are applied to the joined records.
+    Both are kept in the :attr:`conditions` attribute.
+    """
+
+    def __init__(self,
+                 db: tsdb.Database,
+                 selection: Selection,
+                 name: str,
+                 columns: _Names,
+                 conditions: List[_Condition]) -> None:
+        if name in selection.joined:
+            raise TSQLError('cannot join the same relation twice')
+
+        all_fields = db.schema[name]
+        field_index = tsdb.make_field_index(all_fields)
+        fields = [all_fields[field_index[col]] for col in columns]
+
         on: List[str] = []
-        if selection is not None:
+        if selection.joined:
             on = [f.name for f in fields
                   if f.is_key and f.name in selection._field_index]
-        fields = [f for f in fields if f.name not in on]
-        cols = [f.name for f in fields]
-
-        if not on:
-            raise TSQLError('no shared keys for joining')
+            if not on:
+                raise TSQLError('no shared keys for joining')
+
+        self.name = name
+        self.columns = columns
+        self.left_keys = [(selection._field_index[col],
+                           selection.fields[selection._field_index[col]])
+                          for col in on]
+        self.right_keys = [(columns.index(col), fields[columns.index(col)])
+                           for col in on]
+        self.kept = [i for i, f in enumerate(fields) if f.name not in on]
+
+        # conditions on this relation alone filter records when read
+        local_index = {f'{name}.{f.name}': i for i, f in enumerate(fields)}
+        local = [cond for cond in conditions
+                 if _condition_relations(cond) == {name}]
+        self.filter = _combine_conditions(local, fields, local_index)
+
+        _merge_fields(selection, name, on, [fields[i] for i in self.kept])
+
+        # remaining conditions are applied once all relations are joined
+        joined = selection.joined
+        residual = [cond for cond in conditions
+                    if cond not in local
+                    and _condition_relations(cond) <= joined]
+        self.residual = _combine_conditions(
+            residual, selection.fields, selection._field_index)
+
+        self.conditions = local + residual
+
+    def scan(self, db: tsdb.Database) -> Iterator[tsdb.RawRecord]:
+        """Yield the needed columns of the relation's filtered records."""
+        records = db._select_raw(self.name, self.columns)
+        if self.filter is not None:
+            records = filter(self.filter, records)
+        return records
+
+    def build(self, db: tsdb.Database) -> _HashTable:
+        """Return a hash table of the relation's records by join keys."""
+        table: _HashTable = {}
+        keys = self.right_keys
+        kept = self.kept
+        cast = tsdb.cast
+        for record in self.scan(db):
+            key = tuple(cast(f.datatype, record[i]) for i, f in keys)
+            data = tuple(record[i] for i in kept)
+            table.setdefault(key, []).append(data)
+        return table
+
+    def join(self,
+             records: Iterable[tsdb.RawRecord],
+             table: _HashTable) -> Iterator[tsdb.RawRecord]:
+        """Yield *records* joined with matching records in *table*."""
+        keys = self.left_keys
+        cast = tsdb.cast
+        for record in records:
+            key = tuple(cast(f.datatype, record[i]) for i, f in keys)
+            for data in table.get(key, ()):
+                yield tuple(record) + data
+
+
+def _conjuncts(condition: _Condition) -> List[_Condition]:
+    """Return the list of conditions conjoined in *condition*."""
+    op, body = condition
+    if op == 'and':
+        return [conj for cond in body for conj in _conjuncts(cond)]
+    return [condition]
 
-        right: Dict[Tuple[tsdb.Value, ...], List[tsdb.Record]] = {}
-        for keys, row in zip(db.select_from(name, on, cast=True),
-                             db._select_raw(name, cols)):
-            right.setdefault(tuple(keys), []).append(tuple(row))
 
-        rfill = tuple([None] * len(fields))
-        for keys, lrow in zip(selection.select(*on, cast=True), selection):
-            keys = tuple(keys)
-            if how == 'left' or keys in right:
-                for rrow in right.get(keys, [rfill]):
-                    data.append(tuple(lrow) + tuple(rrow))
+def _condition_relations(condition: _Condition) -> Set[str]:
+    """Return the names of relations used by resolved *condition*."""
+    op, body = condition
+    if op in ('and', 'or'):
+        return set().union(*map(_condition_relations, body))
+    elif op == 'not':
+        return _condition_relations(body)
+    else:
+        return {body[0].rpartition('.')[0]}
 
-        _merge_fields(selection, name, on, fields)
 
-    selection.data = data
+def _combine_conditions(
+        conditions: List[_Condition],
+        fields: tsdb.Fields,
+        field_index: tsdb.FieldIndex) -> Optional[_FilterFunction]:
+    if not conditions:
+        return None
+    elif len(conditions) == 1:
+        condition = conditions[0]
+    else:
+        condition = ('and', conditions)
+    return _process_condition_function(condition, fields, field_index)
 
 
 def _merge_fields(selection: Selection,
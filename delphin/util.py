@@ -109,7 +109,11 @@ def _vf2(g1: _IsoGraph, g2: _IsoGraph) -> _IsoMap:
     # augment graph with inverse edges, making it effectively undirected
     _vf2_inv_map(g1)
     _vf2_inv_map(g2)
+    return _vf2_match(g1, g2)
 
+
+def _vf2_match(g1: _IsoGraph, g2: _IsoGraph) -> _IsoMap:
+    """Like :func:`_vf2` for graphs that already have inverse edges."""
     # VF2 is defined recursively but it is simple to make iterative
     mapping: _IsoMap = {}
     prev_n = None
@@ -156,6 +160,28 @@ def _vf2_inv_map(d: _IsoGraph) -> None:
         d[k].update(d2)
 
 
+def _wl_hash(g: _IsoGraph, iterations: int = 3) -> int:
+    """
+    Return a Weisfeiler-Lehman hash of graph *g*.
+
+    Isomorphic graphs always get the same hash, so graphs with
+    different hashes need not be compared with :func:`_vf2`, but
+    graphs with the same hash are not necessarily isomorphic. *g*
+    must already have inverse edges (see :func:`_vf2_inv_map`) and the
+    hash is only stable within one Python process.
+    """
+    labels = {n: hash(edges.get(None, '')) for n, edges in g.items()}
+    for _ in range(iterations):
+        labels = {
+            n: hash((labels[n],
+                     tuple(sorted(hash((data, labels[m]))
+                                  for m, data in edges.items()
+                                  if m is not None))))
+            for n, edges in g.items()
+        }
+    return hash(tuple(sorted(labels.values())))
+
+
 def _vf2_feasible(
         mapping: _IsoMap,
         g1: _IsoGraph,
@@ -276,7 +302,19 @@ class SExprResult(NamedTuple):
 
 # escapes from https://en.wikipedia.org/wiki/S-expression#Use_in_Lisp
 _SExpr_escape_chars = r'"\s\(\)\[\]\{\}\\;'
-_SExpr_symbol_re = re.compile(r'(?:[^{}]+|\\.)+'.format(_SExpr_escape_chars))
+# one token, preceded by any whitespace; the group that matched
+# gives the token type (see the _SExpr_* constants below)
+_SExpr_token_re = re.compile(
+    r'\s*(?:'
+    r'(\()'                                 # open
+    r'|(\))'                                # close
+    r'|"([^"\\]*(?:\\.[^"\\]*)*)"'          # string
+    r'|(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)'  # number
+    r'|((?:[^{}]+|\\.)+)'                   # symbol
+    r')'.format(_SExpr_escape_chars))
+_SExpr_OPEN, _SExpr_CLOSE, _SExpr_STRING, _SExpr_NUMBER, _SExpr_SYMBOL = (
+    1, 2, 3, 4, 5)
+_SExpr_space_re = re.compile(r'\s*')
 
 
 def _SExpr_unescape_symbol(s):
@@ -289,70 +327,88 @@ def _SExpr_unescape_string(s):
 
 class _SExprParser(object):
     def parse(self, s):
-        i = 0
-        n = len(s)
-        while i < n and s[i].isspace():
-            i += 1
-        if i == n:
+        """
+        Parse the first S-Expression in *s*.
+
+        Returns:
+            SExprResult: the parsed data and the rest of *s*
+        Raises:
+            IndexError: when *s* ends before the S-Expression does
+            ValueError: when *s* is not a valid S-Expression
+        """
+        pos = _SExpr_space_re.match(s).end()
+        if pos == len(s):
             return SExprResult([], '')
-        assert s[i] == '('
-        i += 1
-        while i < n and s[i].isspace():
-            i += 1
-        stack = [[]]
-        while i < n:
-            c = s[i]
-            # numbers
-            if c.isdigit() or c == '-' and s[i + 1].isdigit():
-                j = i + 1
-                while s[j].isdigit():
-                    j += 1
-                c = s[j]
-                if c in '.eE':  # float
-                    if c == '.':
-                        j += 1
-                        while s[j].isdigit():
-                            j += 1
-                    if c in 'eE':
-                        j += 1
-                        if s[j] in '+=':
-                            j += 1
-                        while s[j].isdigit():
-                            j += 1
-                    stack[-1].append(float(s[i:j]))
-                else:  # int
-                    stack[-1].append(int(s[i:j]))
-                i = j
-            elif c == '"':  # quoted strings
-                j = i + 1
-                while s[j] != '"':
-                    if s[j] == '\\':
-                        j += 2
-                    else:
-                        j += 1
-                stack[-1].append(
-                    _SExpr_unescape_string(s[i + 1 : j]))  # noqa: E203
-                i = j + 1
-            elif c == '(':
-                stack.append([])
-                i += 1
-            elif c == ')':
-                xs = stack.pop()
+        data, end = self._parse(s, pos)
+        return SExprResult(data, s[end:])
+
+    def iterparse(self, s):
+        """
+        Yield each S-Expression in *s* as it is parsed.
+
+        This is like calling :meth:`parse` on the remainder of each
+        result until nothing is left, but without copying the
+        remainders, which can be large.
+
+        Raises:
+            IndexError: when *s* ends before the last S-Expression
+                does
+            ValueError: when *s* is not a valid S-Expression
+        """
+        pos = 0
+        end = len(s)
+        space = _SExpr_space_re.match
+        while True:
+            pos = space(s, pos).end()
+            if pos == end:
+                break
+            data, pos = self._parse(s, pos)
+            yield data
+
+    def _parse(self, s, pos):
+        match = _SExpr_token_re.match
+        m = match(s, pos)
+        if m is None or m.lastindex != _SExpr_OPEN:
+            raise ValueError('Invalid S-Expression: ' + s)
+        pos = m.end()
+        stack = []
+        xs = []
+        while True:
+            m = match(s, pos)
+            if m is None:
+                rest = s[pos:].lstrip()
+                if not rest or rest.startswith('"'):
+                    raise IndexError('incomplete S-Expression')
+                raise ValueError('Invalid S-Expression: ' + s)
+            pos = m.end()
+            kind = m.lastindex
+            if kind == _SExpr_SYMBOL:
+                token = m.group(kind)
+                if '\\' in token:
+                    token = _SExpr_unescape_symbol(token)
+                xs.append(token)
+            elif kind == _SExpr_STRING:
+                token = m.group(kind)
+                if '\\' in token:
+                    token = _SExpr_unescape_string(token)
+                xs.append(token)
+            elif kind == _SExpr_NUMBER:
+                token = m.group(kind)
+                if '.' in token or 'e' in token or 'E' in token:
+                    xs.append(float(token))
+                else:
+                    xs.append(int(token))
+            elif kind == _SExpr_OPEN:
+                stack.append(xs)
+                xs = []
+            else:  # _SExpr_CLOSE
                 if len(xs) == 3 and xs[1] == '.':
                     xs = tuple(xs[::2])
-                if len(stack) == 0:
-                    return SExprResult(xs, s[i + 1 :])  # noqa: E203
-                else:
-                    stack[-1].append(xs)
-                i += 1
-            elif c.isspace():
-                i += 1
-            else:
-                m = _SExpr_symbol_re.match(s, pos=i)
-                if m is None:
-                    raise ValueError('Invalid S-Expression: ' + s)
-                stack[-1].append(_SExpr_unescape_symbol(m.group(0)))
-                i += len(m.group(0))
+                if not stack:
+                    return xs, pos
+                parent = stack.pop()
+                parent.append(xs)
+                xs = parent
 
     def format(self, d):
         if isinstance(d, tuple) and len(d) == 2:
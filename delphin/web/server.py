@@ -3,12 +3,17 @@
 DELPH-IN Web API Server
 """
 
-from typing import Optional, Type
+from typing import (
+    Optional, Type, Callable, Dict, List, Tuple, Iterator)
 import pathlib
 import urllib.parse
 import datetime
 import json
 import functools
+import contextlib
+import threading
+import time
+import logging
 
 import falcon
 
@@ -27,6 +32,9 @@ from delphin import itsdb
 from delphin import tokens
 
 
+logger = logging.getLogger(__name__)
+
+
 def configure(api, parser=None, generator=None, testsuites=None):
     """
     Configure server application *api*.
@@ -82,22 +90,240 @@ def configure(api, parser=None, generator=None, testsuites=None):
     api.resp_options.media_handlers['application/json'] = _json_handler
 
 
+_PoolKey = Tuple[str, ...]
+
+
+class ProcessorPool(object):
+    """
+    A bounded pool of reusable processors.
+
+    Starting a processor such as :class:`~delphin.ace.ACEParser` is
+    expensive because the grammar image must be loaded each time, so
+    this class keeps warm processors around between requests. Each
+    processor is created with some command-line arguments (e.g.,
+    `('-n', '5')`) and is only reused for requests with the same
+    arguments. No more than *size* processors exist at once; when the
+    pool is full and no idle processor has the requested arguments,
+    the least-recently used idle processor is closed to make room,
+    otherwise the request waits for a processor to be returned.
+
+    Processors that have exited (e.g., ACE crashed) or that raised an
+    exception while checked out are closed and replaced by new ones on
+    demand. If *max_requests* is given, processors are also replaced
+    after handling that many requests, which bounds the effect of any
+    memory growth in long-running processes.
+
+    Args:
+        spawn: a function taking command-line arguments and returning
+            a new processor
+        size: the maximum number of processors in the pool
+        max_requests: the number of requests a processor handles
+            before it is replaced; if `None`, processors are only
+            replaced when they fail
+        timeout: the number of seconds to wait for an available
+            processor; if `None`, wait indefinitely
+    Example:
+        >>> pool = ProcessorPool(
+        ...     lambda *args: ace.ACEParser('erg.dat', list(args)))
+        >>> with pool.processor('-n', '1') as cpu:
+        ...     response = cpu.interact('Dogs bark.')
+    """
+
+    def __init__(self,
+                 spawn: Callable[..., interface.Processor],
+                 size: int = 4,
+                 max_requests: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        if size < 1:
+            raise ValueError('pool size must be positive: {}'.format(size))
+        self.spawn = spawn
+        self.size = size
+        self.max_requests = max_requests
+        self.timeout = timeout
+        # idle processors, from least to most recently used
+        self._idle: List[Tuple[_PoolKey, interface.Processor]] = []
+        # checked-out processors mapped to their keys and request counts
+        self._busy: Dict[int, Tuple[_PoolKey, int]] = {}
+        self._uses: Dict[int, int] = {}
+        self._count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @contextlib.contextmanager
+    def processor(self, *args: str) -> Iterator[interface.Processor]:
+        """
+        Check out a processor for *args* for the duration of a block.
+
+        The processor is returned to the pool at the end of the block,
+        unless an exception was raised, in which case it is closed.
+        """
+        cpu = self.checkout(*args)
+        try:
+            yield cpu
+        except BaseException:
+            self.checkin(cpu, healthy=False)
+            raise
+        else:
+            self.checkin(cpu)
+
+    def checkout(self, *args: str) -> interface.Processor:
+        """
+        Return a processor started with *args* for exclusive use.
+
+        Raises:
+            InterfaceError: when the pool is closed or no processor
+                became available within the timeout
+        """
+        key = tuple(args)
+        stale: List[interface.Processor] = []
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise interface.InterfaceError('the pool is closed')
+                    cpu = self._take_idle(key, stale)
+                    if cpu is not None:
+                        self._busy[id(cpu)] = (key, self._uses.pop(id(cpu)))
+                        return cpu
+                    if self._count >= self.size and self._idle:
+                        # make room by evicting the least-recently used
+                        _, victim = self._idle.pop(0)
+                        self._forget(victim, stale)
+                    if self._count < self.size:
+                        self._count += 1
+                        break
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise interface.InterfaceError(
+                                'no processor became available')
+                    self._cond.wait(remaining)
+        finally:
+            _close_all(stale)
+
+        try:
+            cpu = self.spawn(*args)
+        except BaseException:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._busy[id(cpu)] = (key, 0)
+        return cpu
+
+    def checkin(self, cpu: interface.Processor, healthy: bool = True) -> None:
+        """
+        Return *cpu* to the pool after use.
+
+        If *healthy* is `False`, the processor has exited, the pool is
+        closed, or it has handled *max_requests* requests, *cpu* is
+        closed instead of being made available again.
+        """
+        stale: List[interface.Processor] = []
+        with self._cond:
+            key, uses = self._busy.pop(id(cpu))
+            uses += 1
+            if (not healthy
+                    or self._closed
+                    or not _is_alive(cpu)
+                    or (self.max_requests is not None
+                        and uses >= self.max_requests)):
+                self._count -= 1
+                stale.append(cpu)
+            else:
+                self._idle.append((key, cpu))
+                self._uses[id(cpu)] = uses
+            self._cond.notify()
+        _close_all(stale)
+
+    def close(self) -> None:
+        """
+        Close all idle processors and any that are checked in later.
+        """
+        stale: List[interface.Processor] = []
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                _, cpu = self._idle.pop()
+                self._forget(cpu, stale)
+            self._cond.notify_all()
+        _close_all(stale)
+
+    def _take_idle(self,
+                   key: _PoolKey,
+                   stale: List[interface.Processor]):
+        """Remove and return the most recent live idle *key* processor."""
+        idle = self._idle
+        for i in range(len(idle) - 1, -1, -1):
+            if idle[i][0] == key:
+                _, cpu = idle.pop(i)
+                if _is_alive(cpu):
+                    return cpu
+                logger.info('Replacing a processor that has exited')
+                self._forget(cpu, stale)
+        return None
+
+    def _forget(self,
+                cpu: interface.Processor,
+                stale: List[interface.Processor]) -> None:
+        """Stop tracking idle processor *cpu* and schedule it to close."""
+        del self._uses[id(cpu)]
+        self._count -= 1
+        stale.append(cpu)
+
+
+def _is_alive(cpu: interface.Processor) -> bool:
+    # only subprocess-based processors like ACEProcess can exit
+    return getattr(cpu, 'alive', True)
+
+
+def _close_all(cpus: List[interface.Processor]) -> None:
+    for cpu in cpus:
+        try:
+            cpu.close()  # type: ignore
+        except Exception:
+            logger.exception('Error closing a processor')
+
+
 class ProcessorServer(object):
     """
     A server for results from an ACE processor.
 
+    Processors are kept in a :class:`ProcessorPool` so that requests
+    do not have to wait for a new processor to load the grammar.
+
     Note:
 
         This class is not meant to be used directly. Use a subclass
         instead.
+
+    Args:
+        grammar: path to the compiled grammar image
+        args: command-line arguments for the processors
+        pool_size: the maximum number of processors in the pool
+        max_requests: the number of requests a processor handles
+            before it is replaced; if `None`, processors are only
+            replaced when they fail
+        kwargs: additional keyword arguments for the processors
     """
 
     processor_class: Optional[Type[interface.Processor]] = None
 
-    def __init__(self, grammar, *args, **kwargs):
+    def __init__(self, grammar, *args,
+                 pool_size=4, max_requests=1000, **kwargs):
         self.grammar = grammar
         self.args = list(args)
         self.kwargs = kwargs
+        self.pool = ProcessorPool(
+            self.spawn, size=pool_size, max_requests=max_requests)
 
     def spawn(self, *args):
         cmdargs = self.args + list(args)
@@ -106,11 +332,15 @@ class ProcessorServer(object):
             cmdargs,
             **self.kwargs)
 
+    def close(self):
+        """Close the pooled processors."""
+        self.pool.close()
+
     def on_get(self, req, resp):
         inp = req.get_param('input', required=True)
         n = req.get_param_as_int('results', min_value=1, default=1)
 
-        with self.spawn('-n', str(n)) as cpu:
+        with self.pool.processor('-n', str(n)) as cpu:
             ace_resp = cpu.interact(inp)
 
         args = _get_args(req)
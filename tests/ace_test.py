@@ -1,9 +1,13 @@
 
 import io
+import sys
+import asyncio
 
 import pytest
 
 from delphin import ace
+from delphin import interface
+from delphin import itsdb
 
 
 @pytest.fixture
@@ -60,3 +64,194 @@ def test_start(ace_mismatch, tmp_path, monkeypatch):
             ace.ACEParser(str(grm))
         with pytest.raises(ace.ACEProcessError):
             ace.parse(str(grm), 'Dogs sleep.')
+
+
+@pytest.fixture
+def mock_ace(tmp_path):
+    # a stand-in for ACE's regular parsing protocol
+    script = tmp_path / 'ace'
+    script.write_text(
+        '#!{}\n'
+        'import sys, time\n'
+        'for line in sys.stdin:\n'
+        '    if line.strip() == "crash":\n'
+        '        sys.exit(1)\n'
+        '    if line.strip() == "hang":\n'
+        '        time.sleep(60)\n'
+        '    print("SENT: " + line.strip())\n'
+        '    print("[ MRS of {{}} ] ; (deriv)".format(line.strip()))\n'
+        '    print()\n'
+        '    print("NOTE: 1 readings")\n'
+        '    print()\n'
+        '    sys.stdout.flush()\n'
+        .format(sys.executable))
+    script.chmod(0o755)
+    return script
+
+
+def test_AsyncACEParser(mock_ace, tmp_path, monkeypatch):
+    grm = tmp_path / 'grm.dat'
+    grm.write_text('')
+    monkeypatch.setattr(ace, '_ace_version', lambda x: (0, 9, 13))
+
+    async def parse_all(sentences):
+        async with ace.AsyncACEParser(grm, executable=mock_ace) as p1, \
+                ace.AsyncACEParser(grm, executable=mock_ace) as p2:
+            coros = [(p1 if i % 2 else p2).process_item(s, {'i-id': i})
+                     for i, s in enumerate(sentences)]
+            coros.append(p1.interact(''))
+            return await asyncio.gather(*coros)
+
+    loop = asyncio.new_event_loop()
+    try:
+        responses = loop.run_until_complete(
+            parse_all(['Dogs bark.', 'Cats sleep.', 'Birds sing.']))
+    finally:
+        loop.close()
+    assert [r['keys'] for r in responses[:3]] == [
+        {'i-id': 0}, {'i-id': 1}, {'i-id': 2}]
+    assert [r['task'] for r in responses[:3]] == ['parse'] * 3
+    assert responses[1]['surface'] == 'Cats sleep.'
+    assert responses[1]['input'] == 'Cats sleep.'
+    assert responses[1]['NOTES'] == ['1 readings']
+    assert responses[1]['results'] == [
+        {'mrs': '[ MRS of Cats sleep. ]', 'derivation': '(deriv)'}]
+    assert responses[3]['results'] == []  # empty input is not sent
+
+
+def test_ACEParser_interact_many(mock_ace, tmp_path, monkeypatch):
+    grm = tmp_path / 'grm.dat'
+    grm.write_text('')
+    monkeypatch.setattr(ace, '_ace_version', lambda x: (0, 9, 13))
+    sentences = ['A{}.'.format(i) for i in range(10)]
+    sentences[3] = ''  # not sent to ACE
+    sentences[6] = 'crash'
+    with ace.ACEParser(grm, executable=mock_ace) as parser:
+        with pytest.raises(ValueError):
+            list(parser.interact_many(sentences, window=0))
+        responses = list(parser.interact_many(sentences, window=3))
+        assert [r['input'] for r in responses] == sentences
+        assert [len(r['results']) for r in responses] == [
+            1, 1, 1, 0, 1, 1, 0, 1, 1, 1]
+        assert responses[9]['results'][0]['mrs'] == '[ MRS of A9. ]'
+        assert len(parser.run_infos) == 2  # restarted after the crash
+        # the process is still in sync for regular interactions
+        assert parser.interact('Hi.')['surface'] == 'Hi.'
+        items = [('B{}.'.format(i), {'i-id': i}) for i in range(5)]
+        responses = list(parser.process_items(items, window=2))
+        assert [r['keys'] for r in responses] == [keys for _, keys in items]
+        assert [r['surface'] for r in responses] == [d for d, _ in items]
+
+
+def test_ResponseCache(mock_ace, tmp_path, monkeypatch):
+    grm = tmp_path / 'grm.dat'
+    grm.write_text('grammar 1')
+    monkeypatch.setattr(ace, '_ace_version', lambda x: (0, 9, 13))
+    sentences = ['A0.', 'A1.', '', 'A2.']
+    with ace.ResponseCache(tmp_path / 'responses') as cache:
+        with ace.ACEParser(grm, executable=mock_ace, cache=cache) as parser:
+            first = [parser.interact(s) for s in sentences]
+        assert len(cache) == 3  # the empty input was not sent
+        assert cache.stats()['misses'] == 3
+        with ace.ACEParser(grm, executable=mock_ace, cache=cache) as parser:
+            second = list(parser.interact_many(sentences))
+            assert second[1]['run'] is parser.run_info
+        assert cache.stats()['hits'] == 3
+        for r1, r2 in zip(first, second):
+            assert r1['input'] == r2['input']
+            assert r1['results'] == r2['results']
+            assert r1['NOTES'] == r2['NOTES']
+        # different options do not share responses
+        with ace.ACEParser(grm, executable=mock_ace, cache=cache,
+                           cmdargs=['-n', '1']) as parser:
+            parser.interact('A0.')
+        assert cache.misses == 4
+    # a changed grammar does not share responses; the cache persists
+    grm.write_text('grammar 2')
+    with ace.ResponseCache(tmp_path / 'responses', max_entries=5) as cache:
+        assert len(cache) == 4
+        with ace.ACEParser(grm, executable=mock_ace, cache=cache) as parser:
+            parser.interact('A0.')
+            parser.interact('A1.')
+        assert cache.stats() == {
+            'entries': 5, 'bytes': cache.stats()['bytes'],
+            'hits': 0, 'misses': 2, 'evictions': 1}
+
+
+def test_ResponseCache_flags(tmp_path):
+    def make_response():
+        return interface.Response({
+            'input': 'A0.',
+            'keys': {'i-id': 10},
+            'results': [{'result-id': 0,
+                         'mrs': '[ MRS of A0. ]',
+                         'flags': [(':ascore', 0.4),
+                                   (':probability', 0.8)]}]})
+
+    with ace.ResponseCache(tmp_path / 'responses') as cache:
+        cache.put('key', make_response())
+        cached = cache.get('key')
+    assert cached['results'] == make_response()['results']
+    cached['keys'] = {'i-id': 10}
+    uncached_rows = itsdb.FieldMapper().map(make_response())
+    cached_rows = itsdb.FieldMapper().map(cached)
+    assert cached_rows == uncached_rows
+    assert cached_rows[1] == ('result', {
+        'parse-id': 10,
+        'flags': '((:ascore . 0.4) (:probability . 0.8))',
+        'result-id': 0,
+        'mrs': '[ MRS of A0. ]'})
+
+
+def test_ACEParser_timeout(mock_ace, tmp_path, monkeypatch):
+    grm = tmp_path / 'grm.dat'
+    grm.write_text('')
+    monkeypatch.setattr(ace, '_ace_version', lambda x: (0, 9, 13))
+    with pytest.raises(ValueError):
+        ace.ACEParser(grm, executable=mock_ace, timeout=0)
+    with ace.ACEParser(grm, executable=mock_ace, timeout=0.5) as parser:
+        r1 = parser.interact('A0.')
+        r2 = parser.interact('hang')
+        # the killed process was restarted
+        assert parser.alive
+        r3 = parser.interact('A1.')
+        responses = list(parser.interact_many(['A2.', 'hang', 'A3.']))
+    assert not parser.alive
+    assert r1['ERRORS'] == []
+    assert 'timeout' in r2['ERRORS'][0]
+    assert r3['results'][0]['mrs'] == '[ MRS of A1. ]'
+    assert [len(r['ERRORS']) for r in responses] == [0, 1, 0]
+    assert responses[2]['results'][0]['mrs'] == '[ MRS of A3. ]'
+    assert len(parser.run_infos) == 3
+    first, second, third = parser.run_infos
+    assert first['timeouts'] == 1
+    assert first['latency']['items'] == 2
+    assert first['latency']['max'] >= 0.5
+    assert second['timeouts'] == 1
+    assert second['latency']['items'] == 3
+    assert 'timeouts' not in third
+    assert third['latency']['items'] == 1
+
+
+def test_AsyncACEParser_timeout(mock_ace, tmp_path, monkeypatch):
+    grm = tmp_path / 'grm.dat'
+    grm.write_text('')
+    monkeypatch.setattr(ace, '_ace_version', lambda x: (0, 9, 13))
+
+    async def parse_all(sentences):
+        async with ace.AsyncACEParser(
+                grm, executable=mock_ace, timeout=0.5) as parser:
+            responses = [await parser.interact(s) for s in sentences]
+        return responses, parser.run_infos
+
+    loop = asyncio.new_event_loop()
+    try:
+        responses, run_infos = loop.run_until_complete(
+            parse_all(['A0.', 'hang', 'A1.']))
+    finally:
+        loop.close()
+    assert [len(r['ERRORS']) for r in responses] == [0, 1, 0]
+    assert responses[2]['results'][0]['mrs'] == '[ MRS of A1. ]'
+    assert run_infos[0]['timeouts'] == 1
+    assert run_infos[0]['latency']['items'] == 2
+    assert run_infos[1]['latency']['items'] == 1
@@ -256,6 +256,12 @@ def test_compare(mini_testsuite):
     with pytest.raises(TypeError):
         compare(gold=ts0)
     compare(ts0, ts0)
+    results = list(compare(ts0, ts0, buffer_size=1))
+    assert [(r['id'], r['input'], r['test'], r['shared'], r['gold'])
+            for r in results] == [
+        ('10', 'It rained.', 0, 1, 0),
+        ('30', 'It snowed.', 0, 1, 0),
+    ]
 
 
 def test_repp(sentence_file):
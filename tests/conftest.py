@@ -215,3 +215,36 @@ def parser_cpu():
             )
 
     return DummyParser()
+
+
+class EchoParser(Processor):
+    """
+    A parser whose results are its inputs.
+
+    With *results* > 1, an uppercased input is the second result.
+    Processing the item with i-id *crash_at* raises a RuntimeError.
+    The i-ids of processed items are recorded in :attr:`seen`.
+    """
+    task = 'parse'
+
+    def __init__(self, results=1, crash_at=None):
+        self.run = {'run-id': 0, 'start': datetime(2020, 1, 1)}
+        self.results = results
+        self.crash_at = crash_at
+        self.seen = []
+
+    def process_item(self, datum, keys=None):
+        if keys['i-id'] == self.crash_at:
+            raise RuntimeError('crashed')
+        self.seen.append(keys['i-id'])
+        results = [{'result-id': 0, 'mrs': datum},
+                   {'result-id': 1, 'mrs': datum.upper()}]
+        return Response(
+            keys=keys,
+            run=self.run,
+            results=results[:self.results])
+
+
+@pytest.fixture
+def echo_parser():
+    return EchoParser
@@ -164,6 +164,38 @@ class TestMultiHierarchy():
         th.update({'c': 'a b'})
         assert th.compatible('a', 'b') is True
 
+    def test_glb(self, h1):
+        assert h1.glb('*top*', '*top*') == '*top*'
+        assert h1.glb('*top*', 'a') == 'a'
+        assert h1.glb('a', '*top*') == 'a'
+        assert h1.glb('c', 'd') is None
+        # c and d are both maximal lower bounds of a and b
+        with pytest.raises(HierarchyError):
+            h1.glb('a', 'b')
+        h1.update({'e': 'c d'})
+        assert h1.glb('c', 'd') == 'e'
+        with pytest.raises(KeyError):
+            h1.glb('a', 'f')
+
+    def test_encoding_update(self, h1):
+        # queries before and after updates agree with the hierarchy
+        assert h1.subsumes('a', 'c')
+        assert not h1.compatible('c', 'd')
+        h1.update({'e': 'c d', 'f': 'b', 'g': 'e f'})
+        assert h1.descendants('b') == {'c', 'd', 'e', 'f', 'g'}
+        assert h1.descendants('a') == {'c', 'd', 'e', 'g'}
+        assert h1.subsumes('f', 'g')
+        assert h1.subsumes('*top*', 'g')
+        assert not h1.subsumes('g', 'f')
+        assert h1.compatible('c', 'd')
+        assert h1.compatible('a', 'f')
+        assert h1.glb('c', 'f') == 'g'
+        # failed updates leave the encoding intact
+        with pytest.raises(HierarchyError):
+            h1.update({'h': 'g', 'i': 'x'})
+        assert 'h' not in h1
+        assert h1.descendants('g') == set()
+
     def test_integrity(self):
         # trivial cycle
         with pytest.raises(HierarchyError):
@@ -173,3 +173,37 @@ def test_Response():
     assert r.tokens('initial') is None
     assert r.tokens('internal') == toks
     assert r.tokens() == toks
+
+
+def test_Result_memoize():
+    mrs_s = ('[ TOP: h0'
+             '  RELS: < ["_rain_v_1_rel" LBL: h1 ARG0: e2 ] >'
+             '  HCONS: < h0 qeq h1 > ]')
+    r = Result(mrs=mrs_s)
+    m = r.mrs()
+    assert r.mrs() is m
+    # EDS and DMRS are converted from the MRS if not given
+    e = r.eds()
+    assert e is not None and e.top == 'e2'
+    assert r.eds() is e
+    d = r.dmrs()
+    assert d is not None and len(d.nodes) == 1
+    assert r.dmrs() is d
+    # reassigning the key invalidates the decoded objects
+    r['mrs'] = mrs_s.replace('rain', 'snow')
+    assert r.mrs() is not m
+    assert r.mrs().rels[0].predicate == '_snow_v_1'
+    assert r.eds().nodes[0].predicate == '_snow_v_1'
+    # memoization can be disabled
+    r.memoize = False
+    assert r.mrs() is not r.mrs()
+
+
+def test_Response_memoize():
+    r = Response(results=[{'mrs': '[ TOP: h0 RELS: < > HCONS: < > ]'}],
+                 tokens={'initial': '(1, 0, 1, <0:4>, 1, "Dogs", 0, "null")'})
+    assert r.results()[0] is r.result(0)
+    assert r.result(-1).mrs() is r.results()[0].mrs()
+    assert r.tokens('initial') is r.tokens('initial')
+    r.memoize = False
+    assert r.tokens('initial') is not r.tokens('initial')
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import pathlib
+import shutil
 from datetime import datetime
 
 import pytest
@@ -85,6 +86,37 @@ class TestTestSuite(object):
         t.reload()
         assert item[0]['i-input'] == 'The dog sleeps.'
 
+    def test_commit_append(self, single_item_profile):
+        t = itsdb.TestSuite(single_item_profile)
+        item = t['item']
+        item.append((1, 'The cat meows.'))
+        t.commit()
+        item.append((2, 'The bird chirps.'))
+        t.commit()
+        assert not t.in_transaction
+        # the append file is not kept open between manual commits
+        assert item._append_file is None
+        assert [row['i-id'] for row in item] == [0, 1, 2]
+        assert item[-1] == (2, 'The bird chirps.')
+        item[0] = (0, 'The dog sleeps.')
+        t.commit()
+        t.reload()
+        assert list(item.select('i-input', cast=False)) == [
+            ('The dog sleeps.',), ('The cat meows.',), ('The bird chirps.',)]
+
+    def test_commit_append_after_rewrite(self, single_item_profile):
+        t = itsdb.TestSuite(single_item_profile)
+        item = t['item']
+        item.append((1, 'The cat meows.'))
+        t.commit()
+        # replacing the table file must not strand later appends in
+        # the old file
+        tsdb.write_database(t, single_item_profile, gzip=True)
+        item.append((2, 'The bird chirps.'))
+        t.commit()
+        t = itsdb.TestSuite(single_item_profile)
+        assert [row['i-id'] for row in t['item']] == [0, 1, 2]
+
     def test_process(self, parser_cpu, single_item_skeleton):
         ts = itsdb.TestSuite(single_item_skeleton)
         assert len(ts['parse']) == 0
@@ -99,6 +131,95 @@ class TestTestSuite(object):
         assert ts['result'][1]['parse-id'] == 0
         assert ts['result'][1]['result-id'] == 1
 
+    def test_process_concurrent(self, single_item_skeleton, echo_parser):
+        single_item_skeleton.joinpath('item').write_text(
+            ''.join('{}@Item {}.\n'.format(i, i) for i in range(1, 21)))
+        ts = itsdb.TestSuite(single_item_skeleton)
+        ts.process([echo_parser(), echo_parser(), echo_parser()],
+                   buffer_size=4)
+        assert [row['i-id'] for row in ts['parse']] == list(range(1, 21))
+        assert [row['parse-id'] for row in ts['parse']] == list(range(1, 21))
+        assert [row['mrs'] for row in ts['result']] == [
+            'Item {}.'.format(i) for i in range(1, 21)]
+        run_ids = sorted(row['run-id'] for row in ts['run'])
+        assert run_ids == list(range(len(run_ids)))
+        assert 1 <= len(run_ids) <= 3
+        assert {row['run-id'] for row in ts['parse']} == set(run_ids)
+
+    def test_process_resume(self, single_item_skeleton, echo_parser):
+        single_item_skeleton.joinpath('item').write_text(
+            ''.join('{}@Item {}.\n'.format(i, i) for i in range(1, 11)))
+        ts = itsdb.TestSuite(single_item_skeleton)
+        with pytest.raises(RuntimeError):
+            ts.process(echo_parser(crash_at=8), buffer_size=3)
+        # every 2 items (4 rows) are committed, so 6 were before the crash
+        checkpoint = single_item_skeleton.joinpath('.process-checkpoint')
+        assert checkpoint.is_file()
+        ts = itsdb.TestSuite(single_item_skeleton)
+        assert len(ts['parse']) == 6
+        cpu = echo_parser()
+        ts.process(cpu, buffer_size=3, resume=True)
+        assert cpu.seen == [7, 8, 9, 10]
+        assert not checkpoint.exists()
+        assert [row['i-id'] for row in ts['parse']] == list(range(1, 11))
+        assert [row['parse-id'] for row in ts['parse']] == list(range(1, 11))
+        assert [row['mrs'] for row in ts['result']] == [
+            'Item {}.'.format(i) for i in range(1, 11)]
+        assert [row['run-id'] for row in ts['parse']] == [0] * 6 + [1] * 4
+        assert [row['run-id'] for row in ts['run']] == [0, 1]
+        # without a checkpoint, resuming starts over
+        cpu = echo_parser()
+        ts.process(cpu, resume=True)
+        assert cpu.seen == list(range(1, 11))
+        assert len(ts['parse']) == 10
+
+    def test_process_baseline(self, single_item_skeleton, tmp_path,
+                              echo_parser):
+        item = single_item_skeleton.joinpath('item')
+        item.write_text(
+            ''.join('{}@Item {}.\n'.format(i, i) for i in range(1, 6)))
+        ts = itsdb.TestSuite(single_item_skeleton)
+        ts.process(echo_parser(results=2))
+        baseline = tmp_path / 'baseline'
+        shutil.copytree(str(single_item_skeleton), str(baseline))
+        # edit item 2, remove item 4, and add item 6
+        item.write_text('1@Item 1.\n2@Item two.\n3@Item 3.\n'
+                        '5@Item 5.\n6@Item 6.\n')
+        ts = itsdb.TestSuite(single_item_skeleton)
+        cpu = echo_parser(results=2)
+        ts.process(cpu, baseline=itsdb.TestSuite(baseline), buffer_size=2)
+        assert cpu.seen == [2, 6]
+        assert [(row['i-id'], row['parse-id'], row['run-id'])
+                for row in ts['parse']] == [
+                    (1, 1, 0), (2, 2, 1), (3, 3, 0), (5, 5, 0), (6, 6, 1)]
+        assert [(row['parse-id'], row['result-id'], row['mrs'])
+                for row in ts['result']] == [
+                    (1, 0, 'Item 1.'), (1, 1, 'ITEM 1.'),
+                    (2, 0, 'Item two.'), (2, 1, 'ITEM TWO.'),
+                    (3, 0, 'Item 3.'), (3, 1, 'ITEM 3.'),
+                    (5, 0, 'Item 5.'), (5, 1, 'ITEM 5.'),
+                    (6, 0, 'Item 6.'), (6, 1, 'ITEM 6.')]
+        assert [row['run-id'] for row in ts['run']] == [0, 1]
+        # the baseline's selector table must be keyed by i-id
+        with pytest.raises(itsdb.ITSDBError):
+            ts.process(cpu, selector=('result', 'mrs'), baseline=ts)
+
+    def test_select_from_cache(self, mini_testsuite):
+        ts = itsdb.TestSuite(mini_testsuite)
+        cached = itsdb.TestSuite(mini_testsuite, cache=True)
+        columns = ('i-id', 'i-input', 'i-wf')
+        for cast in (True, False):
+            assert (list(cached.select_from('item', columns, cast=cast))
+                    == list(ts.select_from('item', columns, cast=cast)))
+        # uncommitted rows are not in the cache
+        cached['item'].append((40, 'It hailed.', 1, None))
+        assert [row['i-id'] for row in
+                cached.select_from('item', ['i-id'])] == [10, 20, 30, 40]
+        cached.commit()
+        assert not cached.in_transaction
+        assert [row['i-id'] for row in
+                cached.select_from('item', ['i-id'])] == [10, 20, 30, 40]
+
     def test_processed_items(self, mini_testsuite):
         ts = itsdb.TestSuite(mini_testsuite)
         responses = list(ts.processed_items())
@@ -232,6 +353,27 @@ class TestTable(object):
         assert table[::2] == [(0, 'The dog barks.')]
         assert table[::-1] == [(1, 'The bear growls.'), (0, 'The dog barks.')]
 
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_random_access(self, empty_testsuite, monkeypatch, compress):
+        # small blocks so the gzip index has several checkpoints
+        monkeypatch.setattr(itsdb._GzipLineIndex, '_block_size', 256)
+        monkeypatch.setattr(itsdb._GzipLineIndex, '_chunk_size', 64)
+        fields = tsdb.read_schema(empty_testsuite)['item']
+        rows = [(i, 'Sentence number {}. ü'.format(i)) for i in range(200)]
+        tsdb.write(empty_testsuite, 'item', rows, fields, gzip=compress)
+        table = itsdb.Table(empty_testsuite, 'item', fields)
+        assert len(table) == 200
+        assert table[0] == rows[0]
+        assert table[-1] == rows[-1]
+        for i in (150, 3, 199, 42, 43, 0):
+            assert table[i] == rows[i]
+        assert table[10:20] == rows[10:20]
+        assert table[::7] == rows[::7]
+        assert table[::-13] == rows[::-13]
+        assert table[190:300] == rows[190:]
+        table[5] = (5, 'Changed.')
+        assert table[4:7] == [rows[4], (5, 'Changed.'), rows[6]]
+
     def test__setitem__(self, empty_item_table, single_item_table):
         table = empty_item_table
         with pytest.raises(IndexError):
@@ -274,6 +416,33 @@ def test_match_rows():
     ]
 
 
+def test_match_rows_presorted():
+    rows1 = [('10', 'a'), ('20', 'b'), ('20', 'c'), ('40', 'd')]
+    rows2 = [('5', 'e'), ('20', 'f'), ('30', 'g'), ('40', 'h')]
+    assert list(itsdb.match_rows(rows1, rows2, 0, presorted=True)) == [
+        ('5', [], [('5', 'e')]),
+        ('10', [('10', 'a')], []),
+        ('20', [('20', 'b'), ('20', 'c')], [('20', 'f')]),
+        ('30', [], [('30', 'g')]),
+        ('40', [('40', 'd')], [('40', 'h')]),
+    ]
+    with pytest.raises(itsdb.ITSDBError):
+        list(itsdb.match_rows(rows1[::-1], rows2, 0, presorted=True))
+
+
+@pytest.mark.parametrize('buffer_size', [1, 3, 100])
+def test_sort_rows(single_item_table, buffer_size):
+    rows = [('9', 'a'), ('10', 'b'), (None, 'c'), ('x', 'd'), ('9', 'e')]
+    assert list(itsdb.sort_rows(rows, 0, buffer_size=buffer_size)) == [
+        (None, 'c'), ('9', 'a'), ('9', 'e'), ('10', 'b'), ('x', 'd')]
+    table = single_item_table
+    table.extend([(3, 'The cat meows.'), (1, 'The bird chirps.')])
+    sorted_rows = list(
+        itsdb.sort_rows(table, 'i-id', buffer_size=buffer_size))
+    assert [row['i-id'] for row in sorted_rows] == [0, 1, 3]
+    assert all(isinstance(row, itsdb.Row) for row in sorted_rows)
+
+
 def test_bad_date_issue_279b(tmp_path, empty_alt_testsuite):
     tmp_ts = tmp_path.joinpath('test_bad_date_issue_279b')
     tmp_ts.mkdir()
@@ -330,6 +330,19 @@ def test_is_isomorphic_recursive():
     assert mrs.is_isomorphic(m, m)
 
 
+def test_compare_bags(m1, m1b, m1c, m1f, m2, m2b):
+    assert mrs.compare_bags([], []) == (0, 0, 0)
+    assert mrs.compare_bags([m1, m2], [m1b, m2]) == (0, 2, 0)
+    assert mrs.compare_bags([m1, m1, m2], [m1b, m2b]) == (2, 1, 1)
+    assert mrs.compare_bags([m1], [m1c]) == (1, 0, 1)
+    assert mrs.compare_bags([m1], [m1c], properties=False) == (0, 1, 0)
+    test_unique, shared, gold_unique = mrs.compare_bags(
+        [m1f, m1, m2], [m2b, m1b, m1c, m1], count_only=False)
+    assert test_unique == [m1f, m2]
+    assert shared == [m1]
+    assert [id(x) for x in gold_unique] == [id(m2b), id(m1c), id(m1)]
+
+
 def test_from_dmrs(dogs_bark):
     from delphin import dmrs
     m = mrs.MRS(**dogs_bark)
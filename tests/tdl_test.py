@@ -495,20 +495,21 @@ def test_parse_cons_list():
         tdlparse('a := b & [ ATTR < [] [] > ].')
 
 
-@pytest.mark.skipif(sys.version_info < (3, 7),
-                    reason='recursion test is flaky on Python 3.6')
-@pytest.mark.slow
 def test_issue_294():
-    # check for recursion error
-    with pytest.raises(TDLError):
-        tdlparse('a := b & [ ATTR < [] ' + ', []' * 500 + ' > ].')
-    # make sure it's avoidable
-    oldlimit = sys.getrecursionlimit()
-    try:
-        sys.setrecursionlimit(2500)
-        tdlparse('a := b & [ ATTR < [] ' + ', []' * 500 + ' > ].')
-    finally:
-        sys.setrecursionlimit(oldlimit)
+    # long lists and deep structures do not exceed the recursion limit
+    n = sys.getrecursionlimit() * 2
+    t = tdlparse('a := b & [ ATTR < [] ' + ', []' * n + ' > ].')
+    assert len(t['ATTR'].values()) == n + 1
+    assert t['ATTR'].terminated
+    t = tdlparse('a := b & [ ATTR < c' + ', c' * n + ', ... > ].')
+    assert len(t['ATTR'].values()) == n + 1
+    assert not t['ATTR'].terminated
+    t = tdlparse('a := b & [ ATTR <! c' + ', c' * n + ' !> ].')
+    assert len(t['ATTR'].values()) == n + 1
+    t = tdlparse('a := b & ' + '[ A ' * n + 'c' + ' ]' * n + '.')
+    for _ in range(n):
+        t = t['A']
+    assert t == TypeIdentifier('c')
 
 
 def test_parse_diff_list():
@@ -807,6 +808,291 @@ def test_parse_environments():
     assert isinstance(e2.entries[0], FileInclude)
 
 
+def test_parse_cache(tmp_path):
+    def serialize(events):
+        return [(event, tdl.format(obj), lineno)
+                for event, obj, lineno in events]
+
+    path = tmp_path / 'a.tdl'
+    path.write_text('a := b & [ ATTR < c, d > ].\n'
+                    ':begin :type.\n'
+                    ':include "other".\n'
+                    ':end :type.\n')
+    cache = tdl.ParseCache(tmp_path / 'cache')
+    events = list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert serialize(events) == serialize(list(tdl.iterparse(path)))
+    cached = list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert serialize(cached) == serialize(events)
+    assert cached[1][1].entries[0] is cached[2][1]
+    # the same file by another path
+    subdir = tmp_path / 'sub'
+    subdir.mkdir()
+    cached = list(tdl.iterparse(subdir / '..' / 'a.tdl', cache=cache))
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cached[2][1].path == subdir / '..' / 'other.tdl'
+    # same contents with a new modification time
+    os.utime(str(path), ns=(0, 0))
+    list(tdl.iterparse(path, cache=str(tmp_path / 'cache')))
+    list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (3, 1)
+    # changed contents
+    path.write_text("a := b & 'c.\n")
+    with pytest.warns(TDLWarning):
+        events = list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (3, 2)
+    assert events[0][1].supertypes == ['b', 'c']
+    with pytest.warns(TDLWarning):
+        list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (4, 2)
+    # corrupt cache files are replaced
+    cache.path(path).write_bytes(b'garbage')
+    with pytest.warns(TDLWarning):
+        list(tdl.iterparse(path, cache=cache))
+    assert (cache.hits, cache.misses) == (4, 3)
+    cache.clear()
+    assert list(cache.directory.iterdir()) == []
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+@pytest.fixture
+def grammar_dir(tmp_path):
+    (tmp_path / 'main.tdl').write_text(
+        ':begin :type.\n'
+        '  :include "types".\n'
+        ':end :type.\n'
+        ':begin :instance :status lex-entry.\n'
+        '  :include "lex/lexicon".\n'
+        ':end :instance.\n'
+        ':begin :instance :status lex-rule.\n'
+        '  :include "irules".\n'
+        ':end :instance.\n')
+    (tmp_path / 'types.tdl').write_text(
+        'a := *top*.\n'
+        'b := a & [ ATTR c ].\n'
+        ':include "more-types".\n'
+        'a :+ [ ATTR2 d ].\n')
+    (tmp_path / 'more-types.tdl').write_text(
+        'c := *top*.\n'
+        'b := a.\n')
+    (tmp_path / 'lex').mkdir()
+    (tmp_path / 'lex' / 'lexicon.tdl').write_text(
+        'dog_n1 := b.\n'
+        ':include "../more-types".\n')
+    (tmp_path / 'irules.tdl').write_text(
+        '%(letter-set (!s abc))\n'
+        'plur_rule :=\n'
+        '%suffix (!s !ss)\n'
+        'a.\n')
+    return tmp_path
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_load_grammar(grammar_dir, jobs):
+    g = tdl.load_grammar(grammar_dir / 'main.tdl', jobs=jobs)
+    assert list(g.types) == ['a', 'b', 'c']
+    # later definitions replace earlier ones
+    assert g.types['b'].supertypes == ['a']
+    assert [tdl.format(x) for x in g.addenda['a']] == ['a :+ [ ATTR2 d ].']
+    assert list(g.instances) == ['lex-entry', 'lex-rule']
+    assert list(g.instances['lex-entry']) == ['dog_n1', 'c', 'b']
+    rule = g.instances['lex-rule']['plur_rule']
+    assert isinstance(rule, LexicalRuleDefinition)
+    assert len(g.morphsets) == 1
+    assert g.morphsets[0].var == '!s'
+    assert [p.relative_to(grammar_dir).as_posix() for p in g.files] == [
+        'main.tdl', 'types.tdl', 'more-types.tdl',
+        'lex/lexicon.tdl', 'more-types.tdl', 'irules.tdl']
+
+
+def test_load_grammar_long_list(grammar_dir):
+    # entries too deeply nested to pickle are parsed in the main process
+    (grammar_dir / 'more-types.tdl').write_text(
+        'c := *top* & [ L < {} > ].\n'.format(', '.join(['x'] * 1000)))
+    g = tdl.load_grammar(grammar_dir / 'main.tdl', jobs=2)
+    assert len(g.types['c']['L'].values()) == 1000
+    assert list(g.types) == ['a', 'b', 'c']
+
+
+def test_load_grammar_cache(grammar_dir):
+    cache = tdl.ParseCache(grammar_dir / 'cache')
+    tdl.load_grammar(grammar_dir / 'main.tdl', jobs=2, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 5)
+    g = tdl.load_grammar(grammar_dir / 'main.tdl', cache=cache)
+    assert (cache.hits, cache.misses) == (5, 5)
+    assert list(g.types) == ['a', 'b', 'c']
+
+
+def test_load_grammar_errors(grammar_dir):
+    with pytest.raises(ValueError):
+        tdl.load_grammar(grammar_dir / 'main.tdl', jobs=0)
+    (grammar_dir / 'more-types.tdl').write_text(':include "types".\n')
+    with pytest.raises(TDLError):
+        tdl.load_grammar(grammar_dir / 'main.tdl')
+
+
+def test_DefinitionIndex(tmp_path):
+    path = tmp_path / 'lexicon.tdl'
+    path.write_text(
+        '; a comment with a := b\n'
+        'a := *top*.\n'
+        '\n'
+        'b := a &\n'
+        '  """docstring with c := d"""\n'
+        '  [ ATTR < x, y > ].  c := a.\n'
+        '#| block comment\n'
+        '   d := a. |#\n'
+        'a :+ [ ATTR2 z ].\n'
+        'Ünï := a.\n')
+
+    def offset(lineno):
+        lines = path.read_bytes().splitlines(keepends=True)
+        return len(b''.join(lines[:lineno - 1]))
+
+    index = tdl.DefinitionIndex(path)
+    assert index.index_path == tmp_path / '.lexicon.tdl.index'
+    assert index.index_path.is_file()
+    assert list(index) == ['a', 'b', 'c', 'ünï']
+    assert len(index) == 4
+    assert 'B' in index
+    assert 'd' not in index
+    assert index.locations('a') == [(offset(2), 2, ':='),
+                                    (offset(9), 9, ':+')]
+    assert index.locations('c') == [(offset(6), 6, ':=')]
+    b = index['b']
+    assert b.identifier == 'b'
+    assert b.documentation() == 'docstring with c := d'
+    assert b['ATTR'].values() == ['x', 'y']
+    assert index['c'].supertypes == ['a']
+    assert index['ÜNÏ'].supertypes == ['a']
+    assert [type(x) for x in index.definitions('a')] == [
+        TypeDefinition, TypeAddendum]
+    assert index.get('d') is None
+    with pytest.raises(KeyError):
+        index['d']
+    with pytest.raises(KeyError):
+        index.definitions('d')
+    # a stored index is reused
+    index.index_path.write_text(
+        index.index_path.read_text().replace('"c"', '"e"'))
+    index = tdl.DefinitionIndex(path)
+    assert 'e' in index
+    # changes to the file rebuild the index
+    with path.open('a') as fh:
+        print('d := a.', file=fh)
+    assert 'd' in index
+    assert 'e' not in index
+    assert tdl.DefinitionIndex(path).locations('d') == [(offset(11), 11, ':=')]
+    # corrupt indices are rebuilt
+    index.index_path.write_text('{')
+    assert tdl.DefinitionIndex(path)['d'].supertypes == ['a']
+    custom = tdl.DefinitionIndex(path, index_path=tmp_path / 'idx.json')
+    assert custom.index_path.is_file()
+    assert list(custom) == ['a', 'b', 'c', 'ünï', 'd']
+
+
+def test_DefinitionIndex_unwritable(tmp_path, monkeypatch):
+    path = tmp_path / 'lexicon.tdl'
+    path.write_text('a := *top*.\nb := a.\n')
+    # indices that cannot be stored are kept in memory
+    missing = tmp_path / 'missing' / 'idx.json'
+    index = tdl.DefinitionIndex(path, index_path=missing)
+    assert not missing.exists()
+    assert index['b'].supertypes == ['a']
+
+    def fail(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(os, 'replace', fail)
+    index = tdl.DefinitionIndex(path)
+    assert list(index) == ['a', 'b']
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_CompactDefinition(tmp_path):
+    path = tmp_path / 'compact.tdl'
+    path.write_text(
+        'a := b & "str" & ^re$ &\n'
+        '  [ A.B #x, C [ D e ] & [ F g ] & #x, L < >, M < ... >,\n'
+        '    N < a, b & [ X y ], ... >, O < a . #z >, P <! !>,\n'
+        '    Q <! a, < b, c > !>, R < [ S < #q . #r & c > ] > ].\n'
+        'b := """doc of b""" c & """doc of avm""" [ A """doc""" x ].\n'
+        'c :+ [ A < a, b > ].\n'
+        'plur :=\n'
+        '%suffix (!s !ss)\n'
+        'a & [ A < b > ].\n'
+        'd := b & [ A y ].\n'
+        'e := b & [ A < c . < d, e > > ].\n'
+        'f := b & [ A < c . < d, ... > > ].\n'
+        'g := b & [ A < c . < > > ].\n')
+    defs = [obj for _, obj, _ in tdl.iterparse(path)]
+    pool = tdl.CompactPool()
+    compacts = [tdl.CompactDefinition(obj, pool) for obj in defs]
+    for obj, cd in zip(defs, compacts):
+        assert cd.identifier == obj.identifier
+        assert cd.docstring == obj.docstring
+        assert cd.supertypes == obj.supertypes
+        restored = cd.to_definition()
+        assert type(restored) is type(obj)
+        assert tdl.format(restored) == tdl.format(obj)
+        assert tdl.format(cd) == tdl.format(obj)
+    # a list-valued end is not spliced into the list's items
+    assert [tdl.format(obj).split('\n')[1] for obj in defs[5:]] == [
+        '  [ A < c . < d, e > > ].',
+        '  [ A < c . < d, ... > > ].',
+        '  [ A < c . < > > ].']
+    a = compacts[0].to_definition()
+    assert a['N'].values()[0] == 'a'
+    assert not a['N'].terminated
+    assert a['O'].terminated
+    assert isinstance(a['O'].values()[1], Coreference)
+    assert a['Q'].last == 'LIST.REST.REST'
+    assert compacts[3].affix_type == 'suffix'
+    assert compacts[3].patterns == [('!s', '!ss')]
+    assert compacts[1].supertypes[0].docstring == 'doc of b'
+    # definitions with the same geometry share their shape and strings
+    b, d = compacts[1], compacts[4]
+    assert b._shape[1][0] is d._shape[1][0]
+    assert tdl.CompactDefinition(defs[4], pool)._shape is d._shape
+    assert type(b._values[-1]) is str
+    with pytest.raises(AttributeError):
+        b.conjunction = Conjunction()
+
+
+def test_iterparse_compact(tmp_path):
+    path = tmp_path / 'compact.tdl'
+    path.write_text(
+        'a := b.\n'
+        ':begin :instance.\n'
+        'c := a & [ A "x" ].\n'
+        ':end :instance.\n')
+    expected = [tdl.format(obj) for _, obj, _ in tdl.iterparse(path)
+                if isinstance(obj, TypeDefinition)]
+    for cache in (None, tmp_path / 'cache', tmp_path / 'cache'):
+        events = list(tdl.iterparse(path, cache=cache, compact=True))
+        assert [e for e, _, _ in events] == [
+            'TypeDefinition', 'BeginEnvironment', 'TypeDefinition',
+            'EndEnvironment']
+        assert all(isinstance(events[i][1], tdl.CompactDefinition)
+                   for i in (0, 2))
+        assert events[1][1].entries == [events[2][1]]
+        assert [tdl.format(events[i][1]) for i in (0, 2)] == expected
+    pool = tdl.CompactPool()
+    x = [obj for _, obj, _ in tdl.iterparse(path, compact=pool)]
+    y = [obj for _, obj, _ in tdl.iterparse(path, compact=pool)]
+    assert x[0]._values[0] is y[0]._values[0]
+
+
+def test_load_grammar_compact(grammar_dir):
+    g = tdl.load_grammar(grammar_dir / 'main.tdl', compact=True)
+    assert isinstance(g.types['b'], tdl.CompactDefinition)
+    assert g.types['b'].supertypes == ['a']
+    assert [tdl.format(x) for x in g.addenda['a']] == ['a :+ [ ATTR2 d ].']
+    rule = g.instances['lex-rule']['plur_rule']
+    assert isinstance(rule.to_definition(), LexicalRuleDefinition)
+
+
 def test_format_TypeTerms():
     assert tdl.format(TypeIdentifier('a-type')) == 'a-type'
     assert tdl.format(String('a string')) == '"a string"'
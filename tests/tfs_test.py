@@ -2,6 +2,7 @@
 import pytest
 
 from delphin import tfs
+from delphin.hierarchy import HierarchyError
 
 
 @pytest.fixture
@@ -119,6 +120,79 @@ class TestTypeHierarchy(object):
         with pytest.raises(TypeError):
             th.update({'1': 1})
 
+    def test_glb(self):
+        th = tfs.TypeHierarchy('*top*', {'a': '*top*',
+                                         'b': '*top*',
+                                         'c': 'a b'})
+        assert th.glb('a', 'b') == 'c'
+        assert th.glb('B', 'A') == 'c'
+        assert th._meets[('a', 'b')] == 'c'
+        # adding types invalidates the meet table
+        th.update({'d': 'a b'})
+        assert th._meets == {}
+        with pytest.raises(HierarchyError):
+            th.glb('a', 'b')
+        th.update({'e': 'a'})
+        assert th.glb('b', 'e') is None
+        assert th.glb('e', 'b') is None
+
+    def test_glb_closure(self):
+        def check_closure(th):
+            for a in th:
+                for b in th:
+                    th.glb(a, b)  # does not raise
+
+        th = tfs.TypeHierarchy('*top*', {'a': ['*top*'],
+                                         'b': ['*top*'],
+                                         'c': ['a', 'b'],
+                                         'd': ['a', 'b']},
+                               data={'c': 1})
+        th2 = th.glb_closure()
+        assert th2.parents('glbtype1') == ('a', 'b')
+        assert th2.parents('c') == ('glbtype1',)
+        assert th2.parents('d') == ('glbtype1',)
+        assert th2.glb('a', 'b') == 'glbtype1'
+        assert th2['c'] == 1
+        assert 'glbtype1' not in th
+        check_closure(th2)
+        # names are not reused
+        th.update({'glbtype1': 'c'})
+        assert th.glb_closure(prefix='glbtype').glb('a', 'b') == 'glbtype2'
+        # non-symmetric non-unique glb
+        th = tfs.TypeHierarchy('*top*', {'a': ['*top*'],
+                                         'b': ['*top*'],
+                                         'c': ['*top*'],
+                                         'd': ['a', 'b', 'c'],
+                                         'e': ['a', 'b']})
+        th2 = th.glb_closure()
+        assert th2.parents('glbtype1') == ('a', 'b')
+        assert th2.parents('d') == ('c', 'glbtype1')
+        assert th2.parents('e') == ('glbtype1',)
+        check_closure(th2)
+        # non-immediate non-unique glb
+        th = tfs.TypeHierarchy('*top*', {'a': ['*top*'],
+                                         'b': ['*top*'],
+                                         'c': ['a', 'b'],
+                                         'a2': ['a'],
+                                         'b2': ['b'],
+                                         'd': ['a2', 'b2']})
+        th2 = th.glb_closure()
+        assert th2.glb('a', 'b') == 'glbtype1'
+        assert th2.parents('d') == ('a2', 'b2', 'glbtype1')
+        check_closure(th2)
+        # glbs of glbs
+        th = tfs.TypeHierarchy('*top*', {'a': ['*top*'],
+                                         'b': ['*top*'],
+                                         'c': ['*top*'],
+                                         'x': ['a', 'b', 'c'],
+                                         'y': ['a', 'b', 'c'],
+                                         'z': ['a', 'b']})
+        th2 = th.glb_closure()
+        assert len(th2) == len(th) + 2
+        assert th2.glb('a', 'c') == th2.glb('b', 'c')
+        assert th2.subsumes(th2.glb('a', 'b'), th2.glb('a', 'c'))
+        check_closure(th2)
+
     def test_integrity(self):
         pass
         # awaiting issue #94
@@ -133,6 +133,43 @@ class TestDatabase():
             (30, datetime(2018, 2, 1, 15, 0)),
         ]
 
+    def test_cache(self, mini_testsuite):
+        db = tsdb.Database(mini_testsuite)
+        cached = tsdb.Database(mini_testsuite, cache=True)
+        for name in ('item', 'parse', 'result'):
+            assert (list(cached.select_from(name))
+                    == list(db.select_from(name)))
+            assert (list(cached.select_from(name, cast=True))
+                    == list(db.select_from(name, cast=True)))
+        assert list(cached.select_from('item', ['i-id', 'i-wf'])) == [
+            ('10', '1'), ('20', '0'), ('30', '1')]
+        assert list(cached.select_from('item', [])) == [(), (), ()]
+        path = tsdb.cache_path(mini_testsuite, 'item')
+        assert path.is_file()
+        with tsdb.load_cache(
+                mini_testsuite, 'item', db.schema['item']) as cache:
+            assert cache.is_current()
+            ids = cache.column('i-id')
+            assert next(ids) == '10'
+            ids.close()  # release the partially read column
+        with pytest.raises(ValueError):
+            next(cache.column('i-id'))
+        # non-canonical numbers and missing values survive unchanged
+        fields = db.schema['item']
+        tsdb.write(mini_testsuite, 'item',
+                   [('010', 'Snowed.', None, None), ('-5', '', '1', None)],
+                   fields)
+        assert list(cached.select_from('item')) == [
+            ('010', 'Snowed.', '1', None), ('-5', None, '1', None)]
+        assert list(cached.select_from('item')) == list(db['item'])
+        assert list(cached.select_from('item', ['i-id'], cast=True)) == [
+            (10,), (-5,)]
+        # a newer gzipped file replaces the cached plain one
+        tsdb.write(mini_testsuite, 'item', [(40, 'It hailed.', 1, None)],
+                   fields, gzip=True)
+        assert list(cached.select_from('item', ['i-id', 'i-input'])) == [
+            ('40', 'It hailed.')]
+
 
 def test_escape():
     assert tsdb.escape('') == ''
@@ -170,6 +207,20 @@ def test_split(empty_testsuite):
     assert tsdb.split('10@one', fields=rels['item']) == (10, 'one')
 
 
+def test_split_lines(empty_testsuite):
+    lines = ['10@one\n', '20@\n', '30@a\\sb\\\\\n', '']
+    assert list(tsdb.split_lines(lines)) == [
+        ('10', 'one'), ('20', None), ('30', 'a@b\\'), (None,)]
+    assert list(tsdb.split_lines(lines)) == [tsdb.split(x) for x in lines]
+    rels = tsdb.read_schema(empty_testsuite)
+    assert list(tsdb.split_lines(lines[:3], fields=rels['item'])) == [
+        (10, 'one'), (20, None), (30, 'a@b\\')]
+    with pytest.raises(tsdb.TSDBError):
+        list(tsdb.split_lines(['10@one@two'], fields=rels['item']))
+    with pytest.raises(tsdb.TSDBError):
+        list(tsdb.split_lines(['10@a\\qb']))
+
+
 def test_join():
     assert tsdb.join([None]) == ''
     assert tsdb.join(['one']) == 'one'
@@ -177,6 +228,8 @@ def test_join():
     assert tsdb.join(['one', 'two']) == 'one@two'
     assert tsdb.join(['one', None, 'three']) == 'one@@three'
     assert tsdb.join(['one@', '\\two\nabc']) == 'one\\s@\\\\two\\nabc'
+    assert tsdb.join(['one', '@']) == 'one@\\s'
+    assert tsdb.join([]) == ''
 
 
 def test_make_record(empty_testsuite):
@@ -151,6 +151,30 @@ def test_select_where(mini_testsuite):
         ('It rained.',), ('Rained.',), ('It snowed.',)]
     assert list(tsql.select('i-input where readings > 0', ts)) == [
         ('It rained.',), ('It snowed.',)]
+    assert list(tsql.select(
+        'i-input where i-id = 10 or i-id = 20 or i-wf = 0', ts)) == [
+            ('It rained.',), ('Rained.',)]
+    assert list(tsql.select(
+        'i-input where i-id > 5 and i-wf = 1 and !i-input ~ "rain"', ts)) == [
+            ('It snowed.',)]
+
+
+def test_select_where_joined(mini_testsuite):
+    ts = itsdb.TestSuite(mini_testsuite)
+    # conditions on separate relations
+    assert list(tsql.select(
+        'i-id mrs where i-id < 30 and readings > 0', ts)) == [
+            ('10', ts['result'][0]['mrs'])]
+    # a condition spanning relations
+    assert list(tsql.select(
+        'i-input where i-id = 20 or readings > 0', ts)) == [
+            ('It rained.',), ('Rained.',), ('It snowed.',)]
+    assert list(tsql.select(
+        'i-input where i-id = 20 or mrs ~ "snow"', ts)) == [
+            ('It snowed.',)]
+    # selections are re-iterable
+    selection = tsql.select('i-id where readings > 0', ts)
+    assert list(selection) == list(selection) == [('10',), ('30',)]
 
 
 def test_select_where_types_issue_261(mini_testsuite):
@@ -38,6 +38,25 @@ def test_SExpr():
     ]
     # other kinds of whitespace
     assert SExpr.parse('(\ta\n.\n\n  b)').data == ('a', 'b')
+    assert SExpr.parse('(1e3 -2.5e-2 -x)').data == [1000.0, -0.025, '-x']
+    assert SExpr.parse('(a) (b)') == (['a'], ' (b)')
+    assert SExpr.parse('  ') == ([], '')
+    with pytest.raises(IndexError):
+        SExpr.parse('(a (b)')
+    with pytest.raises(IndexError):
+        SExpr.parse('(a "b)')
+    with pytest.raises(ValueError):
+        SExpr.parse('a')
+
+
+def test_SExpr_iterparse():
+    assert list(SExpr.iterparse('')) == []
+    assert list(SExpr.iterparse(' (:a . 1) (:b . "x y")\n(:c (d e)) ')) == [
+        (':a', 1), (':b', 'x y'), [':c', ['d', 'e']]]
+    exprs = SExpr.iterparse('(:a . 1) (:b . ')
+    assert next(exprs) == (':a', 1)
+    with pytest.raises(IndexError):
+        next(exprs)
 
 def test_SExpr_format():
     assert SExpr.format([]) == '()'
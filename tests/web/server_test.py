@@ -0,0 +1,133 @@
+
+import threading
+
+import pytest
+
+pytest.importorskip('falcon')
+
+from delphin import interface  # noqa: E402
+from delphin.web import server  # noqa: E402
+
+
+class MockProcessor(interface.Processor):
+    task = 'parse'
+
+    def __init__(self, *args):
+        self.args = args
+        self.alive = True
+        self.closed = False
+
+    def close(self):
+        self.alive = False
+        self.closed = True
+
+
+@pytest.fixture
+def spawned():
+    return []
+
+
+@pytest.fixture
+def spawn(spawned):
+    def spawn(*args):
+        cpu = MockProcessor(*args)
+        spawned.append(cpu)
+        return cpu
+    return spawn
+
+
+def test_ProcessorPool_init(spawn):
+    with pytest.raises(ValueError):
+        server.ProcessorPool(spawn, size=0)
+    pool = server.ProcessorPool(spawn)
+    assert len(pool) == 0
+    assert pool.max_requests is None
+    assert pool.timeout is None
+
+
+def test_ProcessorPool_checkout_checkin(spawn, spawned):
+    pool = server.ProcessorPool(spawn, size=2)
+    cpu = pool.checkout('-n', '1')
+    assert cpu.args == ('-n', '1')
+    assert len(pool) == 1
+    pool.checkin(cpu)
+    # idle processors are reused for the same arguments
+    assert pool.checkout('-n', '1') is cpu
+    other = pool.checkout('-n', '2')
+    assert other is not cpu
+    assert len(pool) == 2
+    pool.checkin(cpu)
+    pool.checkin(other)
+    with pool.processor('-n', '2') as x:
+        assert x is other
+    # processors that raised an exception are closed
+    with pytest.raises(RuntimeError):
+        with pool.processor('-n', '2'):
+            raise RuntimeError()
+    assert other.closed
+    assert len(pool) == 1
+    pool.close()
+    assert cpu.closed
+    with pytest.raises(interface.InterfaceError):
+        pool.checkout('-n', '1')
+    assert len(spawned) == 2
+
+
+def test_ProcessorPool_eviction(spawn, spawned):
+    pool = server.ProcessorPool(spawn, size=2)
+    a = pool.checkout('a')
+    b = pool.checkout('b')
+    pool.checkin(a)
+    pool.checkin(b)
+    # the least-recently used idle processor makes room
+    c = pool.checkout('c')
+    assert a.closed
+    assert not b.closed
+    assert len(pool) == 2
+    pool.checkin(c)
+    assert pool.checkout('b') is b
+    assert [cpu.args for cpu in spawned] == [('a',), ('b',), ('c',)]
+
+
+def test_ProcessorPool_max_requests(spawn, spawned):
+    pool = server.ProcessorPool(spawn, max_requests=2)
+    for _ in range(2):
+        with pool.processor() as cpu:
+            assert cpu is spawned[0]
+    assert spawned[0].closed
+    assert len(pool) == 0
+    with pool.processor() as cpu:
+        assert cpu is spawned[1]
+    assert len(spawned) == 2
+
+
+def test_ProcessorPool_dead_processors(spawn, spawned):
+    pool = server.ProcessorPool(spawn)
+    # processors that exit while idle are replaced on checkout
+    with pool.processor() as cpu:
+        pass
+    cpu.alive = False
+    with pool.processor() as cpu:
+        assert cpu is spawned[1]
+        # processors that exit while checked out are not reused
+        cpu.alive = False
+    assert spawned[0].closed
+    assert spawned[1].closed
+    assert len(pool) == 0
+    with pool.processor() as cpu:
+        assert cpu is spawned[2]
+
+
+def test_ProcessorPool_timeout(spawn):
+    pool = server.ProcessorPool(spawn, size=1, timeout=0.05)
+    cpu = pool.checkout('a')
+    with pytest.raises(interface.InterfaceError):
+        pool.checkout('a')
+    # waiting requests get processors as they are checked in
+    pool.timeout = 5
+    timer = threading.Timer(0.05, pool.checkin, (cpu,))
+    timer.start()
+    try:
+        assert pool.checkout('a') is cpu
+    finally:
+        timer.join()